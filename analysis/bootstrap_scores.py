@@ -0,0 +1,101 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pairwise_data import COMBINED_DATA_PATH, load_trials, load_exclusions, participant_win_matrices
+from bradley_terry import fit_bradley_terry, rank_probabilities
+
+# Per-process state of the worker pool (set once by _init_worker instead of pickled with every task)
+_participant_wins = None
+_full_scores = None
+
+def _init_worker(participant_wins, full_scores):
+    global _participant_wins, _full_scores
+    _participant_wins = participant_wins
+    _full_scores = full_scores
+
+def _bootstrap_chunk(seed_sequence, n_replicates, batch_size):
+    """Fit `n_replicates` cluster-bootstrap replicates, `batch_size` at a time."""
+    rng = np.random.default_rng(seed_sequence)
+    n_participants = _participant_wins.shape[0]
+    results = []
+    for start in range(0, n_replicates, batch_size):
+        size = min(batch_size, n_replicates - start)
+        # Resampling participants with replacement = multinomial weights on their win matrices
+        weights = rng.multinomial(n_participants, np.full(n_participants, 1 / n_participants), size=size)
+        wins = np.tensordot(weights, _participant_wins, axes=1)
+        results.append(fit_bradley_terry(wins, init=_full_scores))
+    return np.concatenate(results)
+
+def bootstrap_scores(participant_wins, n_replicates=2000, seed=None, workers=None, chunk_size=250, batch_size=50):
+    """
+    Participant-level (cluster) bootstrap of the Bradley-Terry scores.
+
+    Args:
+        participant_wins: Array (P, n, n) of per-participant win counts.
+        n_replicates: Number of bootstrap replicates.
+        seed: Seed of the resampling (replicates are reproducible for a given seed and chunk size).
+        workers: Number of worker processes (None for one per CPU).
+        chunk_size: Replicates per task sent to a worker.
+        batch_size: Replicates fitted together in one vectorized fit.
+
+    Returns:
+        (full_scores, replicate_scores) with shapes (n,) and (n_replicates, n).
+    """
+    full_scores = fit_bradley_terry(participant_wins.sum(axis=0))
+    chunks = [chunk_size] * (n_replicates // chunk_size)
+    if n_replicates % chunk_size:
+        chunks.append(n_replicates % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(participant_wins, full_scores)) as executor:
+        futures = [executor.submit(_bootstrap_chunk, s, size, batch_size) for s, size in zip(seeds, chunks)]
+        replicate_scores = np.concatenate([future.result() for future in futures])
+    return full_scores, replicate_scores
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster-bootstrap confidence intervals for the stimulus scores.")
+    parser.add_argument("--input", default=COMBINED_DATA_PATH, help="Combined trial data (from combine_data.py)")
+    parser.add_argument("--output", default="data/working", help="Folder for the result files")
+    parser.add_argument("--replicates", type=int, default=2000, help="Number of bootstrap replicates")
+    parser.add_argument("--level", type=float, default=0.95, help="Confidence level of the percentile intervals")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the resampling")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--exclude", default=None, help="CSV of judges to leave out (participant_id and optionally round_type columns)")
+    args = parser.parse_args()
+
+    df = load_trials(args.input, exclude=load_exclusions(args.exclude))
+    os.makedirs(args.output, exist_ok=True)
+    tail = (1 - args.level) / 2 * 100
+
+    for round_type, round_df in df.groupby("round_type"):
+        start = time.perf_counter()
+        participants, stimuli, participant_wins = participant_win_matrices(round_df)
+        full_scores, replicate_scores = bootstrap_scores(
+            participant_wins, args.replicates, args.seed, args.workers
+        )
+        lower, upper = np.percentile(replicate_scores, [tail, 100 - tail], axis=0)
+
+        intervals = pd.DataFrame({
+            "stimulus": stimuli,
+            "score": full_scores,
+            "se": replicate_scores.std(axis=0, ddof=1),
+            "lower": lower,
+            "upper": upper,
+        }).sort_values("score", ascending=False)
+        intervals.to_csv(os.path.join(args.output, f"bootstrap_intervals_{round_type}.csv"), index=False)
+
+        ranks = pd.DataFrame(
+            rank_probabilities(replicate_scores), index=pd.Index(stimuli, name="stimulus"),
+            columns=[f"rank_{rank}" for rank in range(1, len(stimuli) + 1)]
+        )
+        ranks.loc[intervals["stimulus"]].to_csv(os.path.join(args.output, f"rank_probabilities_{round_type}.csv"))
+
+        print(f"{round_type}: {len(participants)} participants, {len(stimuli)} stimuli, "
+              f"{args.replicates} replicates in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pairwise_data import COMBINED_DATA_PATH, load_trials, participant_win_matrices
+
+def majority_tournaments(participant_wins):
+    """
+    Majority-preference matrices: A[p, i, j] = 1 if participant p chose i over j more often than j over i.
+
+    Pairs that were split evenly (or never shown) get no edge in either direction.
+    """
+    return (participant_wins > np.swapaxes(participant_wins, 1, 2)).astype(np.float64)
+
+def count_circular_triads(tournaments):
+    """
+    Number of circular triads (i > j > k > i) in each tournament, as trace(A^3) / 3.
+
+    Args:
+        tournaments: Array (P, n, n) of 0/1 majority matrices.
+
+    Returns:
+        Integer array of length P.
+    """
+    paths = tournaments @ tournaments  # paths of length two
+    return np.rint(np.einsum("pij,pji->p", paths, tournaments) / 3).astype(np.int64)
+
+def max_circular_triads(n):
+    """Kendall's maximum number of circular triads in a complete tournament on n items."""
+    return (n ** 3 - n) // 24 if n % 2 else (n ** 3 - 4 * n) // 24
+
+def list_circular_triads(tournament, limit=None):
+    """
+    The circular triads of one tournament, each once, as (i, j, k) with i -> j -> k -> i and i the smallest index.
+
+    Args:
+        tournament: 0/1 majority matrix (n, n).
+        limit: Optional maximum number of triads to return.
+    """
+    tournament = tournament.astype(bool)
+    n = len(tournament)
+    triads = []
+    for i in range(n - 2):
+        # j, k > i with i -> j, j -> k and k -> i
+        beats_i = tournament[i + 1:, i]
+        closed = tournament[i, i + 1:][:, None] & tournament[i + 1:, i + 1:] & beats_i[None, :]
+        j, k = np.nonzero(closed)
+        triads.extend(zip(np.full_like(j, i), i + 1 + j, i + 1 + k))
+        if limit is not None and len(triads) >= limit:
+            return [tuple(map(int, triad)) for triad in triads[:limit]]
+    return [tuple(map(int, triad)) for triad in triads]
+
+def consistency_chunk(participant_wins, limit):
+    """Circular triads of a chunk of participants (run in a worker process)."""
+    tournaments = majority_tournaments(participant_wins)
+    counts = count_circular_triads(tournaments)
+    triads = [list_circular_triads(tournament, limit) if count else [] for tournament, count in zip(tournaments, counts)]
+    ties = ((participant_wins == np.swapaxes(participant_wins, 1, 2)).sum(axis=(1, 2)) - participant_wins.shape[1]) // 2
+    return counts, ties, triads
+
+def consistency(participant_wins, limit=1000, workers=None, chunk_size=16):
+    """
+    Circular triads and Kendall's coefficient of consistency for every participant, in parallel.
+
+    Args:
+        participant_wins: Array (P, n, n) of per-participant win counts.
+        limit: Maximum number of triads listed per participant.
+        workers: Number of worker processes (None for one per CPU).
+        chunk_size: Participants per task.
+
+    Returns:
+        (counts, zeta, ties, triads): circular triads, Kendall's zeta, split or missing pairs
+        and the listed triads of every participant.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(consistency_chunk, participant_wins[start:start + chunk_size], limit)
+            for start in range(0, len(participant_wins), chunk_size)
+        ]
+        results = [future.result() for future in futures]
+    counts = np.concatenate([result[0] for result in results])
+    ties = np.concatenate([result[1] for result in results])
+    triads = [participant_triads for result in results for participant_triads in result[2]]
+    maximum = max_circular_triads(participant_wins.shape[1])
+    zeta = 1 - counts / maximum if maximum else np.ones(len(counts))
+    return counts, zeta, ties, triads
+
+def main():
+    parser = argparse.ArgumentParser(description="Circular triads and Kendall's coefficient of consistency per participant.")
+    parser.add_argument("--input", default=COMBINED_DATA_PATH, help="Combined trial data (from combine_data.py)")
+    parser.add_argument("--output", default="data/working", help="Folder for the result files")
+    parser.add_argument("--max-triads", type=int, default=1000, help="Maximum number of triads listed per participant")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    df = load_trials(args.input)
+    summaries, triad_rows = [], []
+    for round_type, round_df in df.groupby("round_type"):
+        participants, stimuli, participant_wins = participant_win_matrices(round_df)
+        counts, zeta, ties, triads = consistency(participant_wins, args.max_triads, args.workers)
+        summaries.append(pd.DataFrame({
+            "participant_id": participants,
+            "round_type": round_type,
+            "circular_triads": counts,
+            "kendall_zeta": zeta,
+            "undecided_pairs": ties,  # split evenly or never judged: no majority preference
+        }))
+        for participant, participant_triads in zip(participants, triads):
+            for i, j, k in participant_triads:
+                triad_rows.append((participant, round_type, stimuli[i], stimuli[j], stimuli[k]))
+        print(f"{round_type}: {len(participants)} participants, mean zeta {zeta.mean():.3f}")
+
+    os.makedirs(args.output, exist_ok=True)
+    pd.concat(summaries, ignore_index=True).to_csv(os.path.join(args.output, "circular_triads.csv"), index=False)
+    pd.DataFrame(triad_rows, columns=["participant_id", "round_type", "first", "second", "third"]).to_csv(
+        os.path.join(args.output, "circular_triads_list.csv"), index=False
+    )
+
+if __name__ == "__main__":
+    main()
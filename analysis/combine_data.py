@@ -1,59 +1,77 @@
-import json
 import glob
 import os
+import sys
 import pandas as pd
 
+# The session logs are read with the experiment package (python analysis/combine_data.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from experiment.managers.session_log import load_session
+
 def main():
-    folder_path = "data" # Path to the folder containing the JSON files
-    json_files = glob.glob(os.path.join(folder_path, "*.json"))
+    folder_path = "data" # Path to the folder containing the session logs (and older JSON files)
+    log_files = glob.glob(os.path.join(folder_path, "*.jsonl"))
+    logged = {os.path.splitext(file)[0] for file in log_files}
+    json_files = log_files + [
+        file for file in glob.glob(os.path.join(folder_path, "*.json"))
+        if os.path.splitext(file)[0] not in logged
+    ]
 
     # List to collect each trial as a separate row
     rows = []
+    incomplete = []
 
     for file in json_files:
-        with open(file, "r") as f:
-            data = json.load(f)
-            
-            # Participant basic info
-            participant_id = data.get("participant_id")
-            start_time = data.get("start_time")
-            end_time = data.get("end_time")
-            duration = data.get("duration")
+        data = load_session(file)
+        if "trials" not in data or data.get("participant_id") is None:
+            continue  # not a session file (e.g. a startup profile or a trace)
+        
+        # Participant basic info
+        participant_id = data.get("participant_id")
+        start_time = data.get("start_time")
+        end_time = data.get("end_time")
+        duration = data.get("duration")
+        # Logs without a closing line are from crashed or unfinished sessions
+        # (participant JSON files were only written at the end of a session)
+        complete = data.get("complete", True)
+        if not complete:
+            incomplete.append(participant_id)
 
-            # Participant demographics
-            demographics = data.get("demographics", {})
-            gender = demographics.get("gender")
-            age = demographics.get("age")
-            nationality = demographics.get("nationality")
-            diet = demographics.get("diet")
-            eat_frequency = demographics.get("eat_frequency")
+        # Participant demographics
+        demographics = data.get("demographics", {})
+        gender = demographics.get("gender")
+        age = demographics.get("age")
+        nationality = demographics.get("nationality")
+        diet = demographics.get("diet")
+        eat_frequency = demographics.get("eat_frequency")
 
-            # Loop over all trials in the file
-            for trial in data.get("trials", []):
-                row = {
-                    # Participant ID
-                    "participant_id": participant_id,
+        # Loop over all trials in the file
+        for trial in data.get("trials", []):
+            row = {
+                # Participant ID
+                "participant_id": participant_id,
 
-                    # Trial-specific info
-                    "trial_num": trial.get("trial_num"),
-                    "round_type": trial.get("round_type"),
-                    "left_stimulus": trial.get("left_stimulus"),
-                    "right_stimulus": trial.get("right_stimulus"),
-                    "comparison_order": trial.get("comparison_order"),
-                    "response": trial.get("response"),
+                # Trial-specific info
+                "trial_num": trial.get("trial_num"),
+                "round_type": trial.get("round_type"),
+                "left_stimulus": trial.get("left_stimulus"),
+                "right_stimulus": trial.get("right_stimulus"),
+                "reference_stimulus": trial.get("reference_stimulus"),
+                "comparison_order": trial.get("comparison_order"),
+                "response": trial.get("response"),
 
-                    # Paricipant-level info
-                    "reaction_time": trial.get("reaction_time"),
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "duration": duration,
-                    "gender": gender,
-                    "age": age,
-                    "nationality": nationality,
-                    "diet": diet,
-                    "eat_frequency": eat_frequency,
-                }
-                rows.append(row)
+                # Paricipant-level info
+                "reaction_time": trial.get("reaction_time"),
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": duration,
+                "complete": complete,
+                "gender": gender,
+                "age": age,
+                "nationality": nationality,
+                "diet": diet,
+                "eat_frequency": eat_frequency,
+            }
+            rows.append(row)
 
     # Create the DataFrame
     df = pd.DataFrame(rows)
@@ -66,6 +84,9 @@ def main():
 
     # Display the resulting DataFrame
     print(df.head())
+    if incomplete:
+        print(f"{len(incomplete)} incomplete session(s) (crashed or unfinished, complete = False): "
+              f"{', '.join(incomplete)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,236 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.linalg import cho_solve, cholesky, solve_triangular
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+from design_simulation import Design, fixed_schedules
+
+# Session plans are read with the experiment package (python analysis/design_efficiency.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from experiment.managers.plans import SessionPlanStore
+
+def comparison_counts(left, right, n_stimuli):
+    """
+    Symmetric sparse matrix of how often every pair is compared.
+
+    Args:
+        left, right: Integer arrays with the stimuli of every trial.
+        n_stimuli: Number of stimuli.
+    """
+    left = np.asarray(left).ravel()
+    right = np.asarray(right).ravel()
+    ones = np.ones(left.size)
+    counts = sparse.coo_matrix((ones, (left, right)), shape=(n_stimuli, n_stimuli))
+    return (counts + counts.T).tocsr()
+
+def information_matrix(counts, scores=None):
+    """
+    Expected Fisher information of the Bradley-Terry scores: the graph Laplacian of
+    the comparisons, each pair weighted by n_ij p_ij (1 - p_ij).
+
+    Args:
+        counts: Sparse symmetric comparison counts (from comparison_counts).
+        scores: Optional assumed scores (e.g. from a pilot); equal scores (p = 0.5) by default.
+    """
+    counts = sparse.csr_matrix(counts)
+    if scores is None:
+        weights = counts * 0.25
+    else:
+        cells = counts.tocoo()
+        probability = 1 / (1 + np.exp(scores[cells.col] - scores[cells.row]))
+        weights = sparse.csr_matrix(
+            (cells.data * probability * (1 - probability), (cells.row, cells.col)), shape=counts.shape)
+    degree = np.asarray(weights.sum(axis=1)).ravel()
+    return (sparse.diags(degree) - weights).tocsc()
+
+# Above this many stimuli the reduced information matrix is factorized as a sparse matrix
+# (the dense path holds one n x n matrix: about 490 MB at the limit)
+DENSE_LIMIT = 8000
+
+def laplacian_pinv_diagonal(information, block_size=256, dense_limit=DENSE_LIMIT):
+    """
+    Diagonal of the pseudo-inverse of a connected Laplacian (the variances of scores centred on zero).
+
+    Stimulus 0 is grounded, so the reduced matrix is positive definite. Designs with
+    random pairs are expander graphs, whose factors fill in almost completely: up to
+    `dense_limit` stimuli, the reduced matrix is therefore factorized with a dense
+    Cholesky decomposition (LAPACK), which is then faster than a sparse one and, since
+    the factor overwrites the matrix, holds no more than it in memory. Larger designs
+    use a sparse LU factorization (symmetric minimum-degree ordering). On both paths
+    the inverse is only formed a block of columns at a time. The centring is applied
+    from the row sums of the grounded inverse.
+
+    Returns:
+        (variances, log determinant of the reduced information matrix).
+    """
+    n = information.shape[0]
+    reduced = information[1:, 1:]
+    grounded_diagonal = np.zeros(n)
+    row_sums = np.zeros(n)
+    if n <= dense_limit:
+        # The factor replaces the dense matrix; with C = F^-T F^-1, diag(C) is the column
+        # sums of squares of F^-1, which is formed a block of columns at a time
+        factor = cholesky(reduced.toarray(order="F"), lower=True, overwrite_a=True, check_finite=False)
+        log_det = 2 * np.log(np.diag(factor)).sum()
+        for start in range(0, n - 1, block_size):
+            columns = np.arange(start, min(start + block_size, n - 1))
+            unit = np.zeros((n - 1, columns.size), order="F")
+            unit[columns, np.arange(columns.size)] = 1
+            inverse_columns = solve_triangular(factor, unit, lower=True, overwrite_b=True, check_finite=False)
+            grounded_diagonal[columns + 1] = (inverse_columns ** 2).sum(axis=0)
+        row_sums[1:] = cho_solve((factor, True), np.ones(n - 1), check_finite=False)
+    else:
+        lu = splu(reduced.tocsc(), permc_spec="MMD_AT_PLUS_A")
+        log_det = np.log(np.abs(lu.U.diagonal())).sum()
+        for start in range(0, n - 1, block_size):
+            columns = np.arange(start, min(start + block_size, n - 1))
+            unit = np.zeros((n - 1, columns.size))
+            unit[columns, np.arange(columns.size)] = 1
+            grounded_diagonal[columns + 1] = lu.solve(unit)[columns, np.arange(columns.size)]
+        row_sums[1:] = lu.solve(np.ones(n - 1))
+    total = row_sums.sum()
+    # Centring: P C P with P = I - 11'/n
+    return grounded_diagonal - 2 * row_sums / n + total / n**2, log_det
+
+def evaluate_design(counts, scores=None, target_se=None, block_size=256, dense_limit=DENSE_LIMIT):
+    """
+    Analytic efficiency of a schedule.
+
+    The efficiencies compare the design with a complete balanced design (every pair
+    equally often, equal scores) with the same number of trials; values above 1 mean
+    the design is more precise for its cost.
+
+    Args:
+        counts: Sparse symmetric comparison counts.
+        scores: Optional assumed scores.
+        target_se: Optional standard error every stimulus should reach.
+
+    Returns:
+        (summary dictionary, array of the expected standard error of every stimulus).
+    """
+    n = counts.shape[0]
+    n_trials = counts.sum() / 2
+    n_components, _ = connected_components(counts, directed=False)
+    summary = {
+        "n_stimuli": n,
+        "trials": int(n_trials),
+        "pairs_compared": int(counts.nnz // 2),
+        "pair_coverage": counts.nnz / (n * (n - 1)),
+        "min_comparisons": int(np.asarray(counts.sum(axis=1)).min()),
+        "components": n_components,
+        "connected": n_components == 1,
+    }
+    if n_components > 1:
+        # Scores of different components cannot be compared: the information is singular
+        summary.update(mean_se=np.inf, max_se=np.inf, a_criterion=np.inf, d_criterion=-np.inf,
+                       a_efficiency=0.0, d_efficiency=0.0)
+        return summary, np.full(n, np.inf)
+
+    variances, log_det = laplacian_pinv_diagonal(information_matrix(counts, scores), block_size, dense_limit)
+    variances = np.maximum(variances, 0)
+    se = np.sqrt(variances)
+
+    # Complete balanced design with the same trials: Laplacian w (nI - 11'), eigenvalue w n (n - 1 times)
+    pair_weight = 0.25 * n_trials / (n * (n - 1) / 2)
+    complete_trace = (n - 1) / (pair_weight * n)
+    complete_log_det = (n - 1) * np.log(pair_weight * n) - np.log(n)
+    summary.update(
+        mean_se=se.mean(),
+        max_se=se.max(),
+        a_criterion=variances.sum(),  # trace of the covariance (lower is better)
+        d_criterion=log_det / (n - 1),  # log determinant of the information per score (higher is better)
+        a_efficiency=complete_trace / variances.sum(),
+        d_efficiency=np.exp((log_det - complete_log_det) / (n - 1)),
+    )
+    if target_se is not None:
+        # Variances shrink in proportion to the number of trials
+        summary["trials_for_target_se"] = int(np.ceil(n_trials * se.max() ** 2 / target_se ** 2))
+    return summary, se
+
+def plan_trials(store, round_type):
+    """
+    All trials of one block type in the precomputed session plans.
+
+    Returns:
+        (stimulus file names, left indices, right indices).
+    """
+    left, right, stimuli = [], [], None
+    for participant_id in store.participant_ids():
+        plan = store.lookup(participant_id)
+        block = plan.block(round_type)
+        stimuli = plan.stimuli[block.stimulus_set]
+        trials = np.asarray(block.trials, dtype=int).reshape(-1, 2)
+        left.append(trials[:, 0])
+        right.append(trials[:, 1])
+    if stimuli is None:
+        raise ValueError(f"No session plans in {store.data_path}.")
+    return stimuli, np.concatenate(left), np.concatenate(right)
+
+def load_scores(path, stimuli):
+    """Assumed scores (a CSV with "stimulus" and "score" columns) in the order of the stimuli."""
+    if path is None:
+        return None
+    table = pd.read_csv(path).set_index("stimulus")["score"]
+    missing = [stimulus for stimulus in stimuli if stimulus not in table.index]
+    if missing:
+        raise ValueError(f"{path} has no score for {', '.join(missing[:5])}")
+    return table.loc[list(stimuli)].to_numpy(dtype=float)
+
+def main():
+    parser = argparse.ArgumentParser(description="Expected precision of pair schedules from the Fisher information.")
+    parser.add_argument("--plans", default=None,
+                        help="Evaluate the precomputed session plans at this path (e.g. plans/session_plans)")
+    parser.add_argument("--round-type", default="similarity", help="Block of the session plans to evaluate")
+    parser.add_argument("--scores", default=None, help="CSV with stimulus and score columns to assume (session plans)")
+    parser.add_argument("--stimuli", type=int, nargs="+", default=[20, 50], help="Numbers of stimuli (generated schedules)")
+    parser.add_argument("--judges", type=int, nargs="+", default=[40], help="Numbers of judges (generated schedules)")
+    parser.add_argument("--pair-repeats", type=int, nargs="+", default=[1], help="Repeats of the full design")
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.1, 0.25, 0.5],
+                        help="Trials per judge of incomplete designs, as a fraction of a full repeat")
+    parser.add_argument("--target-se", type=float, default=0.2, help="Standard error every stimulus should reach")
+    parser.add_argument("--seed", type=int, default=2025, help="Seed of the generated schedules")
+    parser.add_argument("--output", default="data/working", help="Folder for the result files")
+    args = parser.parse_args()
+
+    rows, standard_errors = [], []
+    if args.plans is not None:
+        start = time.perf_counter()
+        stimuli, left, right = plan_trials(SessionPlanStore(args.plans), args.round_type)
+        counts = comparison_counts(left, right, len(stimuli))
+        summary, se = evaluate_design(counts, load_scores(args.scores, stimuli), args.target_se)
+        rows.append({"design": f"plans:{args.round_type}", **summary, "seconds": time.perf_counter() - start})
+        standard_errors.append(pd.DataFrame({"design": rows[-1]["design"], "stimulus": stimuli, "se": se}))
+    else:
+        designs = []
+        for n_stimuli in args.stimuli:
+            for judges in args.judges:
+                designs += [Design("full", n_stimuli, judges, pair_repeats=r) for r in args.pair_repeats]
+                designs += [Design("incomplete", n_stimuli, judges, fraction=f) for f in args.fractions]
+        for design in designs:
+            start = time.perf_counter()
+            schedules = fixed_schedules(design, args.seed)
+            counts = comparison_counts(schedules[:, :, 0], schedules[:, :, 1], design.n_stimuli)
+            summary, se = evaluate_design(counts, target_se=args.target_se)
+            name = (f"{design.design} n={design.n_stimuli} judges={design.judges} "
+                    + (f"repeats={design.pair_repeats}" if design.design == "full" else f"fraction={design.fraction}"))
+            rows.append({"design": name, **summary, "seconds": time.perf_counter() - start})
+            standard_errors.append(pd.DataFrame({"design": name, "stimulus": np.arange(design.n_stimuli), "se": se}))
+
+    table = pd.DataFrame(rows)
+    os.makedirs(args.output, exist_ok=True)
+    table.to_csv(os.path.join(args.output, "design_efficiency.csv"), index=False)
+    pd.concat(standard_errors).to_csv(os.path.join(args.output, "design_efficiency_stimuli.csv"), index=False)
+
+    columns = ["design", "trials", "pair_coverage", "connected", "mean_se", "max_se",
+               "a_efficiency", "d_efficiency", "trials_for_target_se"]
+    print(table[columns].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"Saved to {os.path.join(args.output, 'design_efficiency.csv')} "
+          f"(standard error per stimulus in design_efficiency_stimuli.csv)")
+
+if __name__ == "__main__":
+    main()
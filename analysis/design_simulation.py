@@ -0,0 +1,281 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+import numpy as np
+import pandas as pd
+from bradley_terry import fit_bradley_terry, win_probabilities
+
+# The schedules are generated with the experiment's own scheduling code (python analysis/design_simulation.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from experiment.managers.plans import orient_pairs, schedule_pairs
+from experiment.utils.rng import RandomStreams
+
+@dataclass(frozen=True)
+class Design:
+    """A candidate design: how many trials each judge does and how the pairs are chosen"""
+    design: str  # "full", "incomplete" or "adaptive"
+    n_stimuli: int
+    judges: int
+    pair_repeats: int = 1  # full design: presentations of every pair in each orientation
+    fraction: float = 1.0  # incomplete/adaptive designs: trials per judge, as a fraction of one full repeat
+
+    @property
+    def trials_per_judge(self) -> int:
+        full = self.n_stimuli * (self.n_stimuli - 1)
+        if self.design == "full":
+            return full * self.pair_repeats
+        return max(1, int(round(self.fraction * full)))
+
+@dataclass(frozen=True)
+class Judges:
+    """The synthetic judges and latent scales"""
+    scale_sd: float = 1.0  # standard deviation of the true scores
+    noise: float = 1.0  # scale of the logistic choice noise (higher = less discriminating judges)
+    judge_sd: float = 0.3  # spread of the judges' discrimination (log scale)
+    position_bias: float = 0.0  # log-odds added in favour of the left image
+    lapse: float = 0.02  # probability of a random choice
+
+def judge_schedule(n_stimuli, pair_repeats, seed):
+    """
+    The trial order StimuliManager.generate_trials gives a judge with this seed.
+
+    Returns:
+        Array (trials, 2) of (left, right) stimulus indices.
+    """
+    streams = RandomStreams(seed)
+    pairs = orient_pairs(n_stimuli, streams.stream("pairs"))
+    return np.array(schedule_pairs(pairs, pair_repeats, streams.stream("order/similarity")))
+
+def fixed_schedules(design, seed):
+    """
+    Per-judge schedules of a full or incomplete design, shape (judges, trials, 2).
+
+    An incomplete design is the start of the full schedule (as when a block is cut
+    short by a trial cap), so every judge sees a different random subset of pairs.
+    """
+    repeats = design.pair_repeats if design.design == "full" else int(np.ceil(design.fraction))
+    return np.stack([
+        judge_schedule(design.n_stimuli, repeats, seed + judge)[:design.trials_per_judge]
+        for judge in range(design.judges)
+    ])
+
+def draw_judges(rng, batch, design, judges):
+    """Discrimination (batch, judges) of every judge, from the noise and the judge spread."""
+    return np.exp(rng.normal(0, judges.judge_sd, (batch, design.judges))) / judges.noise
+
+def simulate_wins(rng, true_scores, left, right, judge, discrimination, judges):
+    """
+    Let the judges choose and count the outcomes.
+
+    Args:
+        true_scores: Array (B, n) of latent scores.
+        left, right: Arrays (B, M) of the stimuli shown on each side of every trial.
+        judge: Array (B, M) or (M,) of the judge of every trial.
+        discrimination: Array (B, J) from draw_judges.
+
+    Returns:
+        Array (B, n, n) of win counts.
+    """
+    batch, n = true_scores.shape
+    rows = np.arange(batch)[:, None]
+    difference = np.take_along_axis(true_scores, left, 1) - np.take_along_axis(true_scores, right, 1)
+    logit = discrimination[rows, judge] * difference + judges.position_bias
+    p_left = judges.lapse / 2 + (1 - judges.lapse) / (1 + np.exp(-logit))
+    left_won = rng.random(left.shape) < p_left
+    winner = np.where(left_won, left, right)
+    loser = np.where(left_won, right, left)
+    cells = (rows * n + winner) * n + loser
+    return np.bincount(cells.ravel(), minlength=batch * n * n).reshape(batch, n, n).astype(float)
+
+def sample_pairs(rng, weights, size):
+    """
+    Draw `size` pairs per replicate with probability proportional to the weights.
+
+    Args:
+        weights: Array (B, P) of non-negative weights of the P pairs.
+
+    Returns:
+        Array (B, size) of pair indices.
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    cumulative /= cumulative[:, -1:]
+    # One sorted search over all replicates: replicate b occupies the interval [b, b + 1)
+    offsets = np.arange(weights.shape[0])[:, None]
+    targets = rng.random((weights.shape[0], size)) + offsets
+    indices = np.searchsorted((cumulative + offsets).ravel(), targets.ravel(), side="right")
+    return np.minimum(indices.reshape(targets.shape) - offsets * weights.shape[1], weights.shape[1] - 1)
+
+def simulate_adaptive(rng, true_scores, design, discrimination, judges, rounds):
+    """
+    Adaptive design: the trials are given out in rounds, and each round favours the
+    pairs whose outcome is most uncertain under the current fit (p(1 - p) largest)
+    and that were compared least often.
+    """
+    batch, n = true_scores.shape
+    first, second = np.triu_indices(n, 1)
+    wins = np.zeros((batch, n, n))
+    scores = np.zeros((batch, n))
+    per_round = np.diff(np.linspace(0, design.trials_per_judge, rounds + 1).round().astype(int))
+    for trials in per_round:
+        if trials == 0:
+            continue
+        comparisons = (wins + np.swapaxes(wins, 1, 2))[:, first, second]
+        probabilities = win_probabilities(scores)[:, first, second]
+        weights = probabilities * (1 - probabilities) / (1 + comparisons)
+        pairs = sample_pairs(rng, weights, trials * design.judges)
+        swap = rng.random(pairs.shape) < 0.5
+        left = np.where(swap, second[pairs], first[pairs])
+        right = np.where(swap, first[pairs], second[pairs])
+        judge = np.repeat(np.arange(design.judges), trials)
+        wins += simulate_wins(rng, true_scores, left, right, judge, discrimination, judges)
+        scores = fit_bradley_terry(wins, init=scores)
+    return wins
+
+def correlations(true_scores, fitted):
+    """Pearson correlation of every row of two arrays (B, n)."""
+    true_centred = true_scores - true_scores.mean(axis=1, keepdims=True)
+    fitted_centred = fitted - fitted.mean(axis=1, keepdims=True)
+    return (true_centred * fitted_centred).sum(axis=1) / np.sqrt(
+        (true_centred ** 2).sum(axis=1) * (fitted_centred ** 2).sum(axis=1))
+
+def _ranks(scores):
+    return np.argsort(np.argsort(scores, axis=1), axis=1).astype(float)
+
+def simulate_chunk(design, judges, seed_sequence, n_replicates, batch_size, rounds):
+    """
+    Simulate `n_replicates` studies of a design, `batch_size` at a time.
+
+    Returns:
+        Array (n_replicates, 2) of the Pearson and Spearman correlations between
+        the true and the fitted scores.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    if design.design != "adaptive":
+        schedules = fixed_schedules(design, int(rng.integers(2**31)))
+        judge = np.repeat(np.arange(design.judges), design.trials_per_judge)
+    results = []
+    for start in range(0, n_replicates, batch_size):
+        batch = min(batch_size, n_replicates - start)
+        true_scores = rng.normal(0, judges.scale_sd, (batch, design.n_stimuli))
+        discrimination = draw_judges(rng, batch, design, judges)
+        if design.design == "adaptive":
+            wins = simulate_adaptive(rng, true_scores, design, discrimination, judges, rounds)
+        else:
+            left = np.broadcast_to(schedules[:, :, 0].ravel(), (batch, judge.size))
+            right = np.broadcast_to(schedules[:, :, 1].ravel(), (batch, judge.size))
+            wins = simulate_wins(rng, true_scores, left, right, judge, discrimination, judges)
+        fitted = fit_bradley_terry(wins)
+        results.append(np.column_stack([
+            correlations(true_scores, fitted),
+            correlations(_ranks(true_scores), _ranks(fitted)),
+        ]))
+    return np.concatenate(results)
+
+def simulate_designs(designs, judges, n_replicates=500, seed=None, workers=None,
+                     chunk_size=50, batch_size=10, rounds=10):
+    """
+    Monte Carlo recovery of the true scale for every design.
+
+    Args:
+        designs: Designs to compare.
+        judges: The synthetic judges.
+        n_replicates: Simulated studies per design.
+        seed: Seed of the simulation.
+        workers: Number of worker processes (None for one per CPU).
+        chunk_size: Replicates per task sent to a worker.
+        batch_size: Replicates simulated and fitted together in one vectorized step.
+        rounds: Rounds of the adaptive designs.
+
+    Returns:
+        Dict of design -> array (n_replicates, 2) of Pearson and Spearman correlations.
+    """
+    tasks = []
+    for design in designs:
+        chunks = [chunk_size] * (n_replicates // chunk_size)
+        if n_replicates % chunk_size:
+            chunks.append(n_replicates % chunk_size)
+        tasks += [(design, size) for size in chunks]
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            (design, executor.submit(simulate_chunk, design, judges, s, size, batch_size, rounds))
+            for (design, size), s in zip(tasks, seeds)
+        ]
+        results = {}
+        for design, future in futures:
+            results.setdefault(design, []).append(future.result())
+    return {design: np.concatenate(chunks) for design, chunks in results.items()}
+
+def build_designs(args):
+    designs = []
+    for n_stimuli in args.stimuli:
+        for judges in args.judges:
+            if "full" in args.designs:
+                designs += [Design("full", n_stimuli, judges, pair_repeats=r) for r in args.pair_repeats]
+            for name in ("incomplete", "adaptive"):
+                if name in args.designs:
+                    designs += [Design(name, n_stimuli, judges, fraction=f) for f in args.fractions]
+    return designs
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pair schedules by simulating judges with known scales.")
+    parser.add_argument("--designs", nargs="+", default=["full", "incomplete", "adaptive"],
+                        choices=["full", "incomplete", "adaptive"])
+    parser.add_argument("--stimuli", type=int, nargs="+", default=[20, 50], help="Numbers of stimuli")
+    parser.add_argument("--judges", type=int, nargs="+", default=[40], help="Numbers of judges per study")
+    parser.add_argument("--pair-repeats", type=int, nargs="+", default=[1], help="Repeats of the full design")
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.1, 0.25, 0.5],
+                        help="Trials per judge of the incomplete and adaptive designs, as a fraction of a full repeat")
+    parser.add_argument("--replicates", type=int, default=500, help="Simulated studies per design")
+    parser.add_argument("--scale-sd", type=float, default=1.0, help="Standard deviation of the true scores")
+    parser.add_argument("--noise", type=float, default=1.0, help="Choice noise of the judges")
+    parser.add_argument("--judge-sd", type=float, default=0.3, help="Spread of the judges' discrimination (log scale)")
+    parser.add_argument("--position-bias", type=float, default=0.0, help="Log-odds in favour of the left image")
+    parser.add_argument("--lapse", type=float, default=0.02, help="Probability of a random choice")
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds of the adaptive designs")
+    parser.add_argument("--seconds-per-trial", type=float, default=2.5,
+                        help="Duration of a trial (fixation, choice and feedback), for the session length")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the simulation")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--output", default="data/working/design_simulation.csv")
+    args = parser.parse_args()
+
+    judges = Judges(args.scale_sd, args.noise, args.judge_sd, args.position_bias, args.lapse)
+    designs = build_designs(args)
+    start = time.perf_counter()
+    results = simulate_designs(designs, judges, args.replicates, args.seed, args.workers, rounds=args.rounds)
+
+    rows = []
+    for design in designs:
+        pearson, spearman = results[design].T
+        total = design.trials_per_judge * design.judges
+        rows.append({
+            **asdict(design),
+            "trials_per_judge": design.trials_per_judge,
+            "minutes_per_judge": design.trials_per_judge * args.seconds_per_trial / 60,
+            "total_trials": total,
+            "comparisons_per_stimulus": 2 * total / design.n_stimuli,
+            **asdict(judges),
+            "replicates": len(pearson),
+            "r_mean": pearson.mean(),
+            "r_sd": pearson.std(ddof=1),
+            "r_p05": np.percentile(pearson, 5),
+            "rho_mean": spearman.mean(),
+            "rho_p05": np.percentile(spearman, 5),
+        })
+    table = pd.DataFrame(rows)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index=False)
+
+    columns = ["design", "n_stimuli", "judges", "pair_repeats", "fraction", "trials_per_judge",
+               "minutes_per_judge", "r_mean", "r_p05", "rho_mean"]
+    print(table[columns].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"{len(designs)} designs x {args.replicates} replicates in {time.perf_counter() - start:.1f}s; "
+          f"saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from pairwise_data import COMBINED_DATA_PATH, load_trials, encode
+from bradley_terry import fit_bradley_terry
+
+def misfit(codes, residual_squared, variance, n_groups):
+    """
+    Infit and outfit mean squares per group, from per-observation residuals.
+
+    Args:
+        codes: Integer group code of every observation.
+        residual_squared: Squared residual of every observation.
+        variance: Model variance of every observation.
+        n_groups: Number of groups.
+
+    Returns:
+        (n, infit, outfit) arrays of length n_groups.
+    """
+    n = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        infit = np.bincount(codes, residual_squared, n_groups) / np.bincount(codes, variance, n_groups)
+        outfit = np.bincount(codes, residual_squared / variance, n_groups) / n
+    return n, infit, outfit
+
+def misfit_statistics(df, fast_rt=0.3):
+    """
+    Judge and stimulus misfit of the answered trials of one round type, in one vectorized pass.
+
+    Args:
+        df: Answered trials (from pairwise_data.load_trials) of one round type.
+        fast_rt: Reaction times below this (in seconds) count as fast guesses.
+
+    Returns:
+        (judges, stimuli) DataFrames with the infit and outfit mean squares, and for
+        judges their response-time profile and left-choice rate.
+    """
+    participants, stimuli, participant_codes, winner_codes, loser_codes = encode(df)
+    wins = np.zeros((len(stimuli), len(stimuli)))
+    np.add.at(wins, (winner_codes, loser_codes), 1)
+    scores = fit_bradley_terry(wins)
+
+    # The observed outcome is always 1 for the winner; its expected value is the model probability
+    expected = 1 / (1 + np.exp(scores[loser_codes] - scores[winner_codes]))
+    residual_squared = (1 - expected) ** 2
+    variance = expected * (1 - expected)
+
+    n, infit, outfit = misfit(participant_codes, residual_squared, variance, len(participants))
+    reaction_time = df["reaction_time"].to_numpy(dtype=float)
+    rt_groups = pd.Series(reaction_time).groupby(participant_codes)
+    judges = pd.DataFrame({
+        "participant_id": participants,
+        "n_trials": n,
+        "infit": infit,
+        "outfit": outfit,
+        "mean_rt": rt_groups.mean().to_numpy(),
+        "median_rt": rt_groups.median().to_numpy(),
+        "sd_rt": rt_groups.std().to_numpy(),
+        "fast_rate": np.bincount(participant_codes, reaction_time < fast_rt, len(participants)) / n,
+        "left_rate": np.bincount(participant_codes, df["response"].to_numpy() == "d", len(participants)) / n,
+    })
+
+    # Every trial counts for both of its stimuli
+    stimulus_codes = np.concatenate([winner_codes, loser_codes])
+    n, infit, outfit = misfit(stimulus_codes, np.tile(residual_squared, 2), np.tile(variance, 2), len(stimuli))
+    stimulus_table = pd.DataFrame({
+        "stimulus": stimuli,
+        "score": scores,
+        "n_comparisons": n,
+        "infit": infit,
+        "outfit": outfit,
+    })
+    return judges, stimulus_table
+
+def flag(table, threshold=None, n_sd=2.0):
+    """Rows whose infit exceeds `threshold`, or (by default) the mean plus `n_sd` standard deviations."""
+    if threshold is None:
+        threshold = table["infit"].mean() + n_sd * table["infit"].std()
+    return table["infit"] > threshold
+
+def main():
+    parser = argparse.ArgumentParser(description="Infit and outfit statistics per judge and per stimulus.")
+    parser.add_argument("--input", default=COMBINED_DATA_PATH, help="Combined trial data (from combine_data.py)")
+    parser.add_argument("--output", default="data/working", help="Folder for the result files")
+    parser.add_argument("--infit-threshold", type=float, default=None,
+                        help="Flag judges above this infit (default: mean + 2 SD per round type)")
+    parser.add_argument("--fast-rt", type=float, default=0.3, help="Reaction time (s) below which a response counts as fast")
+    args = parser.parse_args()
+
+    df = load_trials(args.input)
+    judge_tables, stimulus_tables = [], []
+    for round_type, round_df in df.groupby("round_type"):
+        judges, stimuli = misfit_statistics(round_df, args.fast_rt)
+        judges.insert(1, "round_type", round_type)
+        judges["flagged"] = flag(judges, args.infit_threshold)
+        stimuli.insert(0, "round_type", round_type)
+        stimuli["flagged"] = flag(stimuli)
+        judge_tables.append(judges)
+        stimulus_tables.append(stimuli)
+        print(f"{round_type}: {judges['flagged'].sum()} of {len(judges)} judges and "
+              f"{stimuli['flagged'].sum()} of {len(stimuli)} stimuli flagged")
+
+    os.makedirs(args.output, exist_ok=True)
+    judges = pd.concat(judge_tables, ignore_index=True)
+    judges.to_csv(os.path.join(args.output, "judge_misfit.csv"), index=False)
+    pd.concat(stimulus_tables, ignore_index=True).to_csv(os.path.join(args.output, "stimulus_misfit.csv"), index=False)
+
+    # Exclusion list for the --exclude option of the scoring scripts
+    excluded = judges[judges["flagged"]][["participant_id", "round_type", "infit", "outfit"]]
+    excluded.to_csv(os.path.join(args.output, "excluded_participants.csv"), index=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pandas as pd
+
+COMBINED_DATA_PATH = "data/working/combined_data.csv"
+
+def load_trials(path=COMBINED_DATA_PATH, exclude=None):
+    """
+    Load the combined trial data (written by combine_data.py) with one row per answered trial.
+
+    Adds the columns "winner" and "loser" (stimulus file names); missed trials are dropped.
+
+    Args:
+        path: Path to the combined CSV file.
+        exclude: Optional collection of (participant ID, round type) pairs to leave out
+            (from load_exclusions); a round type of None leaves the participant out of
+            every round.
+
+    Returns:
+        A DataFrame of answered trials.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found. Run analysis/combine_data.py first.")
+    df = pd.read_csv(path, dtype={"participant_id": str})
+    df = df[df["response"].isin(["d", "k"])].copy()
+    if exclude:
+        everywhere = {participant_id for participant_id, round_type in exclude if round_type is None}
+        per_round = {pair for pair in exclude if pair[1] is not None}
+        excluded = df["participant_id"].isin(everywhere)
+        if per_round:
+            excluded |= pd.MultiIndex.from_frame(df[["participant_id", "round_type"]]).isin(per_round)
+        df = df[~excluded]
+    left_won = df["response"] == "d"
+    df["winner"] = np.where(left_won, df["left_stimulus"], df["right_stimulus"])
+    df["loser"] = np.where(left_won, df["right_stimulus"], df["left_stimulus"])
+    return df.reset_index(drop=True)
+
+def load_exclusions(path):
+    """
+    Read the judges to exclude from a CSV with a "participant_id" column (e.g. from judge_misfit.py).
+
+    Judges are flagged per round, so with a "round_type" column a participant is only
+    left out of the rounds they are listed for; without it, out of every round.
+
+    Returns:
+        A set of (participant ID, round type or None) pairs.
+    """
+    if path is None:
+        return set()
+    table = pd.read_csv(path, dtype={"participant_id": str, "round_type": str})
+    if "round_type" not in table:
+        return {(participant_id, None) for participant_id in table["participant_id"]}
+    round_types = table["round_type"].where(table["round_type"].notna(), None)
+    return set(zip(table["participant_id"], round_types))
+
+def encode(df):
+    """
+    Integer codes for the participants and stimuli of a set of trials.
+
+    Returns:
+        (participants, stimuli, participant_codes, winner_codes, loser_codes), where
+        `participants` and `stimuli` are sorted arrays of the labels.
+    """
+    participants, participant_codes = np.unique(df["participant_id"].to_numpy(), return_inverse=True)
+    stimuli = np.unique(np.concatenate([df["winner"].to_numpy(), df["loser"].to_numpy()]))
+    winner_codes = np.searchsorted(stimuli, df["winner"].to_numpy())
+    loser_codes = np.searchsorted(stimuli, df["loser"].to_numpy())
+    return participants, stimuli, participant_codes, winner_codes, loser_codes
+
+def participant_win_matrices(df):
+    """
+    Stack every participant's comparison counts into one array.
+
+    Returns:
+        (participants, stimuli, wins), where wins[p, i, j] is how often participant p
+        chose stimulus i over stimulus j.
+    """
+    participants, stimuli, participant_codes, winner_codes, loser_codes = encode(df)
+    wins = np.zeros((len(participants), len(stimuli), len(stimuli)))
+    np.add.at(wins, (participant_codes, winner_codes, loser_codes), 1)
+    return participants, stimuli, wins
@@ -0,0 +1,63 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from pairwise_data import COMBINED_DATA_PATH, load_trials, load_exclusions, participant_win_matrices
+from bradley_terry import fit_bradley_terry, pooled_pseudo_counts, standard_errors
+
+def participant_scores(participant_wins, shrinkage=1.0, batch_size=500):
+    """
+    Fit a Bradley-Terry scale for every participant at once.
+
+    Args:
+        participant_wins: Array (P, n, n) of per-participant win counts.
+        shrinkage: Virtual comparisons per pair drawn toward the pooled scale (0 for none).
+        batch_size: Participants fitted together in one vectorized fit (bounds the memory use).
+
+    Returns:
+        (pooled_scores, scores, standard_errors) with shapes (n,), (P, n) and (P, n).
+    """
+    pooled_scores = fit_bradley_terry(participant_wins.sum(axis=0))
+    prior = pooled_pseudo_counts(pooled_scores, shrinkage) if shrinkage > 0 else 0
+    scores = np.empty(participant_wins.shape[:2])
+    errors = np.empty(participant_wins.shape[:2])
+    for start in range(0, len(participant_wins), batch_size):
+        batch = participant_wins[start:start + batch_size] + prior
+        scores[start:start + batch_size] = fit_bradley_terry(batch, init=pooled_scores)
+        errors[start:start + batch_size] = standard_errors(batch, scores[start:start + batch_size])
+    return pooled_scores, scores, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Individual Bradley-Terry scales per participant.")
+    parser.add_argument("--input", default=COMBINED_DATA_PATH, help="Combined trial data (from combine_data.py)")
+    parser.add_argument("--output", default="data/working/participant_scores.csv", help="Output CSV file")
+    parser.add_argument("--shrinkage", type=float, default=1.0,
+                        help="Virtual comparisons per pair toward the pooled scale (0 for independent fits)")
+    parser.add_argument("--exclude", default=None, help="CSV of judges to leave out (participant_id and optionally round_type columns)")
+    args = parser.parse_args()
+
+    df = load_trials(args.input, exclude=load_exclusions(args.exclude))
+    tables = []
+    for round_type, round_df in df.groupby("round_type"):
+        participants, stimuli, participant_wins = participant_win_matrices(round_df)
+        pooled_scores, scores, errors = participant_scores(participant_wins, args.shrinkage)
+
+        # One row per participant and stimulus
+        n_participants, n_stimuli = scores.shape
+        tables.append(pd.DataFrame({
+            "participant_id": np.repeat(participants, n_stimuli),
+            "round_type": round_type,
+            "stimulus": np.tile(stimuli, n_participants),
+            "score": scores.ravel(),
+            "se": errors.ravel(),
+            "pooled_score": np.tile(pooled_scores, n_participants),
+            "wins": participant_wins.sum(axis=2).ravel(),
+            "comparisons": (participant_wins.sum(axis=2) + participant_wins.sum(axis=1)).ravel(),
+        }))
+        print(f"{round_type}: fitted {n_participants} participants x {n_stimuli} stimuli")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    pd.concat(tables, ignore_index=True).to_csv(args.output, index=False)
+
+if __name__ == "__main__":
+    main()
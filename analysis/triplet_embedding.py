@@ -0,0 +1,175 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pairwise_data import COMBINED_DATA_PATH, load_trials, load_exclusions
+
+def load_triplets(df, reference=None):
+    """
+    (reference, closer, farther) triplets of similarity trials, as integer codes.
+
+    Args:
+        df: Answered trials (from pairwise_data.load_trials).
+        reference: Reference file name for trials saved without a "reference_stimulus"
+            (sessions recorded before it was stored per trial).
+
+    Returns:
+        (items, triplets): sorted item names (references and comparison stimuli) and an
+        integer array (T, 3) of (reference, closer, farther) codes.
+    """
+    references = df["reference_stimulus"] if "reference_stimulus" in df else pd.Series(np.nan, index=df.index)
+    if reference is not None:
+        references = references.fillna(reference)
+    if references.isna().any():
+        raise ValueError("Some trials have no reference stimulus; pass the reference file name with --reference.")
+    columns = np.column_stack([references.to_numpy(), df["winner"].to_numpy(), df["loser"].to_numpy()])
+    items, codes = np.unique(columns.astype(str), return_inverse=True)
+    return items, codes.reshape(-1, 3)
+
+def tste_loss_and_gradient(embedding, triplets, alpha, regularization):
+    """
+    t-STE loss (mean negative log-likelihood plus L2 penalty) and its gradient.
+
+    The probability that the closer item is judged closer to the reference is
+    t(r, c) / (t(r, c) + t(r, f)), with the Student-t kernel
+    t(x, y) = (1 + |x - y|^2 / alpha) ^ (-(alpha + 1) / 2).
+
+    Args:
+        embedding: Array (N, d) of item coordinates.
+        triplets: Integer array (T, 3) of (reference, closer, farther) codes.
+        alpha: Degrees of freedom of the Student-t kernel.
+        regularization: Weight of the L2 penalty on the coordinates.
+
+    Returns:
+        (loss, gradient) with the gradient of shape (N, d).
+    """
+    reference, closer, farther = embedding[triplets[:, 0]], embedding[triplets[:, 1]], embedding[triplets[:, 2]]
+    to_closer = reference - closer
+    to_farther = reference - farther
+    kernel_closer = 1 / (1 + (to_closer ** 2).sum(axis=1) / alpha)
+    kernel_farther = 1 / (1 + (to_farther ** 2).sum(axis=1) / alpha)
+    exponent = (alpha + 1) / 2
+    t_closer = kernel_closer ** exponent
+    t_farther = kernel_farther ** exponent
+    probability = t_closer / (t_closer + t_farther)
+
+    n_triplets = len(triplets)
+    loss = -np.log(np.maximum(probability, 1e-300)).mean() + regularization * (embedding ** 2).sum()
+
+    # d(-log p) / d(squared distance) is (1 - p) * (alpha + 1) / alpha * kernel / 2, times 2 * difference
+    scale = ((1 - probability) * (alpha + 1) / alpha / n_triplets)[:, None]
+    gradient_closer = scale * kernel_closer[:, None] * to_closer
+    gradient_farther = scale * kernel_farther[:, None] * to_farther
+    # Scatter the per-triplet gradients onto the items (bincount is much faster than np.add.at)
+    indices = triplets.T.ravel()
+    contributions = np.concatenate([gradient_closer - gradient_farther, -gradient_closer, gradient_farther])
+    n_items = len(embedding)
+    gradient = 2 * regularization * embedding
+    for dimension in range(embedding.shape[1]):
+        gradient[:, dimension] += np.bincount(indices, contributions[:, dimension], n_items)
+    return loss, gradient
+
+def fit_tste(triplets, n_items, dimensions=2, alpha=None, regularization=1e-4, epochs=300,
+             batch_size=None, learning_rate=10.0, momentum=0.9, seed=None):
+    """
+    Fit a t-STE embedding by (mini-batch) gradient descent with momentum.
+
+    Args:
+        triplets: Integer array (T, 3) of (reference, closer, farther) codes.
+        n_items: Number of items to embed.
+        dimensions: Dimensionality of the embedding.
+        alpha: Degrees of freedom of the Student-t kernel (default: dimensions - 1, at least 1).
+        regularization: Weight of the L2 penalty on the coordinates.
+        epochs: Passes over all triplets.
+        batch_size: Triplets per gradient step (None for full-batch steps).
+        learning_rate: Step size.
+        momentum: Momentum of the updates.
+        seed: Seed of the initialization and the mini-batch order.
+
+    Returns:
+        (embedding, loss): coordinates (n_items, dimensions) and the final full-data loss.
+    """
+    if alpha is None:
+        alpha = max(dimensions - 1, 1)
+    rng = np.random.default_rng(seed)
+    embedding = rng.normal(scale=1e-2, size=(n_items, dimensions))
+    velocity = np.zeros_like(embedding)
+    batch_size = batch_size or len(triplets)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(triplets)) if batch_size < len(triplets) else np.arange(len(triplets))
+        for start in range(0, len(triplets), batch_size):
+            batch = triplets[order[start:start + batch_size]]
+            _, gradient = tste_loss_and_gradient(embedding, batch, alpha, regularization)
+            velocity = momentum * velocity - learning_rate * gradient
+            embedding += velocity
+
+    loss, _ = tste_loss_and_gradient(embedding, triplets, alpha, regularization)
+    return embedding, loss
+
+def triplet_accuracy(embedding, triplets):
+    """Share of triplets whose closer item is nearer to the reference in the embedding."""
+    reference = embedding[triplets[:, 0]]
+    to_closer = ((reference - embedding[triplets[:, 1]]) ** 2).sum(axis=1)
+    to_farther = ((reference - embedding[triplets[:, 2]]) ** 2).sum(axis=1)
+    return float((to_closer < to_farther).mean())
+
+def fit_restarts(triplets, n_items, restarts=8, seed=None, workers=None, **options):
+    """
+    Fit t-STE from several random initializations in parallel and keep the best fit.
+
+    Args:
+        triplets: Integer array (T, 3) of (reference, closer, farther) codes.
+        n_items: Number of items to embed.
+        restarts: Number of random initializations.
+        seed: Seed from which the restarts' seeds are derived.
+        workers: Number of worker processes (None for one per CPU).
+        **options: Passed on to fit_tste.
+
+    Returns:
+        (embedding, losses): the embedding with the lowest loss, and the loss of every restart.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(restarts)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fit_tste, triplets, n_items, seed=s, **options) for s in seeds]
+        fits = [future.result() for future in futures]
+    losses = [loss for _, loss in fits]
+    return fits[int(np.argmin(losses))][0], losses
+
+def main():
+    parser = argparse.ArgumentParser(description="t-STE embedding of the similarity trials as (reference, closer, farther) triplets.")
+    parser.add_argument("--input", default=COMBINED_DATA_PATH, help="Combined trial data (from combine_data.py)")
+    parser.add_argument("--output", default="data/working/triplet_embedding.csv", help="Output CSV file")
+    parser.add_argument("--round-type", default="similarity", help="Round type whose trials are triplets")
+    parser.add_argument("--reference", default=None, help="Reference file name for trials saved without one")
+    parser.add_argument("--dimensions", type=int, default=2, help="Dimensionality of the embedding")
+    parser.add_argument("--epochs", type=int, default=300, help="Passes over all triplets")
+    parser.add_argument("--batch-size", type=int, default=None, help="Triplets per gradient step (default: all)")
+    parser.add_argument("--learning-rate", type=float, default=10.0, help="Step size of the gradient descent")
+    parser.add_argument("--restarts", type=int, default=8, help="Random initializations, fitted in parallel")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the initializations")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--exclude", default=None, help="CSV of judges to leave out (participant_id and optionally round_type columns)")
+    args = parser.parse_args()
+
+    df = load_trials(args.input, exclude=load_exclusions(args.exclude))
+    df = df[df["round_type"] == args.round_type]
+    items, triplets = load_triplets(df, args.reference)
+    embedding, losses = fit_restarts(
+        triplets, len(items), args.restarts, args.seed, args.workers,
+        dimensions=args.dimensions, epochs=args.epochs,
+        batch_size=args.batch_size, learning_rate=args.learning_rate
+    )
+
+    table = pd.DataFrame(embedding, columns=[f"dim_{d}" for d in range(1, args.dimensions + 1)])
+    table.insert(0, "stimulus", items)
+    table.insert(1, "is_reference", np.isin(np.arange(len(items)), triplets[:, 0]))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index=False)
+    print(f"{len(triplets)} triplets, {len(items)} items; best loss {min(losses):.4f} "
+          f"(restarts: {', '.join(f'{loss:.4f}' for loss in losses)}); "
+          f"triplet accuracy {triplet_accuracy(embedding, triplets):.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import contextlib
+import io
+import itertools
+import os
+import random
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any
+import numpy as np
+
+# The benchmarks import the experiment package and the analysis scripts (python benchmarks/run_benchmarks.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "analysis"))
+
+from experiment.core import Stimulus, Comparison, Trial, Participant, OnlineScores
+from experiment.managers.stimuli import StimuliManager
+from experiment.managers.data import DataManager
+from experiment.managers.session_log import SessionLog
+from experiment.utils.rng import RandomStreams
+from bradley_terry import fit_bradley_terry
+import combine_data
+
+@dataclass
+class Case:
+    """One benchmark at one point of its sweep"""
+    name: str
+    params: Dict[str, int]
+    setup: Callable[[], Callable[[], Any]]  # prepares the data (untimed) and returns the timed function
+
+    @property
+    def key(self) -> str:
+        if not self.params:
+            return self.name
+        return self.name + "[" + ",".join(f"{k}={v}" for k, v in self.params.items()) + "]"
+
+# ----------------------------------------------------------------------
+# Synthetic data (no window, no image files; PsychoPy must be installed)
+# ----------------------------------------------------------------------
+def make_stimuli(n_stimuli: int) -> List[Stimulus]:
+    return [
+        Stimulus(f"{i:07d}.png", f"synthetic/{i:07d}.png", orig_width=800, orig_height=600, create_texture=False)
+        for i in range(n_stimuli)
+    ]
+
+def make_manager(n_stimuli: int) -> StimuliManager:
+    manager = StimuliManager(comparison_dir="synthetic")
+    manager.stimuli = make_stimuli(n_stimuli)
+    manager.reference = Stimulus("reference.png", "synthetic/reference.png",
+                                 orig_width=800, orig_height=600, create_texture=False)
+    return manager
+
+def make_trials(n_trials: int, n_stimuli: int = 40, seed: int = 0) -> List[Trial]:
+    """Answered similarity trials between random pairs, with some missed ones."""
+    rng = random.Random(seed)
+    stimuli = make_stimuli(n_stimuli)
+    reference = Stimulus("reference.png", "synthetic/reference.png",
+                         orig_width=800, orig_height=600, create_texture=False)
+    trials = []
+    for trial_num in range(1, n_trials + 1):
+        left, right = rng.sample(stimuli, 2)
+        missed = rng.random() < 0.02
+        trials.append(Trial(
+            trial_num=trial_num,
+            pair=Comparison(left_stimuli=left, right_stimuli=right),
+            round_type="similarity",
+            reference=reference,
+            response="missed" if missed else rng.choice("dk"),
+            reaction_time=None if missed else rng.uniform(0.3, 4.0),
+        ))
+    return trials
+
+def make_participant(n_trials: int, participant_id: str = "bench") -> Participant:
+    participant = Participant(participant_id, start_time="20250101_120000", seed=1)
+    participant.demographics = {"gender": "female", "age": 30, "nationality": "Dutch",
+                                "diet": "omnivore", "eat_frequency": "weekly"}
+    participant.trials = make_trials(n_trials)
+    return participant
+
+def write_session_logs(folder: str, n_sessions: int, trials_per_session: int):
+    """Complete session logs of `n_sessions` participants in folder/data."""
+    os.makedirs(os.path.join(folder, "data"), exist_ok=True)
+    for session in range(n_sessions):
+        participant = make_participant(trials_per_session, f"{10001 + session}")
+        log = SessionLog(os.path.join(folder, "data", f"{participant._get_datafile_name()}.jsonl"))
+        log.append("session_start", participant_id=participant.participant_id,
+                   start_time=participant.start_time, seed=participant.seed, rng_streams={})
+        for trial in participant.trials:
+            log.append("trial", trial=trial.to_json())
+        for name, value in participant.demographics.items():
+            log.append("demographic", name=name, value=value)
+        log.finalize(end_time="20250101_123000", duration=1800.0, n_trials=trials_per_session)
+
+def make_wins(n_participants: int, n_stimuli: int, trials_per_participant: int = 400, seed: int = 0) -> np.ndarray:
+    """Win matrices of judges following a Bradley-Terry model, shape (participants, n, n)."""
+    rng = np.random.default_rng(seed)
+    strengths = rng.normal(0, 1, n_stimuli)
+    wins = np.zeros((n_participants, n_stimuli, n_stimuli))
+    for participant in range(n_participants):
+        i = rng.integers(0, n_stimuli, trials_per_participant)
+        j = (i + rng.integers(1, n_stimuli, trials_per_participant)) % n_stimuli
+        first = rng.random(trials_per_participant) < 1 / (1 + np.exp(strengths[j] - strengths[i]))
+        np.add.at(wins[participant], (np.where(first, i, j), np.where(first, j, i)), 1)
+    return wins
+
+# ----------------------------------------------------------------------
+# Benchmarks (each factory takes the sweep parameters and returns the timed function)
+# ----------------------------------------------------------------------
+def bench_generate_trials(stimuli: int):
+    manager = make_manager(stimuli)
+
+    def run():
+        manager.pairs = []  # pairs are cached after the first call
+        return manager.generate_trials("similarity", streams=RandomStreams(2025))
+    return run
+
+def bench_comparison_hash(pairs: int):
+    rng = random.Random(0)
+    stimuli = make_stimuli(60)
+    sides = [rng.sample(stimuli, 2) for _ in range(pairs)]
+    return lambda: len({Comparison(left_stimuli=left, right_stimuli=right) for left, right in sides})
+
+def bench_order_indicator(pairs: int):
+    comparisons = [trial.pair for trial in make_trials(pairs)]
+    return lambda: [comparison.order_indicator for comparison in comparisons]
+
+def bench_participant_to_json(trials: int):
+    participant = make_participant(trials)
+    return participant.to_json
+
+def bench_save_trial(trials: int):
+    """Save every trial of a session as it happens (session log, CSV)."""
+    trial_list = make_trials(trials)
+    counter = itertools.count()
+
+    def run():
+        data_manager = DataManager(Participant(f"save_trial_{next(counter)}", start_time="20250101_120000"))
+        for trial in trial_list:
+            data_manager.save_trial(trial)
+        data_manager.log.close()
+    return run
+
+def bench_save_all():
+    """
+    Open the session log of a participant and finalize it (a single case: the trials
+    are already in the log, so only the closing line is written, whatever their number).
+    """
+    trial_list = make_trials(500)
+    counter = itertools.count()
+
+    def run():
+        participant = Participant(f"save_all_{next(counter)}", start_time="20250101_120000")
+        participant.trials = list(trial_list)
+        participant.end_time, participant.duration = "20250101_123000", 1800.0
+        DataManager(participant).save_all()
+    return run
+
+def bench_combine_data(sessions: int):
+    folder = os.path.abspath(f"combine_data_{sessions}")
+    write_session_logs(folder, sessions, trials_per_session=300)
+
+    def run():
+        previous = os.getcwd()
+        os.chdir(folder)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                combine_data.main()
+        finally:
+            os.chdir(previous)
+    return run
+
+def bench_online_scores(trials: int):
+    trial_list = make_trials(trials)
+    filenames = sorted({s.filename for t in trial_list for s in (t.pair.left_stimuli, t.pair.right_stimuli)})
+
+    def run():
+        scores = OnlineScores(filenames)
+        for trial in trial_list:
+            scores.update(trial)
+        return scores.summary()
+    return run
+
+def bench_fit_bradley_terry(participants: int, stimuli: int):
+    wins = make_wins(participants, stimuli)
+    return lambda: fit_bradley_terry(wins)
+
+# name -> (factory, sweep of each parameter, sweep of the --quick run)
+BENCHMARKS = {
+    "generate_trials": (bench_generate_trials, {"stimuli": [20, 60, 120]}, {"stimuli": [20]}),
+    "comparison_hash": (bench_comparison_hash, {"pairs": [1000, 10000]}, {"pairs": [1000]}),
+    "order_indicator": (bench_order_indicator, {"pairs": [1000, 10000]}, {"pairs": [1000]}),
+    "participant_to_json": (bench_participant_to_json, {"trials": [500, 2000, 8000]}, {"trials": [500]}),
+    "save_trial": (bench_save_trial, {"trials": [100, 500, 2000]}, {"trials": [100]}),
+    "save_all": (bench_save_all, {}, {}),
+    "combine_data": (bench_combine_data, {"sessions": [10, 50, 200]}, {"sessions": [10]}),
+    "online_scores": (bench_online_scores, {"trials": [500, 2000, 8000]}, {"trials": [500]}),
+    "fit_bradley_terry": (
+        bench_fit_bradley_terry,
+        {"participants": [1, 50], "stimuli": [20, 60]},
+        {"participants": [1], "stimuli": [20]},
+    ),
+}
+
+def build_cases(quick: bool = False) -> List[Case]:
+    """Every benchmark at every point of its sweep (the smallest points with `quick`)."""
+    cases = []
+    for name, (factory, sweep, quick_sweep) in BENCHMARKS.items():
+        sweep = quick_sweep if quick else sweep
+        for values in itertools.product(*sweep.values()):
+            params = dict(zip(sweep, values))
+            cases.append(Case(name, params, lambda factory=factory, params=params: factory(**params)))
+    return cases
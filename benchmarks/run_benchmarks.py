@@ -0,0 +1,183 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+from cases import ROOT, build_cases
+from experiment.managers.machine_profile import machine_name
+
+BASELINE_DIR = os.path.join(ROOT, "benchmarks", "baselines")
+# Allowed slowdown and memory growth relative to the baseline (stored with each baseline)
+DEFAULT_THRESHOLDS = {"time": 0.25, "memory": 0.10}
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DIFFERENCE = 5e-6  # seconds
+MIN_MEMORY_DIFFERENCE = 16.0  # KB
+# Cases faster than SHORT_CASE_TIME vary by more than the relative threshold from run
+# to run (scheduling, frequency scaling), so they must also be this much slower
+SHORT_CASE_TIME = 10e-3  # seconds
+SHORT_CASE_MIN_DIFFERENCE = 0.5e-3  # seconds
+
+def measure(function: Callable[[], Any], repeats: int = 5, min_repeat_time: float = 0.05) -> Dict[str, float]:
+    """
+    Time a function and measure the peak memory it allocates.
+
+    The number of calls per repeat grows until a repeat takes at least
+    `min_repeat_time`; the per-call times of the repeats are summarized.
+    The peak is measured with tracemalloc in a separate call, so it does
+    not slow down the timed calls.
+    """
+    number = 1
+    while True:
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_repeat_time:
+            break
+        number *= max(2, min(10, int(min_repeat_time / max(elapsed, 1e-9)) + 1))
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_kb": peak / 1024,
+        "number": number,
+        "repeats": repeats,
+    }
+
+def compare(results: Dict[str, Dict], baseline: Dict, thresholds: Dict[str, float]) -> List[str]:
+    """
+    Regressions of the results against a baseline.
+
+    A benchmark regresses when its median time over the repeats is more than
+    `thresholds["time"]` (a fraction) above the baseline's, and at least
+    MIN_TIME_DIFFERENCE (SHORT_CASE_MIN_DIFFERENCE for cases shorter than
+    SHORT_CASE_TIME) slower; or when its peak memory is more than
+    `thresholds["memory"]` above the baseline's. Benchmarks missing from the
+    baseline are skipped.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        min_difference = SHORT_CASE_MIN_DIFFERENCE if base["median_s"] < SHORT_CASE_TIME else MIN_TIME_DIFFERENCE
+        if (result["median_s"] > base["median_s"] * (1 + thresholds["time"])
+                and result["median_s"] - base["median_s"] > min_difference):
+            regressions.append(f"{key}: {format_time(result['median_s'])} (baseline "
+                               f"{format_time(base['median_s'])}, +{result['median_s'] / base['median_s'] - 1:.0%})")
+        if (result["peak_kb"] > base["peak_kb"] * (1 + thresholds["memory"])
+                and result["peak_kb"] - base["peak_kb"] > MIN_MEMORY_DIFFERENCE):
+            regressions.append(f"{key}: peak {result['peak_kb']:.0f} KB (baseline {base['peak_kb']:.0f} KB)")
+    return regressions
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds * 1e9:.3g} ns"
+
+def run_cases(pattern: Optional[str], quick: bool, repeats: int) -> Dict[str, Dict]:
+    """Run the benchmarks (in a temporary folder, since saving writes to data/)."""
+    results = {}
+    previous = os.getcwd()
+    folder = tempfile.mkdtemp(prefix="benchmarks_")
+    os.chdir(folder)
+    try:
+        for case in build_cases(quick):
+            if pattern and pattern not in case.key:
+                continue
+            result = measure(case.setup(), repeats)
+            result["params"] = case.params
+            results[case.key] = result
+            print(f"{case.key:<50} {format_time(result['min_s']):>10} {format_time(result['median_s']):>10} "
+                  f"{result['peak_kb']:>10.0f} KB")
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+if __name__ == '__main__':
+    # Run from the repository root:
+    #   python benchmarks/run_benchmarks.py --save   (record the baseline of this machine)
+    #   python benchmarks/run_benchmarks.py          (compare with it)
+    parser = argparse.ArgumentParser(description="Benchmark the data and scheduling hot paths.")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="Only the smallest size of each sweep")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", default=None,
+                        help=f"Baseline file (default: {os.path.relpath(BASELINE_DIR, ROOT)}/<machine>.json)")
+    parser.add_argument("--save", action="store_true", help="Write the results as the baseline")
+    parser.add_argument("--time-threshold", type=float, default=None, help="Allowed slowdown, e.g. 0.25")
+    parser.add_argument("--memory-threshold", type=float, default=None, help="Allowed memory growth, e.g. 0.1")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{machine_name()}.json")
+    print(f"{'benchmark':<50} {'min':>10} {'median':>10} {'peak':>13}")
+    results = run_cases(args.filter, args.quick, args.repeats)
+    report = {
+        "machine": machine_name(),
+        "created": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "python": platform.python_version(),
+        "thresholds": dict(DEFAULT_THRESHOLDS),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save:
+        if os.path.exists(baseline_path):
+            # Keep the thresholds and the benchmarks that were not run this time
+            with open(baseline_path, 'r') as f:
+                previous = json.load(f)
+            report["thresholds"] = previous.get("thresholds", report["thresholds"])
+            report["results"] = {**previous["results"], **results}
+        for name, value in (("time", args.time_threshold), ("memory", args.memory_threshold)):
+            if value is not None:
+                report["thresholds"][name] = value
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved the baseline to {baseline_path}")
+        sys.exit(0)
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --save to record one.")
+        sys.exit(0)
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get("thresholds", {})}
+    if args.time_threshold is not None:
+        thresholds["time"] = args.time_threshold
+    if args.memory_threshold is not None:
+        thresholds["memory"] = args.memory_threshold
+    regressions = compare(results, baseline, thresholds)
+    if regressions:
+        print(f"Regressions against {baseline_path}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions against {baseline_path} "
+          f"(time +{thresholds['time']:.0%}, memory +{thresholds['memory']:.0%}).")
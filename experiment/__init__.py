@@ -1,6 +1,23 @@
-# from .precompute import *
-from .core import *
-from .interface import *
-from .managers import *
-from .questions import *
-from .utils import *
+# The experiment package loads lazily: `from experiment import Display` only imports
+# experiment/interface/display.py (and what it needs), so tools that never open a
+# window (precompute scripts, analysis) do not pull in PsychoPy, PIL or PyMuPDF.
+import importlib
+
+_SUBPACKAGES = ["core", "interface", "managers", "questions", "utils", "precompute"]
+
+def __getattr__(name):
+    for subpackage in _SUBPACKAGES:
+        module = importlib.import_module(f"{__name__}.{subpackage}")
+        if name == subpackage:
+            return module
+        if name in module._EXPORTS:
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    names = set(globals()) | set(_SUBPACKAGES)
+    for subpackage in _SUBPACKAGES:
+        names |= set(importlib.import_module(f"{__name__}.{subpackage}")._EXPORTS)
+    return sorted(names)
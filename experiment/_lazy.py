@@ -0,0 +1,32 @@
+import importlib
+import sys
+from typing import Dict, List
+
+def lazy_exports(package: str, exports: Dict[str, str], submodules: List[str]):
+    """
+    Make a package load its submodules on first attribute access (PEP 562).
+
+    Importing the package itself is then cheap: e.g. `experiment.managers.plans`
+    can be used without pulling in PsychoPy through `experiment.managers.stimuli`.
+
+    Args:
+        package: The package name (`__name__`).
+        exports: Public name -> submodule that defines it.
+        submodules: All submodules of the package.
+
+    Returns:
+        The package's (__getattr__, __dir__, __all__).
+    """
+    def __getattr__(name):
+        if name in submodules:
+            return importlib.import_module(f"{package}.{name}")
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f"{package}.{exports[name]}"), name)
+        setattr(sys.modules[package], name, value)  # later lookups skip __getattr__
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports) | set(submodules))
+
+    return __getattr__, __dir__, sorted(exports)
@@ -1,5 +1,19 @@
-from .stimulus import *
-from .comparison import *
-from .trial import *
-from .participant import *
-from .block import *
+# Submodules are imported on first use (see experiment/_lazy.py)
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    "Stimulus": "stimulus",
+    "Comparison": "comparison",
+    "Trial": "trial",
+    "Participant": "participant",
+    "KeyboardResponder": "responses",
+    "ReplayResponder": "responses",
+    "OnlineScores": "scoring",
+    "StoppingPolicy": "stopping",
+    "StoppingCheck": "stopping",
+    "BlockConfig": "block",
+    "Block": "block",
+}
+_SUBMODULES = ["stimulus", "comparison", "trial", "participant", "responses", "scoring", "stopping", "block"]
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, _SUBMODULES)
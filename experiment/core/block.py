@@ -1,8 +1,15 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Dict
 from psychopy import visual, core, event
 from .trial import Trial
+from .responses import KeyboardResponder
+from .scoring import OnlineScores
+from .stopping import StoppingPolicy
+from ..interface.render_loop import RenderLoop
 from ..managers import DataManager
+from ..managers.plans import compute_break_points
+from ..utils.tracing import TRACER, traced
+from ..utils.realtime import REALTIME
 
 @dataclass
 class BlockConfig:
@@ -26,18 +33,34 @@ class Block:
         window: visual.Window,
         trials: List[Trial],
         config: Optional[BlockConfig] = None,
-        data_manager: Optional[DataManager]=None
+        data_manager: Optional[DataManager]=None,
+        break_points: Optional[List[int]] = None,
+        responder: Optional[KeyboardResponder] = None
     ):
         self.window = window
         self.trials = trials
         self.config = config or BlockConfig()
         self.data_manager = data_manager
+        self.responder = responder or KeyboardResponder() # a ReplayResponder replays a saved session
         self.clock = core.Clock()
 
         # Initialize block-level properties
         self.n_trials = len(trials)
-        self.n_blocks = self.config.num_breaks + 1
-        self.block_size = self.n_trials // self.n_blocks if self.n_blocks > 1 else self.n_trials
+        # Trial numbers after which a break is shown (precomputed plans bring their own)
+        if break_points is None:
+            break_points = compute_break_points(self.n_trials, self.config.num_breaks)
+        self.break_points = list(break_points)
+        self.n_blocks = len(self.break_points) + 1
+
+        # Running score estimates and quality statistics (see OnlineScores)
+        self.round_type = trials[0].round_type if trials else None
+        stimuli = {
+            stimulus.filename
+            for trial in trials
+            for stimulus in (trial.pair.left_stimuli, trial.pair.right_stimuli)
+        }
+        self.scores = OnlineScores(sorted(stimuli))
+        self.completed = 0  # trials already done before the block was (re)started
         
         # Initialize static stimuli
         self._init_static_stimuli()
@@ -200,35 +223,42 @@ class Block:
             pos=(0, -0.2)  # Position below the break text
         )
         
-        # Start countdown
-        timer = core.CountdownTimer(self.config.break_wait_time)
-        
-        while remaining_time > 0:
-            # Update remaining time
-            remaining_time = int(timer.getTime())
-            
-            # Update break text
-            break_text.text = (
-                f"Block {current_block} of {self.n_blocks} completed.\n\n"
-                f"Please take a short break.\n"
-                "You will be able to continue after 20 seconds."
-            )
-            
-            # Update countdown text
-            if remaining_time > 0:
-                countdown_text.text = f"{remaining_time}"
-            
-            # Draw both text stimuli
+        # Collect garbage now rather than during the next trials
+        REALTIME.collect(2)
+
+        # Break text does not change during the countdown
+        break_text.text = (
+            f"Block {current_block} of {self.n_blocks} completed.\n\n"
+            f"Please take a short break.\n"
+            "You will be able to continue after 20 seconds."
+        )
+
+        def draw():
             break_text.draw()
             countdown_text.draw()
-            self.window.flip()
-            
-            # Check for escape key
-            if event.getKeys(keyList=['escape']):
-                core.quit()
+
+        # Start countdown (redrawn only when the displayed second changes)
+        timer = core.CountdownTimer(self.config.break_wait_time)
+        
+        with RenderLoop(self.window, "break_screen", draw) as loop:
+            while remaining_time > 0:
+                # Update remaining time
+                seconds = int(timer.getTime())
+                if seconds != remaining_time:
+                    remaining_time = seconds
+                    # Update countdown text
+                    if remaining_time > 0:
+                        countdown_text.text = f"{remaining_time}"
+                    loop.invalidate()
                 
-            # Brief pause to prevent excessive CPU usage
-            core.wait(0.1)
+                loop.render()
+                
+                # Check for escape key
+                if self.responder.escape_pressed():
+                    core.quit()
+                    
+                # Wait until the next poll (no redraw in between)
+                loop.sleep()
         
         # Show continue message
         break_text.text = (
@@ -243,18 +273,20 @@ class Block:
         self.window.flip()
         
         # Wait for space key
-        event.waitKeys(keyList=['space'])
+        self.responder.wait_continue(['space'])
 
     def _handle_response(self, trial: Trial, keys) -> bool:
         """Process response for a trial. Returns False if experiment should end."""
         if not keys:
             self.missed_message.draw()
             self.window.flip()
-            event.waitKeys(keyList=['space'])
+            self.responder.wait_continue(['space'])
             trial.response = "missed"
             return True
 
         key, rt = keys[0]
+        if self.data_manager is not None:
+            self.data_manager.log_event("key", round_type=trial.round_type, trial_num=trial.trial_num, key=key, rt=rt)
         if key == 'escape':
             return False
             
@@ -267,55 +299,111 @@ class Block:
         self._show_feedback(chosen_stim, trial)
         return True
 
-    def run(self) -> List[Trial]:
-        """Run all trials in the block and return completed trials"""
-        for trial_num, trial in enumerate(self.trials, 1):
-            # Show fixation
-            self.fixation.draw()
-            self.window.flip()
-            core.wait(0.5)
+    def restore(self, records: List[Dict]):
+        """
+        Mark the first trials as done, from the trial records of an interrupted session.
 
-            # Set up positions
-            positions = self._get_image_positions(trial.round_type)
-            trial.pair.left_stimuli.set_position(positions['left_image'])
-            trial.pair.right_stimuli.set_position(positions['right_image'])
-            
-            # Create and position text stimuli
-            text_stimuli = self._create_text_stimuli(positions, trial.round_type)
-
-            # Draw trial
-            self.prompt.draw()
-            if trial.reference and self.config.referant_present:
-                trial.reference.set_position(positions['reference_image'])
-                trial.reference.psychopy_stim.draw()
-                text_stimuli['reference'].draw()
-            trial.pair.left_stimuli.psychopy_stim.draw()
-            trial.pair.right_stimuli.psychopy_stim.draw()
-            text_stimuli['left'].draw()
-            text_stimuli['right'].draw()
-            self.window.flip()
+        `run` then continues with the next trial; the restored responses are
+        added to the participant and to the running scores.
 
-            # Collect response
-            self.clock.reset()
-            keys = event.waitKeys(
-                keyList=['d', 'k', 'escape'],
-                timeStamped=self.clock,
-                maxWait=self.config.skip_time_limit
-            )
+        Raises:
+            ValueError: If the records do not match the trials of the block.
+        """
+        for trial, record in zip(self.trials, records):
+            shown = (trial.pair.left_stimuli.filename, trial.pair.right_stimuli.filename)
+            if shown != (record["left_stimulus"], record["right_stimulus"]):
+                raise ValueError(
+                    f"Trial {record['trial_num']} of the {self.round_type} block does not match the session plan.")
+            trial.response = record["response"]
+            trial.reaction_time = record["reaction_time"]
+            if self.data_manager is not None:
+                self.data_manager.participant.add_trial(trial)
+        self.completed = min(len(records), len(self.trials))
 
-            # Handle response
-            if not self._handle_response(trial, keys):
-                break
+    @traced("Block.run")
+    def run(self, stopping_policy: Optional[StoppingPolicy] = None) -> List[Trial]:
+        """
+        Run all trials in the block and return completed trials.
 
-            # After handling the trial response, immediately save the trial.
-            if self.data_manager is not None:
-                self.data_manager.save_trial(trial)
-
-            # Show break screen if needed
-            if (self.n_blocks > 1 and 
-                trial_num % self.block_size == 0 and 
-                trial_num < self.n_trials and 
-                trial_num // self.block_size < self.n_blocks):
-                self._show_break_screen(trial_num // self.block_size)
+        Args:
+            stopping_policy: Optional policy that ends the block early once the
+                scale is reliable enough (or a trial cap is reached).
+        """
+        if stopping_policy is not None:
+            stopping_policy.reset()
+        for trial in self.trials[:self.completed]:
+            self.scores.update(trial)
+
+        # Raised priority and no automatic garbage collection while enabled (see RealtimeMode)
+        with REALTIME.block():
+            for trial_num, trial in enumerate(self.trials, 1):
+                if trial_num <= self.completed:
+                    continue
+
+                # Show fixation (garbage is collected while it is shown)
+                with TRACER.span("fixation", trial=trial_num):
+                    self.fixation.draw()
+                    self.window.flip()
+                    fixation_start = core.getTime()
+                    REALTIME.collect(1)
+                    core.wait(max(0.0, 0.5 - (core.getTime() - fixation_start)))
+
+                with REALTIME.critical(), TRACER.span("draw", trial=trial_num):
+                    # Set up positions
+                    positions = self._get_image_positions(trial.round_type)
+                    trial.pair.left_stimuli.set_position(positions['left_image'])
+                    trial.pair.right_stimuli.set_position(positions['right_image'])
+                
+                    # Create and position text stimuli
+                    text_stimuli = self._create_text_stimuli(positions, trial.round_type)
+
+                    # Draw trial
+                    self.prompt.draw()
+                    if trial.reference and self.config.referant_present:
+                        trial.reference.set_position(positions['reference_image'])
+                        trial.reference.psychopy_stim.draw()
+                        text_stimuli['reference'].draw()
+                    trial.pair.left_stimuli.psychopy_stim.draw()
+                    trial.pair.right_stimuli.psychopy_stim.draw()
+                    text_stimuli['left'].draw()
+                    text_stimuli['right'].draw()
+                    self.window.flip()
+
+                # Collect response
+                self.clock.reset()
+                with REALTIME.critical(), TRACER.span("response", trial=trial_num):
+                    keys = self.responder.wait_response(
+                        trial,
+                        keyList=['d', 'k', 'escape'],
+                        clock=self.clock,
+                        maxWait=self.config.skip_time_limit
+                    )
+
+                # Handle response
+                if not self._handle_response(trial, keys):
+                    break
+                self.scores.update(trial)
+                TRACER.counter("reaction_time", seconds=trial.reaction_time or 0.0)
+
+                # After handling the trial response, immediately save the trial.
+                if self.data_manager is not None:
+                    self.data_manager.save_trial(trial)
+
+                # End the block early if the stopping policy says so
+                if stopping_policy is not None and stopping_policy.should_stop(trial_num, self.scores):
+                    print(f"Block {self.round_type} stopped after trial {trial_num} ({stopping_policy.reason})")
+                    break
+
+                # Show break screen if needed
+                if trial_num in self.break_points:
+                    self._show_break_screen(self.break_points.index(trial_num) + 1)
+
+        # Save the running estimates and statistics of the block
+        if self.data_manager is not None:
+            summary = self.scores.summary()
+            summary["break_points"] = list(self.break_points)  # as planned (for replays)
+            if stopping_policy is not None:
+                summary["stopping"] = stopping_policy.summary()
+            self.data_manager.save_block_summary(self.round_type, summary)
 
         return self.trials
@@ -13,6 +13,10 @@ class Participant:
     start_time: str = field(default_factory=lambda: datetime.now().strftime("%Y%m%d_%H%M%S")) # to initalize/write after ID is taken
     end_time: str = None # TODO: to inilize/write at the last screen
     duration: float = None
+    seed: int = None # seed of the session plan
+    rng_streams: Dict = field(default_factory=dict) # random stream name -> seed
+    performance: Dict = field(default_factory=dict) # timing/resource statistics of the session
+    block_summaries: Dict = field(default_factory=dict) # round type -> online scores and statistics
 
     def _get_datafile_name(self) -> str:
         """Ensure the filename is correctly formatted as a string"""
@@ -37,27 +41,30 @@ class Participant:
 
     def add_feedback(self, feedback: str):
         self.feedback = feedback
+
+    def add_block_summary(self, round_type: str, summary: Dict):
+        self.block_summaries[round_type] = summary
+
+    def add_performance(self, name: str, statistics: Dict):
+        self.performance[name] = statistics
     
-    def to_json(self) -> Dict:
-        """Convert all data to JSON-serializable format"""
+    def metadata(self) -> Dict:
+        """Everything but the trials, in JSON-serializable format"""
         return {
             "participant_id": self.participant_id,
             "start_time": self.start_time,
             "end_time": self.end_time,
             "duration": self.duration,
+            "seed": self.seed,
+            "rng_streams": self.rng_streams,
             "demographics": self.demographics,
             "feedback": self.feedback,
-            "trials": [
-                {
-                    "trial_num": trial.trial_num,
-                    "round_type": trial.round_type,
-                    "left_stimulus": trial.pair.left_stimuli.filename,
-                    "right_stimulus": trial.pair.right_stimuli.filename,
-                    "comparison_hash": hash(trial.pair),
-                    "comparison_order": trial.pair.order_indicator,
-                    "response": trial.response,
-                    "reaction_time": trial.reaction_time
-                }
-                for trial in self.trials
-            ]
+            "performance": self.performance,
+            "block_summaries": self.block_summaries,
         }
+
+    def to_json(self) -> Dict:
+        """Convert all data to JSON-serializable format"""
+        data = self.metadata()
+        data["trials"] = [trial.to_json() for trial in self.trials]
+        return data
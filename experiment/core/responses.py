@@ -0,0 +1,66 @@
+from typing import Optional, List, Dict, Tuple
+from psychopy import core, event
+from .trial import Trial
+
+class KeyboardResponder:
+    """Collects responses from the keyboard (used during real sessions)"""
+
+    def wait_response(
+        self,
+        trial: Trial,
+        keyList: List[str],
+        clock: core.Clock,
+        maxWait: float
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Wait for the response to a trial. Returns [(key, rt)] or None if missed."""
+        return event.waitKeys(keyList=keyList, timeStamped=clock, maxWait=maxWait)
+
+    def wait_continue(self, keyList: Optional[List[str]] = None):
+        """Wait until the participant continues (e.g. after a missed trial or a break)."""
+        return event.waitKeys(keyList=keyList or ['space'])
+
+    def escape_pressed(self) -> bool:
+        """Check (without waiting) whether escape was pressed."""
+        return bool(event.getKeys(keyList=['escape']))
+
+
+class ReplayResponder:
+    """
+    Re-drives a block with the responses of a saved session.
+
+    Each trial's recorded key is "pressed" once its recorded reaction time has
+    elapsed on the trial clock; missed trials wait for the full response window.
+    Continue screens (missed-trial message, breaks) are passed immediately.
+    """
+    def __init__(self, records: List[Dict]):
+        """
+        Args:
+            records: Saved trial records of one block, with "response" and
+                "reaction_time", in presentation order (matched to trial numbers 1..n).
+        """
+        self.records = {trial_num: record for trial_num, record in enumerate(records, 1)}
+        self.deviations: List[float] = []  # replayed RT - recorded RT, per answered trial
+
+    def wait_response(
+        self,
+        trial: Trial,
+        keyList: List[str],
+        clock: core.Clock,
+        maxWait: float
+    ) -> Optional[List[Tuple[str, float]]]:
+        record = self.records.get(trial.trial_num)
+        if record is None or record.get("response") in (None, "missed"):
+            core.wait(maxWait)
+            return None
+
+        recorded_rt = record["reaction_time"]
+        core.wait(max(recorded_rt - clock.getTime(), 0))
+        rt = clock.getTime()
+        self.deviations.append(rt - recorded_rt)
+        return [(record["response"], rt)]
+
+    def wait_continue(self, keyList: Optional[List[str]] = None):
+        return [(keyList or ['space'])[0]]
+
+    def escape_pressed(self) -> bool:
+        return False
@@ -0,0 +1,141 @@
+from typing import Optional, List, Dict, Tuple
+import math
+from .trial import Trial
+
+class OnlineScores:
+    """
+    Running Bradley-Terry score estimates for one block, updated in O(1) per trial.
+
+    Each judgement moves the winner up and the loser down by a stochastic
+    gradient step scaled by the stimulus' accumulated Fisher information
+    (an online approximation of the maximum-likelihood fit). Scale separation
+    reliability, inconsistency and missed-trial statistics are kept up to date
+    from running sums, so reading them is O(1) as well.
+    """
+    def __init__(self, stimuli: List[str], prior_information: float = 1.0):
+        """
+        Args:
+            stimuli: File names of the stimuli in the block.
+            prior_information: Information of the (zero-centred) prior on every score;
+                damps the first updates.
+        """
+        self.prior_information = prior_information
+        self.scores: Dict[str, float] = {stimulus: 0.0 for stimulus in stimuli}
+        self.information: Dict[str, float] = {stimulus: 0.0 for stimulus in stimuli}
+        self.comparisons: Dict[str, int] = {stimulus: 0 for stimulus in stimuli}
+
+        # Running sums for the reliability
+        self._sum = 0.0  # sum of scores
+        self._sum_squares = 0.0  # sum of squared scores
+        self._sum_error_variance = 0.0  # sum of 1 / information, over informed stimuli
+        self._n_informed = 0  # stimuli with at least one judgement
+
+        # First choice of every pair (unordered), to count inconsistent repeats
+        self._first_choice: Dict[Tuple[str, str], str] = {}
+        self.n_judged = 0
+        self.n_missed = 0
+        self.n_left = 0  # choices of the left image (position bias)
+        self.n_repeats = 0  # judgements of an already judged pair
+        self.n_inconsistent = 0  # ... that disagree with the first judgement
+        self._sum_rt = 0.0
+
+    def _set_score(self, stimulus: str, score: float):
+        old = self.scores[stimulus]
+        self._sum += score - old
+        self._sum_squares += score * score - old * old
+        self.scores[stimulus] = score
+
+    def _add_information(self, stimulus: str, information: float):
+        old = self.information[stimulus]
+        if old > 0:
+            self._sum_error_variance -= 1 / old
+        else:
+            self._n_informed += 1
+        self.information[stimulus] = old + information
+        self._sum_error_variance += 1 / (old + information)
+
+    def update(self, trial: Trial):
+        """Add the response of a trial ('d' = left chosen, 'k' = right chosen, else missed)."""
+        if trial.response not in ('d', 'k'):
+            self.n_missed += 1
+            return
+
+        left = trial.pair.left_stimuli.filename
+        right = trial.pair.right_stimuli.filename
+        winner, loser = (left, right) if trial.response == 'd' else (right, left)
+
+        # Bradley-Terry probability that the winner wins
+        p = 1 / (1 + math.exp(self.scores[loser] - self.scores[winner]))
+        information = p * (1 - p)
+        self._add_information(winner, information)
+        self._add_information(loser, information)
+        self._set_score(winner, self.scores[winner] + (1 - p) / (self.information[winner] + self.prior_information))
+        self._set_score(loser, self.scores[loser] - (1 - p) / (self.information[loser] + self.prior_information))
+        self.comparisons[winner] += 1
+        self.comparisons[loser] += 1
+
+        # Consistency with the first judgement of the same pair
+        pair = (left, right) if left < right else (right, left)
+        if pair in self._first_choice:
+            self.n_repeats += 1
+            self.n_inconsistent += self._first_choice[pair] != winner
+        else:
+            self._first_choice[pair] = winner
+
+        self.n_judged += 1
+        self.n_left += trial.response == 'd'
+        if trial.reaction_time is not None:
+            self._sum_rt += trial.reaction_time
+
+    def estimates(self) -> Dict[str, float]:
+        """Current score of every stimulus (centred on zero)."""
+        mean = self._sum / len(self.scores) if self.scores else 0.0
+        return {stimulus: score - mean for stimulus, score in self.scores.items()}
+
+    def standard_errors(self) -> Dict[str, Optional[float]]:
+        """Current standard error of every score (None before its first judgement)."""
+        return {
+            stimulus: 1 / math.sqrt(information) if information > 0 else None
+            for stimulus, information in self.information.items()
+        }
+
+    @property
+    def reliability(self) -> Optional[float]:
+        """
+        Scale separation reliability: the share of the observed score variance
+        that is not measurement error. None until every stimulus was judged.
+        """
+        n = len(self.scores)
+        if n < 2 or self._n_informed < n:
+            return None
+        observed_variance = (self._sum_squares - self._sum * self._sum / n) / (n - 1)
+        if observed_variance <= 0:
+            return 0.0
+        error_variance = self._sum_error_variance / n
+        return max(0.0, (observed_variance - error_variance) / observed_variance)
+
+    @property
+    def inconsistency(self) -> Optional[float]:
+        """Share of repeated pair judgements that disagree with the pair's first judgement."""
+        return self.n_inconsistent / self.n_repeats if self.n_repeats else None
+
+    @property
+    def missed_rate(self) -> Optional[float]:
+        total = self.n_judged + self.n_missed
+        return self.n_missed / total if total else None
+
+    def summary(self) -> Dict:
+        """All statistics, in JSON-serializable form."""
+        return {
+            "n_judged": self.n_judged,
+            "n_missed": self.n_missed,
+            "missed_rate": self.missed_rate,
+            "left_rate": self.n_left / self.n_judged if self.n_judged else None,
+            "mean_rt": self._sum_rt / self.n_judged if self.n_judged else None,
+            "n_repeats": self.n_repeats,
+            "n_inconsistent": self.n_inconsistent,
+            "inconsistency": self.inconsistency,
+            "reliability": self.reliability,
+            "scores": self.estimates(),
+            "standard_errors": self.standard_errors(),
+        }
@@ -4,6 +4,7 @@ from typing import Optional, Tuple, Dict
 from psychopy import visual
 import os
 from PIL import Image
+from ..utils.memory import MEMORY_LEDGER, texture_bytes
 
 @dataclass
 class Stimulus:
@@ -15,18 +16,22 @@ class Stimulus:
     target_height: int = 0.3
     win: Optional[visual.Window] = None
     psychopy_stim: Optional[visual.ImageStim] = None
-    orig_width: int = field(init=False)
-    orig_height: int = field(init=False)
+    create_texture: bool = True # False when the stimulus is drawn from a texture atlas
+    orig_width: Optional[int] = None # known sizes (e.g. from the stimulus manifest) skip the header read
+    orig_height: Optional[int] = None
     scaled_dimensions: Tuple[float, float] = field(init=False)
 
     def __post_init__(self):
         # 1. Get the original image dimensions in pixels.
-        with Image.open(self.image_path) as img:
-            self.orig_width, self.orig_height = img.size 
-             # e.g., 400 x 300
+        if self.orig_width is None or self.orig_height is None:
+            with Image.open(self.image_path) as img:
+                self.orig_width, self.orig_height = img.size 
+                 # e.g., 400 x 300
 
         # 2. Get screen dimensions (in pixels) from the PsychoPy window.
-        screen_width, screen_height = self.win.size  
+        #    (The scaled size does not depend on them, so stimuli without a window,
+        #    e.g. in analyses and benchmarks, use a unit screen.)
+        screen_width, screen_height = self.win.size if self.win is not None else (1, 1)
         # e.g., 2000 x 1000
 
         # 3. Convert the original dimensions to height units.
@@ -53,13 +58,30 @@ class Stimulus:
         self.scaled_dimensions = (scaled_width, scaled_height)
 
         # 7. Create the PsychoPy ImageStim using the computed scaled dimensions.
-        if self.win is not None:
+        if self.win is not None and self.create_texture:
+            image = self.image_path
+            upload_size = (self.orig_width, self.orig_height)
+            # Over the memory budget: upload at the size it is displayed at instead
+            if (MEMORY_LEDGER.should_downscale(texture_bytes(*upload_size))
+                    and self.display_pixels[0] < self.orig_width):
+                upload_size = self.display_pixels
+                with Image.open(self.image_path) as img:
+                    image = img.convert("RGB").resize(upload_size, Image.LANCZOS)
+                MEMORY_LEDGER.downscaled += 1
             self.psychopy_stim = visual.ImageStim(
                 self.win,
-                image=self.image_path,
+                image=image,
                 size=self.scaled_dimensions,
                 units='height'
             )
+            MEMORY_LEDGER.track(self.psychopy_stim, "stimuli", texture_bytes(*upload_size))
+
+    @property
+    def display_pixels(self) -> Tuple[int, int]:
+        """Size (in pixels) at which the stimulus is displayed in the window"""
+        screen_height = self.win.size[1]
+        return (max(1, round(self.scaled_dimensions[0] * screen_height)),
+                max(1, round(self.scaled_dimensions[1] * screen_height)))
 
     @property
     def id(self) -> str:
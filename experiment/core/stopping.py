@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict
+from .scoring import OnlineScores
+
+def spearman(first: Dict[str, float], second: Dict[str, float]) -> float:
+    """Spearman rank correlation between two score dictionaries (same keys, no ties assumed)."""
+    keys = list(first)
+    n = len(keys)
+    if n < 2:
+        return 1.0
+    rank_first = {key: rank for rank, key in enumerate(sorted(keys, key=first.get))}
+    rank_second = {key: rank for rank, key in enumerate(sorted(keys, key=second.get))}
+    d_squared = sum((rank_first[key] - rank_second[key]) ** 2 for key in keys)
+    return 1 - 6 * d_squared / (n * (n * n - 1))
+
+@dataclass
+class StoppingCheck:
+    """Statistics at one checkpoint of a stopping policy"""
+    trial_num: int
+    reliability: Optional[float]
+    rank_stability: Optional[float]
+
+@dataclass
+class StoppingPolicy:
+    """
+    Ends a block once its scale is reliable and its rank order has stabilized.
+
+    Every `window` trials the policy reads the scale separation reliability from
+    the block's OnlineScores (O(1)) and compares the current rank order with the
+    one at the previous checkpoint (Spearman, O(n log n) per window). The block
+    stops at the first checkpoint where both reach their thresholds, or at the
+    hard trial cap. The checkpoints and the decision are saved with the block.
+    """
+    reliability_threshold: float = 0.8
+    stability_threshold: float = 0.95
+    window: int = 20  # trials between checkpoints
+    min_trials: int = 0  # never stop before this many trials
+    max_trials: Optional[int] = None  # hard cap on the number of trials
+    checks: List[StoppingCheck] = field(default_factory=list)
+    stopped_at: Optional[int] = None
+    reason: Optional[str] = None
+    _previous_scores: Optional[Dict[str, float]] = field(default=None, repr=False)
+
+    def reset(self):
+        """Forget the state of a previous block."""
+        self.checks = []
+        self.stopped_at = None
+        self.reason = None
+        self._previous_scores = None
+
+    def should_stop(self, trial_num: int, scores: OnlineScores) -> bool:
+        """Called after every trial; returns True when the block should end."""
+        if self.max_trials is not None and trial_num >= self.max_trials:
+            return self._stop(trial_num, "max_trials")
+        if trial_num % self.window != 0:
+            return False
+
+        current = scores.estimates()
+        stability = spearman(self._previous_scores, current) if self._previous_scores is not None else None
+        self._previous_scores = current
+        reliability = scores.reliability
+        self.checks.append(StoppingCheck(trial_num, reliability, stability))
+
+        if (trial_num >= self.min_trials
+                and reliability is not None and reliability >= self.reliability_threshold
+                and stability is not None and stability >= self.stability_threshold):
+            return self._stop(trial_num, "reliable_and_stable")
+        return False
+
+    def _stop(self, trial_num: int, reason: str) -> bool:
+        self.stopped_at = trial_num
+        self.reason = reason
+        return True
+
+    def summary(self) -> Dict:
+        """The decision and checkpoint statistics, in JSON-serializable form."""
+        return {
+            "reliability_threshold": self.reliability_threshold,
+            "stability_threshold": self.stability_threshold,
+            "window": self.window,
+            "min_trials": self.min_trials,
+            "max_trials": self.max_trials,
+            "stopped_at": self.stopped_at,
+            "reason": self.reason,
+            "checks": [asdict(check) for check in self.checks],
+        }
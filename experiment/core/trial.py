@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Dict
 from .comparison import Comparison
 from .stimulus import Stimulus
 
@@ -24,3 +24,17 @@ class Trial:
             str(self.response) if self.response else "missed",
             str(self.reaction_time) if self.reaction_time else "NA"
         ]
+
+    def to_json(self) -> Dict:
+        """Convert trial data to JSON-serializable format"""
+        return {
+            "trial_num": self.trial_num,
+            "round_type": self.round_type,
+            "left_stimulus": self.pair.left_stimuli.filename,
+            "right_stimulus": self.pair.right_stimuli.filename,
+            "reference_stimulus": self.reference.filename if self.reference else None,
+            "comparison_hash": hash(self.pair),
+            "comparison_order": self.pair.order_indicator,
+            "response": self.response,
+            "reaction_time": self.reaction_time
+        }
@@ -1 +1,17 @@
-from .display import *
+# Submodules are imported on first use (see experiment/_lazy.py)
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    "MultipleChoiceOption": "display",
+    "TextStyle": "display",
+    "Display": "display",
+    "LazyScreens": "screens",
+    "RenderLoop": "render_loop",
+    "RenderLoopStats": "render_loop",
+    "RENDER_LOOP_STATS": "render_loop",
+    "render_loop_stats": "render_loop",
+    "wait_for_keys": "render_loop",
+}
+_SUBMODULES = ["display", "screens", "render_loop"]
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, _SUBMODULES)
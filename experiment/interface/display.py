@@ -1,9 +1,15 @@
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Union, Tuple, Callable
 from pathlib import Path
+from collections import OrderedDict, deque
 from psychopy import visual, event, core
 from PIL import Image
 import string
+from ..utils.memory import MEMORY_LEDGER, texture_bytes
+from .render_loop import RenderLoop, wait_for_keys
+
+# Characters whose glyphs are rendered ahead of time for every declared text style
+PREWARM_CHARACTERS = string.ascii_letters + string.digits + string.punctuation + " "
 
 @dataclass
 class MultipleChoiceOption:
@@ -12,6 +18,14 @@ class MultipleChoiceOption:
     value: str  # The key the user should press to select this option.
     position: Tuple[float, float]
 
+@dataclass(frozen=True)
+class TextStyle:
+    """A font and size used somewhere in the experiment (its glyphs can be prewarmed)"""
+    font: str
+    height: float
+    bold: bool = False
+    textbox: bool = False  # rendered by a TextBox2, which keeps its own glyph atlas
+
 class Display:
     """Handles various types of visual presentations in the experiment."""
     
@@ -22,7 +36,8 @@ class Display:
         text_color: str = 'black',
         text_height: int = 0.03,
         wrap_width: int = 1,
-        pos: Tuple[float, float] = (0, 0)
+        pos: Tuple[float, float] = (0, 0),
+        text_cache_size: int = 128
     ):
         self.window = window
         self.font = font
@@ -30,6 +45,13 @@ class Display:
         self.text_height = text_height
         self.wrap_width = wrap_width
         self.pos = pos  # default position for stimuli
+
+        # Recently used text stimuli, keyed by text, position and style (least recently used evicted)
+        self.text_cache_size = text_cache_size
+        self._text_cache: OrderedDict = OrderedDict()
+        # Work done while waiting for a key press (e.g. glyph prewarming)
+        self._idle_tasks: deque = deque()
+        self._prewarmed: List = []
         
         # Initialize common stimuli
         self._init_common_stimuli()
@@ -54,6 +76,8 @@ class Display:
             position=(0, -0.45),
             Text_alignment='center'
         )
+        # Typed response of free text questions (its text changes with every key)
+        self.response_text = self._create_text_stimulus("", self.pos)
     
     def _safe_read_file(self, file_path: Union[str, Path]) -> str:
         """
@@ -94,7 +118,7 @@ class Display:
         pos = position if position is not None else self.pos
         kwargs.pop('pos', None)
 
-        return visual.TextStim(
+        stim = visual.TextStim(
             win=self.window,
             text=text,
             height=self.text_height,
@@ -106,22 +130,91 @@ class Display:
             anchorHoriz=Horizontal_anchor,
             **kwargs
         )
+        return self._track_text(stim)
+
+    def _track_text(self, stim: visual.TextStim) -> visual.TextStim:
+        """Account for the texture a text is rendered into (estimated from its bounding box in pixels)."""
+        try:
+            width, height = stim.boundingBox
+        except (AttributeError, TypeError, ValueError):
+            width, height = 0, 0
+        return MEMORY_LEDGER.track(stim, "text", texture_bytes(width, height))
     
-    def _create_image_stimulus(
+    def _get_text_stimulus(
         self,
-        image_path: Union[str, Path],
-        position: Optional[Tuple[float, float]] = None
-    ) -> visual.ImageStim:
+        text: str,
+        position: Optional[Tuple[float, float]] = None,
+        **kwargs
+    ) -> visual.TextStim:
         """
-        Create an image stimulus without displaying it.
+        Like `_create_text_stimulus`, but reuses a cached TextStim with the same
+        text, position and style. Cached stimuli must not be modified.
         """
         pos = position if position is not None else self.pos
+        key = (text, tuple(pos), tuple(sorted(kwargs.items())))
+        stim = self._text_cache.get(key)
+        if stim is None:
+            stim = self._create_text_stimulus(text, pos, **kwargs)
+            self._text_cache[key] = stim
+            if len(self._text_cache) > self.text_cache_size:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return stim
 
-        # 1. Get the original image dimensions in pixels.
-        with Image.open(image_path) as img:
-            orig_width, orig_height = img.size 
+    def prewarm_text(self, styles: List[TextStyle]):
+        """
+        Queue glyph prewarming for the given text styles.
 
-        # 2. Get screen dimensions (in pixels) from the PsychoPy window.
+        Rendering text in a new font or size first builds its glyph atlas. The
+        work is done one style at a time while the participant reads a screen
+        (see `_wait_keys`), so question screens do not pay for it.
+        """
+        for style in dict.fromkeys(styles):
+            self._idle_tasks.append(lambda style=style: self._prewarm_style(style))
+
+    def _prewarm_style(self, style: TextStyle):
+        """Render every prewarm character once in the given style."""
+        if style.textbox:
+            stim = visual.TextBox2(
+                self.window,
+                text=PREWARM_CHARACTERS,
+                font=style.font,
+                letterHeight=style.height,
+                bold=style.bold,
+                units='height'
+            )
+        else:
+            stim = visual.TextStim(
+                self.window,
+                text=PREWARM_CHARACTERS,
+                font=style.font,
+                height=style.height,
+                bold=style.bold,
+                wrapWidth=5
+            )
+        # Drawing uploads the glyphs; the back buffer is cleared again (no flip)
+        stim.draw()
+        self.window.clearBuffer()
+        # Keep a reference, so the font stays in the font cache
+        self._prewarmed.append(self._track_text(stim))
+
+    def run_idle_task(self) -> bool:
+        """Run one queued idle task. Returns False if there was nothing to do."""
+        if not self._idle_tasks:
+            return False
+        self._idle_tasks.popleft()()
+        return True
+
+    def _wait_keys(self, keyList: Optional[List[str]] = None) -> Optional[List[str]]:
+        """event.waitKeys, but running queued idle tasks while no key is pressed."""
+        return wait_for_keys(keyList, idle=self.run_idle_task)
+
+    def _image_display_size(self, orig_width: int, orig_height: int) -> Tuple[float, float]:
+        """
+        Size (width, height) in height units at which a full-screen image is displayed.
+        """
+        # Get screen dimensions (in pixels) from the PsychoPy window.
         screen_width, screen_height = self.window.size  
 
         # We want the height of the image to be 1
@@ -148,13 +241,54 @@ class Display:
         height_h *= 1.2
         width_h *= 1.2
 
-        return visual.ImageStim(
+        return width_h, height_h
+
+    def prepare_image(self, image_path: Union[str, Path]) -> Image.Image:
+        """
+        Decode an image and downscale it to the size it is displayed at.
+
+        This does not touch OpenGL, so it can run in a background thread.
+
+        Args:
+            image_path: Path to the image file.
+
+        Returns:
+            The decoded (and possibly downscaled) PIL image.
+        """
+        with Image.open(image_path) as img:
+            width_h, height_h = self._image_display_size(*img.size)
+            screen_height = self.window.size[1]
+            display_size = (max(1, round(width_h * screen_height)), max(1, round(height_h * screen_height)))
+            # Only ever downscale; the rendered instructions are much larger than the screen
+            if display_size[0] < img.size[0]:
+                return img.convert("RGB").resize(display_size, Image.LANCZOS)
+            return img.convert("RGB")
+
+    def _create_image_stimulus(
+        self,
+        image: Union[str, Path, Image.Image],
+        position: Optional[Tuple[float, float]] = None
+    ) -> visual.ImageStim:
+        """
+        Create an image stimulus without displaying it.
+
+        Args:
+            image: Path to the image file, or an image from `prepare_image`.
+            position: Optional position; defaults to self.pos.
+        """
+        pos = position if position is not None else self.pos
+
+        if not isinstance(image, Image.Image):
+            image = self.prepare_image(image)
+
+        stim = visual.ImageStim(
             self.window,
-            image=str(image_path),
-            size=(width_h, height_h),
+            image=image,
+            size=self._image_display_size(*image.size),
             pos=pos,
             units='height'
         )
+        return MEMORY_LEDGER.track(stim, "screens", texture_bytes(*image.size))
     
     def load_text(
         self, 
@@ -199,15 +333,16 @@ class Display:
     
     def load_image(
         self,
-        image_path: Union[str, Path],
+        image_path: Union[str, Path, Image.Image],
         position: Optional[Tuple[float, float]] = None
     ) -> visual.ImageStim:
         """
         Preload an image stimulus without displaying it.
+
+        The image is downscaled to the size it is displayed at before it is uploaded.
         
         Args:
-            image_path: Path to the image file.
-            size: Optional (width, height); defaults to original image size.
+            image_path: Path to the image file, or an image from `prepare_image`.
             position: Optional position.
             
         Returns:
@@ -231,7 +366,8 @@ class Display:
             wait_for_space: Whether to wait for a key press.
             show_continue: Whether to show continue prompt.
             allow_escape: Whether to allow quitting via escape.
-            keyList: Optional list of keys to wait for.
+            keyList: Optional list of keys to wait for. When it contains 'escape',
+                the key is returned to the caller instead of quitting.
             
         Returns:
             The key pressed.
@@ -242,11 +378,12 @@ class Display:
         self.window.flip()
                 
         if wait_for_space:
-            keys = keyList if keyList is not None else ['space']
-            if allow_escape and 'escape' not in keys:
+            keys = list(keyList) if keyList is not None else ['space']
+            quit_on_escape = allow_escape and 'escape' not in keys
+            if quit_on_escape:
                 keys.append('escape')
-            response = event.waitKeys(keyList=keys)
-            if response and response[0] == 'escape':
+            response = self._wait_keys(keyList=keys)
+            if response and response[0] == 'escape' and quit_on_escape:
                 self.quit_experiment()
             return response[0] if response else None
         return None
@@ -274,7 +411,7 @@ class Display:
         # Use a default prompt position (in height units) if none is provided.
         # Here, self.pos is the default center (0,0); we shift upward by 0.3 height units.
         prompt_position = prompt_pos if prompt_pos is not None else (self.pos[0], self.pos[1] + 0.3)
-        prompt_stim = self._create_text_stimulus(prompt, prompt_position, bold=True)
+        prompt_stim = self._get_text_stimulus(prompt, prompt_position, bold=True)
         
         # If the options are provided as strings, automatically convert them.
         # We'll assign positions relative to the prompt position.
@@ -292,7 +429,7 @@ class Display:
 
         # Draw each option.
         for option in options:
-            opt_stim = self._create_text_stimulus(option.text, option.position)
+            opt_stim = self._get_text_stimulus(option.text, option.position)
             opt_stim.draw()
         prompt_stim.draw()
 
@@ -306,7 +443,7 @@ class Display:
         if allow_escape:
             valid_keys.append('escape')
         
-        response = event.waitKeys(keyList=valid_keys)
+        response = self._wait_keys(keyList=valid_keys)
         if response and response[0] == 'escape':
             self.quit_experiment()
         return response[0] if response else None
@@ -331,50 +468,56 @@ class Display:
         Returns:
             The user's response.
         """
-        question_stim = self._create_text_stimulus(question, (self.pos[0], self.pos[1] + 0.1), bold=True)
-        response_stim = self._create_text_stimulus("", self.pos)
+        question_stim = self._get_text_stimulus(question, (self.pos[0], self.pos[1] + 0.1), bold=True)
+        # The response text changes with every key, so it is not taken from the cache
+        response_stim = self.response_text
         if allowed_chars is None:
             allowed_chars = set(string.ascii_letters + string.digits + string.punctuation + " ")
         else:
             allowed_chars = set(allowed_chars)
         
-        response = ""
-        while True:
+        def draw():
             question_stim.draw()
-            response_stim.setText(response)
             response_stim.draw()
-
             # Continue text
             self.continue_text_FCQ.draw()
 
+        def show_message(message):
+            response_stim.setText(message)
+            response_stim.draw()
             self.window.flip()
+            core.wait(1)
+
+        response = ""
+        response_stim.setText(response)
+        # Redraws only after a key changed the response
+        with RenderLoop(self.window, "free_text_prompt", draw, idle=self.run_idle_task) as loop:
+            while True:
+                loop.render()
 
-            # Keys
-            keys = event.waitKeys()
-            for key in keys:
-                if key == 'return':
-                    if validation_func is None or validation_func(response):
-                        return response
-                    else:
-                        response_stim.setText("Invalid input, try again.")
-                        response_stim.draw()
-                        self.window.flip()
-                        core.wait(1)
-                        response = ""
-                elif key == 'backspace':
-                    response = response[:-1]
-                # elif key == 'space':
-                #     response += " "
-                # elif key == 'escape':
-                #     self.quit_experiment()
-                elif len(key) == 1 and key in allowed_chars:
-                    if max_length is None or len(response) < max_length:
-                        response += key
-                    else:
-                        response_stim.setText("Max length reached.")
-                        response_stim.draw()
-                        self.window.flip()
-                        core.wait(1)
+                # Keys
+                keys = loop.wait_keys()
+                for key in keys:
+                    if key == 'return':
+                        if validation_func is None or validation_func(response):
+                            return response
+                        else:
+                            show_message("Invalid input, try again.")
+                            response = ""
+                    elif key == 'backspace':
+                        response = response[:-1]
+                    # elif key == 'space':
+                    #     response += " "
+                    # elif key == 'escape':
+                    #     self.quit_experiment()
+                    elif len(key) == 1 and key in allowed_chars:
+                        if max_length is None or len(response) < max_length:
+                            response += key
+                        else:
+                            show_message("Max length reached.")
+                if response != response_stim.text:
+                    response_stim.setText(response)
+                    loop.invalidate()
         # (Loop ends via return upon valid input.)
     
     def display_likert(
@@ -405,7 +548,7 @@ class Display:
         prompt_position = prompt_pos if prompt_pos is not None else (self.pos[0], self.pos[1] + 200)
         scale_center = scale_pos if scale_pos is not None else self.pos
         
-        prompt_stim = self._create_text_stimulus(prompt, prompt_position)
+        prompt_stim = self._get_text_stimulus(prompt, prompt_position)
         
         line = visual.Line(
             self.window,
@@ -424,10 +567,10 @@ class Display:
                 pos=(x, scale_center[1]),
                 fillColor=self.text_color
             )
-            number = self._create_text_stimulus(str(i + 1), (x, scale_center[1] - 30))
+            number = self._get_text_stimulus(str(i + 1), (x, scale_center[1] - 30))
             label = None
             if labels and (i + 1) in labels:
-                label = self._create_text_stimulus(labels[i + 1], (x, scale_center[1] - 60))
+                label = self._get_text_stimulus(labels[i + 1], (x, scale_center[1] - 60))
             point_stims.append((point, number, label))
         
         prompt_stim.draw()
@@ -442,7 +585,7 @@ class Display:
         valid_keys = [str(i) for i in range(1, scale_points + 1)]
         if allow_escape:
             valid_keys.append('escape')
-        response = event.waitKeys(keyList=valid_keys)
+        response = self._wait_keys(keyList=valid_keys)
         if response and response[0] == 'escape':
             self.quit_experiment()
         return int(response[0]) if response else None
@@ -459,7 +602,7 @@ class Display:
             message: The error message to display.
             duration: Duration in seconds.
         """
-        error_stim = self._create_text_stimulus(message, (0, 0), color='red')
+        error_stim = self._get_text_stimulus(message, (0, 0), color='red')
         error_stim.draw()
         self.window.flip()
         core.wait(duration)
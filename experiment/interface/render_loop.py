@@ -0,0 +1,134 @@
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Callable
+from psychopy import visual, event, core
+import time
+from ..utils.tracing import TRACER
+
+@dataclass
+class RenderLoopStats:
+    """Time spent in the render loops of one kind of screen"""
+    runs: int = 0  # number of times a screen of this kind was shown
+    seconds: float = 0.0  # wall time spent in the loop
+    frames: int = 0  # redraws (each followed by a flip)
+    wakeups: int = 0  # polls that did not need a redraw
+
+# Loop name -> statistics, for the whole session
+RENDER_LOOP_STATS: Dict[str, RenderLoopStats] = {}
+
+def render_loop_stats() -> Dict[str, Dict]:
+    """The render loop statistics as JSON-serializable dictionaries."""
+    return {name: asdict(stats) for name, stats in RENDER_LOOP_STATS.items()}
+
+def wait_for_keys(
+    keyList: Optional[List[str]] = None,
+    idle: Optional[Callable[[], bool]] = None,
+    maxWait: float = float('inf')
+) -> Optional[List[str]]:
+    """
+    event.waitKeys, but running idle tasks while no key is pressed.
+
+    Args:
+        keyList: Keys to wait for (None for any key).
+        idle: Called repeatedly while waiting; returns False once it has nothing left to do.
+        maxWait: Maximum time to wait, in seconds.
+
+    Returns:
+        The pressed keys, or None on timeout.
+    """
+    event.clearEvents('keyboard')
+    timer = core.CountdownTimer(maxWait) if maxWait != float('inf') else None
+    while idle is not None and (timer is None or timer.getTime() > 0):
+        keys = event.getKeys(keyList=keyList)
+        if keys:
+            return keys
+        if not idle():
+            break
+    if timer is not None:
+        maxWait = max(timer.getTime(), 0)
+    return event.waitKeys(keyList=keyList, maxWait=maxWait, clearEvents=False)
+
+class RenderLoop:
+    """
+    Redraws an interactive screen only when its state changes.
+
+    Callers mark changes with `invalidate()` (a key, a mouse click, a new
+    countdown second); `render()` then draws and flips once. Between changes the
+    loop only sleeps until the next poll, instead of redrawing every frame, and
+    the time spent is added to RENDER_LOOP_STATS.
+
+    Usage:
+        with RenderLoop(window, "break_screen", draw) as loop:
+            while ...:
+                loop.render()
+                ...  # check input, call loop.invalidate() on changes
+                loop.sleep()
+    """
+    def __init__(
+        self,
+        window: visual.Window,
+        name: str,
+        draw: Callable[[], None],
+        poll_interval: float = 0.01,
+        refresh_interval: Optional[float] = None,
+        idle: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Args:
+            window: The PsychoPy window.
+            name: Name under which the time is reported.
+            draw: Draws the screen (without flipping).
+            poll_interval: Time (in seconds) between polls for input.
+            refresh_interval: Optional maximum time between redraws (e.g. for a blinking caret).
+            idle: Called instead of sleeping while it returns True (e.g. Display.run_idle_task).
+        """
+        self.window = window
+        self.name = name
+        self.draw = draw
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self.idle = idle
+        self.stats = RENDER_LOOP_STATS.setdefault(name, RenderLoopStats())
+        self._dirty = True
+        self._last_draw = 0.0
+        self._start = 0.0
+
+    def __enter__(self) -> 'RenderLoop':
+        self._start = time.perf_counter()
+        self.stats.runs += 1
+        self._span = TRACER.span(f"render loop {self.name}")
+        self._span.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.seconds += time.perf_counter() - self._start
+        self._span.__exit__(*exc)
+        return False
+
+    def invalidate(self):
+        """Mark the screen as changed; it is redrawn at the next `render()`."""
+        self._dirty = True
+
+    def render(self) -> bool:
+        """Draw and flip if the screen changed (or is due for a refresh). Returns whether it did."""
+        now = time.perf_counter()
+        refresh_due = self.refresh_interval is not None and now - self._last_draw >= self.refresh_interval
+        if not (self._dirty or refresh_due):
+            return False
+        self.draw()
+        self.window.flip()
+        self._dirty = False
+        self._last_draw = now
+        self.stats.frames += 1
+        return True
+
+    def sleep(self):
+        """Wait until the next poll, using the time for idle work if there is any."""
+        self.stats.wakeups += 1
+        if self.idle is not None and self.idle():
+            return
+        core.wait(self.poll_interval, hogCPUperiod=0)
+
+    def wait_keys(self, keyList: Optional[List[str]] = None, maxWait: float = float('inf')) -> Optional[List[str]]:
+        """Block until a key is pressed (no redraws meanwhile)."""
+        self.stats.wakeups += 1
+        return wait_for_keys(keyList, self.idle, maxWait)
@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from typing import Optional, Dict, Callable, Union, Any
+from pathlib import Path
+from psychopy import visual
+from ..utils.profiling import StartupProfiler
+from ..utils.tracing import TRACER
+from .display import Display
+
+Screen = Union[visual.TextStim, visual.ImageStim]
+
+@dataclass
+class ScreenHandle:
+    """A registered screen: how to prepare it (off the main thread) and build it"""
+    name: str
+    build: Callable[[Any], Screen]  # runs on the main thread (creates the OpenGL texture)
+    prepare: Optional[Callable[[], Any]] = None  # decoding/reading in a background thread (must not touch the window)
+    future: Optional[Future] = None
+    screen: Optional[Screen] = None
+
+def _read_text(file_path: Union[str, Path]) -> str:
+    """Read a text screen (runs in the prefetch thread, so errors are left to the caller)"""
+    with open(file_path, "r", encoding="utf-8") as file:
+        return file.read()
+
+class LazyScreens:
+    """
+    Registry of instruction screens that are built on first access.
+
+    Screens are registered in the order they are shown. Accessing a screen
+    releases the screens before it (they have been shown) and starts preparing
+    the next one in a background thread, so the session never holds every
+    instruction bitmap at once and no screen is decoded while it is awaited.
+    With `keep_shown`, shown screens are kept instead (e.g. when the same
+    process runs several sessions, see ExperimentRunner.run_batch).
+    """
+    def __init__(self, display: Display, profiler: Optional[StartupProfiler] = None, keep_shown: bool = False):
+        self.display = display
+        self.profiler = profiler
+        self.keep_shown = keep_shown
+        self._handles: Dict[str, ScreenHandle] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screen-prefetch")
+
+    def register(self, name: str, build: Callable[[Any], Screen], prepare: Optional[Callable[[], Any]] = None):
+        """
+        Register a screen.
+
+        Args:
+            name: Name of the screen.
+            build: Creates the screen from the result of `prepare` (or from None).
+            prepare: Optional work that can be done ahead of time in a background thread.
+        """
+        self._handles[name] = ScreenHandle(name, build, prepare)
+
+    def register_image(self, name: str, image_path: Union[str, Path]):
+        """Register an image screen, decoded and downscaled to the window size ahead of time."""
+        self.register(
+            name,
+            build=lambda image: self.display.load_image(image),
+            prepare=lambda: self.display.prepare_image(image_path)
+        )
+
+    def register_text(self, name: str, file_path: Union[str, Path]):
+        """Register a text screen read from a file."""
+        self.register(
+            name,
+            build=lambda text: self.display.load_text(text),
+            prepare=lambda: _read_text(file_path)
+        )
+
+    def preload(self, *names: str):
+        """Build the given screens now."""
+        for name in names:
+            self._build(self._handles[name])
+
+    def prefetch(self, name: str):
+        """Start preparing a screen in the background."""
+        handle = self._handles[name]
+        if handle.prepare is not None and handle.future is None and handle.screen is None:
+            handle.future = self._executor.submit(handle.prepare)
+
+    def finish_prefetch(self):
+        """Wait for running background preparation (e.g. before timing-critical trials)."""
+        for handle in self._handles.values():
+            if handle.future is not None:
+                handle.future.result()
+
+    def release(self, name: str):
+        """Drop a screen (and its texture) that will not be shown again."""
+        handle = self._handles[name]
+        handle.screen = None
+        handle.future = None
+
+    def _build(self, handle: ScreenHandle) -> Screen:
+        if handle.screen is None:
+            # Errors of the preparation (e.g. a missing file) are handled here, on the main thread
+            try:
+                if handle.future is not None:
+                    data = handle.future.result()
+                else:
+                    data = handle.prepare() if handle.prepare is not None else None
+            except Exception as e:
+                print(f"Error preparing screen {handle.name}: {e}")
+                self.display.quit_experiment()
+            with TRACER.span(f"build screen {handle.name}"):
+                if self.profiler is not None:
+                    with self.profiler.measure(f"screen {handle.name}"):
+                        handle.screen = handle.build(data)
+                else:
+                    handle.screen = handle.build(data)
+            handle.future = None
+        return handle.screen
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handles
+
+    def __getitem__(self, name: str) -> Screen:
+        names = list(self._handles)
+        position = names.index(name)
+        screen = self._build(self._handles[name])
+
+        # Screens before this one have been shown: release them
+        if not self.keep_shown:
+            for earlier in names[:position]:
+                if self._handles[earlier].screen is not None:
+                    self.release(earlier)
+        # Prepare the next screen while this one is shown
+        if position + 1 < len(names):
+            self.prefetch(names[position + 1])
+        return screen
@@ -1,2 +1,39 @@
-from .stimuli import *
-from .data import *
+# Submodules are imported on first use (see experiment/_lazy.py)
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    "StimuliManager": "stimuli",
+    "DataManager": "data",
+    "AtlasRegion": "atlas",
+    "TextureAtlas": "atlas",
+    "AtlasSprite": "atlas",
+    "IMAGE_EXTENSIONS": "plans",
+    "STIMULUS_SETS": "plans",
+    "BlockLayout": "plans",
+    "SESSION_LAYOUT": "plans",
+    "list_stimulus_files": "plans",
+    "derive_seed": "plans",
+    "orient_pairs": "plans",
+    "schedule_pairs": "plans",
+    "compute_break_points": "plans",
+    "BlockPlan": "plans",
+    "SessionPlan": "plans",
+    "build_session_plan": "plans",
+    "SessionPlanStore": "plans",
+    "MANIFEST_PATH": "manifest",
+    "StimulusRecord": "manifest",
+    "StimulusManifest": "manifest",
+    "MACHINE_PROFILE_DIR": "machine_profile",
+    "CalibrationTolerance": "machine_profile",
+    "MachineProfile": "machine_profile",
+    "machine_name": "machine_profile",
+    "machine_profile_path": "machine_profile",
+    "SessionLog": "session_log",
+    "read_session_log": "session_log",
+    "load_session": "session_log",
+    "SessionStore": "session_store",
+    "read_session_csv": "session_store",
+}
+_SUBMODULES = ["stimuli", "data", "plans", "atlas", "manifest", "machine_profile", "session_log", "session_store"]
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, _SUBMODULES)
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import List, Dict, Tuple
+from psychopy import visual
+from PIL import Image
+from ..utils.memory import MEMORY_LEDGER, texture_bytes
+
+@dataclass
+class AtlasRegion:
+    """Location of one image inside an atlas page (in pixels, origin top-left)"""
+    page: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+class TextureAtlas:
+    """
+    Packs display-resolution stimulus images into a few large textures.
+
+    Images are placed with a simple shelf packer (tallest first) on square,
+    power-of-two pages, so the texture memory of a stimulus set is known up
+    front: `n_pages * page_size**2 * 4` bytes. Each stimulus is then drawn as a
+    sub-rectangle of its page: all stimuli on a page share one GratingStim (one
+    texture), whose size, spatial frequency and phase select the region.
+    """
+    def __init__(self, win: visual.Window, page_size: int = 2048, padding: int = 2):
+        """
+        Args:
+            win: The PsychoPy window.
+            page_size: Width and height (in pixels) of each atlas page; a power of two.
+            padding: Empty pixels between images, so interpolation does not bleed.
+        """
+        if page_size & (page_size - 1):
+            raise ValueError("The atlas page size must be a power of two.")
+        self.win = win
+        self.page_size = page_size
+        self.padding = padding
+        self.regions: Dict[str, AtlasRegion] = {}
+        self.pages: List[Image.Image] = []
+        self._page_stims: List[visual.GratingStim] = []
+
+    def pack(self, images: Dict[str, Image.Image]):
+        """
+        Pack the images into pages.
+
+        Args:
+            images: Key -> image, already resized to the size it is displayed at.
+        """
+        order = sorted(images, key=lambda key: images[key].size[1], reverse=True)
+        shelves: List[List[int]] = []  # per page: [shelf_y, shelf_height, cursor_x]
+        for key in order:
+            width, height = images[key].size
+            if width + self.padding > self.page_size or height + self.padding > self.page_size:
+                raise ValueError(
+                    f"Image {key} ({width}x{height}) does not fit in a {self.page_size}px atlas page.")
+
+            region = None
+            for page, shelf in enumerate(shelves):
+                shelf_y, shelf_height, cursor_x = shelf
+                # Same shelf, if there is room to the right
+                if cursor_x + width + self.padding <= self.page_size and height <= shelf_height:
+                    region = AtlasRegion(page, cursor_x, shelf_y, width, height)
+                    shelf[2] += width + self.padding
+                    break
+                # New shelf below the current one
+                new_y = shelf_y + shelf_height + self.padding
+                if new_y + height + self.padding <= self.page_size:
+                    region = AtlasRegion(page, self.padding, new_y, width, height)
+                    shelves[page] = [new_y, height, self.padding + width + self.padding]
+                    break
+            if region is None:
+                # New page
+                shelves.append([self.padding, height, self.padding + width + self.padding])
+                self.pages.append(Image.new("RGB", (self.page_size, self.page_size), "white"))
+                region = AtlasRegion(len(self.pages) - 1, self.padding, self.padding, width, height)
+
+            self.pages[region.page].paste(images[key].convert("RGB"), (region.x, region.y))
+            self.regions[key] = region
+
+    @property
+    def nbytes(self) -> int:
+        """Texture memory used by the atlas pages (RGBA)"""
+        return len(self.pages) * self.page_size * self.page_size * 4
+
+    def create_stim(self, key: str, size: Tuple[float, float]) -> 'AtlasSprite':
+        """
+        Create a drawable for the region of `key`.
+
+        Args:
+            key: The key the image was packed under.
+            size: Display size (width, height) in height units.
+
+        Returns:
+            An AtlasSprite that draws only the region of the image.
+        """
+        if not self._page_stims:
+            # One GratingStim (and so one texture upload) per page, shared by all sprites
+            self._page_stims = [
+                visual.GratingStim(self.win, tex=page, mask=None, interpolate=True, units='height')
+                for page in self.pages
+            ]
+            # The pages stay in RAM as well (held by the atlas)
+            for stim, page in zip(self._page_stims, self.pages):
+                MEMORY_LEDGER.track(stim, "stimuli", texture_bytes(*page.size), page.width * page.height * len(page.mode))
+
+        region = self.regions[key]
+        page_size = float(self.page_size)
+
+        # One texture cycle is the whole page: the stimulus must span region/page of it
+        sf = (region.width / page_size / size[0], region.height / page_size / size[1])
+        # Texture coordinates have their origin at the bottom-left, and the stimulus
+        # centre is at texture coordinate 0.5 - phase
+        center_u = (region.x + region.width / 2) / page_size
+        center_v = 1 - (region.y + region.height / 2) / page_size
+        return AtlasSprite(self._page_stims[region.page], size, sf, (0.5 - center_u, 0.5 - center_v))
+
+
+class AtlasSprite:
+    """
+    A sub-rectangle of an atlas page, used in place of a stimulus' ImageStim.
+
+    Supports what the experiment uses of an ImageStim: `size`, `pos`, `units` and `draw()`.
+    """
+    def __init__(
+        self,
+        page_stim: visual.GratingStim,
+        size: Tuple[float, float],
+        sf: Tuple[float, float],
+        phase: Tuple[float, float]
+    ):
+        self.page_stim = page_stim
+        self.size = size
+        self.sf = sf
+        self.phase = phase
+        self.pos = (0, 0)
+        self.units = 'height'
+
+    def draw(self):
+        stim = self.page_stim
+        stim.units = self.units
+        stim.size = self.size
+        stim.sf = self.sf
+        stim.phase = self.phase
+        stim.pos = self.pos
+        stim.draw()
@@ -1,25 +1,53 @@
 from typing import Optional, List, Dict, Tuple
-from psychopy import visual, core, event
 import csv
 import os
-import json
 from ..core import Participant, Trial
+from ..utils.tracing import traced
+from .session_log import SessionLog
+from .session_store import SessionStore
 
 class DataManager:
     """Manages data saving operations"""
-    def __init__(self, participant: Participant):
+    def __init__(self, participant: Participant, store: Optional[SessionStore] = None):
+        """
+        Args:
+            participant: The participant whose data is saved.
+            store: Optional session database; trials are then also written into it as they happen.
+        """
         self.participant = participant
+        self.store = store
         self.ensure_data_dir()
+        self.session_id = store.open_session(participant.metadata()) if store is not None else None
+
+        # Every event is appended to data/<id>_<start time>.jsonl as it happens
+        self.log = SessionLog(f"data/{participant._get_datafile_name()}.jsonl")
+        if self.log.is_new:
+            self.log.append(
+                "session_start",
+                participant_id=participant.participant_id,
+                start_time=participant.start_time,
+                seed=participant.seed,
+                rng_streams=participant.rng_streams
+            )
+        else:
+            self.log.append("session_resume")
     
     @staticmethod
     def ensure_data_dir():
         """Ensure data directory exists"""
         if not os.path.exists('data'):
             os.makedirs('data')
+
+    def log_event(self, event: str, **data):
+        """Append an event (e.g. a screen shown or a key pressed) to the session log"""
+        self.log.append(event, **data)
     
+    @traced("save_trial")
     def save_trial(self, trial: Trial):
         """Save trial data to CSV and update experiment data"""
         self.participant.add_trial(trial)
+        record = trial.to_json()
+        self.log.append("trial", trial=record)
         
         # Get unique file name with ID + timestamp
         file_name = self.participant._get_datafile_name() 
@@ -32,18 +60,46 @@ class DataManager:
             if write_header:
                 writer.writerow(['id', 'trial', 'round_type', 'left_image', 'right_image', 'response', 'rt'])
             writer.writerow(trial.to_csv_row(self.participant.participant_id))
+
+        if self.store is not None:
+            self.store.save_trial(self.session_id, record)
     
+    def save_demographic(self, name: str, value):
+        """Save one demographic answer as soon as it is given"""
+        self.participant.demographics[name] = value
+        self.log.append("demographic", name=name, value=value)
+
     def save_demographics(self, demographics: Dict):
         """Save demographics to experiment data"""
-        self.participant.add_demographics(demographics)
+        for name, value in demographics.items():
+            self.save_demographic(name, value)
     
     def save_feedback(self, feedback: str):
         """Save feedback to experiment data"""
         self.participant.add_feedback(feedback)
+        self.log.append("feedback", text=feedback)
+    
+    def save_block_summary(self, round_type: str, summary: Dict):
+        """Save the online score estimates and statistics of a block to experiment data"""
+        self.participant.add_block_summary(round_type, summary)
+        self.log.append("block_summary", round_type=round_type, summary=summary)
+    
+    def save_performance(self, name: str, statistics: Dict):
+        """Save timing/resource statistics (e.g. render loop times) to experiment data"""
+        self.participant.add_performance(name, statistics)
+        self.log.append("performance", name=name, statistics=statistics)
     
+    @traced("save_all")
     def save_all(self):
-        """Save all experiment data to JSON"""
-        file_name = self.participant._get_datafile_name()
-        json_path = f"data/{file_name}.json"
-        with open(json_path, 'w') as f:
-            json.dump(self.participant.to_json(), f, indent=2)
+        """
+        Finalize the session: everything is already in the log, so only a footer
+        (end time, duration, number of trials) is appended.
+        """
+        self.log.finalize(
+            end_time=self.participant.end_time,
+            duration=self.participant.duration,
+            n_trials=len(self.participant.trials)
+        )
+        if self.store is not None:
+            # Only the participant row changes; the trials were written as they happened
+            self.store.open_session(self.participant.metadata())
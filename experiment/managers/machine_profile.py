@@ -0,0 +1,92 @@
+from dataclasses import dataclass, asdict
+from typing import Optional, List
+from datetime import datetime
+import json
+import os
+import platform
+import re
+
+# Folder of the machine profiles (written by experiment/precompute/calibration.py)
+MACHINE_PROFILE_DIR = "calibration"
+
+def machine_name() -> str:
+    """Name of this machine, usable as a file name."""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", platform.node() or "unknown")
+
+def machine_profile_path(name: Optional[str] = None) -> str:
+    """Path of the profile of a machine (by default this one)."""
+    return os.path.join(MACHINE_PROFILE_DIR, f"{name or machine_name()}.json")
+
+@dataclass
+class CalibrationTolerance:
+    """Limits a lab machine must meet to collect reaction times"""
+    min_refresh_hz: float = 59.0
+    max_flip_jitter_ms: float = 1.0  # standard deviation of the frame intervals
+    max_dropped_frames: float = 0.01  # fraction of frames that took longer than 1.5 refresh periods
+    max_stimulus_upload_ms: float = 50.0  # mean time to load one stimulus texture (over every stimulus set)
+    max_text_layout_ms: float = 20.0  # median time to lay out the labels of one trial
+    max_disk_write_p99_ms: float = 10.0  # 99th percentile of the time to append one trial to the session log
+    max_age_days: int = 180  # calibrate again after driver/hardware changes
+
+@dataclass
+class MachineProfile:
+    """Timing measurements of one lab machine"""
+    machine: str
+    created: str
+    window_size: List[int]  # pixels
+    refresh_hz: float
+    frame_ms: float  # median frame interval
+    flip_jitter_ms: float
+    dropped_frames: float
+    texture_upload_mb_per_s: float
+    stimulus_upload_ms: float  # mean time to load one stimulus texture
+    text_layout_ms: float
+    disk_write_ms: float  # median time to append one trial to the session log
+    disk_write_p99_ms: float  # 99th percentile of the same
+    disk_sync_ms: float  # median time to append and fsync (as when a session ends)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'MachineProfile':
+        with open(path or machine_profile_path(), 'r') as f:
+            return cls(**json.load(f))
+
+    def save(self, path: Optional[str] = None):
+        path = path or machine_profile_path(self.machine)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(asdict(self), f, indent=2)
+
+    def to_json(self):
+        return asdict(self)
+
+    def check(self, tolerance: Optional[CalibrationTolerance] = None) -> List[str]:
+        """
+        Compare the measurements with the tolerance.
+
+        Returns:
+            A description of every measurement outside the tolerance (empty if the machine is fine).
+        """
+        tolerance = tolerance or CalibrationTolerance()
+        problems = []
+        if self.refresh_hz < tolerance.min_refresh_hz:
+            problems.append(f"refresh rate {self.refresh_hz:.1f} Hz is below {tolerance.min_refresh_hz:.1f} Hz")
+        if self.flip_jitter_ms > tolerance.max_flip_jitter_ms:
+            problems.append(f"flip jitter {self.flip_jitter_ms:.2f} ms exceeds {tolerance.max_flip_jitter_ms:.2f} ms")
+        if self.dropped_frames > tolerance.max_dropped_frames:
+            problems.append(f"{self.dropped_frames:.1%} of the frames were dropped "
+                            f"(at most {tolerance.max_dropped_frames:.1%})")
+        if self.stimulus_upload_ms > tolerance.max_stimulus_upload_ms:
+            problems.append(f"loading a stimulus takes {self.stimulus_upload_ms:.1f} ms "
+                            f"(at most {tolerance.max_stimulus_upload_ms:.1f} ms)")
+        if self.text_layout_ms > tolerance.max_text_layout_ms:
+            problems.append(f"laying out the trial labels takes {self.text_layout_ms:.1f} ms "
+                            f"(at most {tolerance.max_text_layout_ms:.1f} ms)")
+        if self.disk_write_p99_ms > tolerance.max_disk_write_p99_ms:
+            problems.append(f"saving a trial takes {self.disk_write_p99_ms:.1f} ms at the 99th percentile "
+                            f"(at most {tolerance.max_disk_write_p99_ms:.1f} ms)")
+        age = datetime.now() - datetime.strptime(self.created, "%Y%m%d_%H%M%S")
+        if age.days > tolerance.max_age_days:
+            problems.append(f"the calibration is {age.days} days old")
+        return problems
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict
+from datetime import datetime
+import json
+import os
+
+# Default location of the stimulus manifest (written by experiment/precompute/stimulus_manifest.py)
+MANIFEST_PATH = "images/stimulus_manifest.json"
+
+@dataclass(frozen=True)
+class StimulusRecord:
+    """Properties of one stimulus image, as verified by the preflight"""
+    filename: str
+    width: int
+    height: int
+    mode: str  # PIL color mode, e.g. "RGB"
+    bytes: int  # file size
+    sha256: str  # hash of the file content
+
+class StimulusManifest:
+    """
+    Verified list of the stimulus images of every stimulus folder.
+
+    The manifest maps each folder (e.g. "images/trials/comparison") to the
+    records of its images, in sorted order. Loading stimuli from it skips the
+    directory scan and the image header reads; `check` only compares the file
+    sizes on disk with the recorded ones, so a replaced or truncated image
+    fails at startup instead of during a block.
+    """
+    def __init__(self, directories: Dict[str, List[StimulusRecord]], created: Optional[str] = None):
+        self.directories = directories
+        self.created = created or datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    @classmethod
+    def load(cls, path: str = MANIFEST_PATH) -> 'StimulusManifest':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        directories = {
+            directory: [StimulusRecord(**record) for record in records]
+            for directory, records in data["directories"].items()
+        }
+        return cls(directories, data.get("created"))
+
+    def save(self, path: str = MANIFEST_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "created": self.created,
+            "directories": {
+                directory: [asdict(record) for record in records]
+                for directory, records in self.directories.items()
+            },
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def records(self, directory: str) -> List[StimulusRecord]:
+        """The records of a folder; raises ValueError if the folder is not in the manifest."""
+        key = os.path.normpath(directory)
+        for listed, records in self.directories.items():
+            if os.path.normpath(listed) == key:
+                return records
+        raise ValueError(
+            f"{directory} is not in the stimulus manifest. "
+            "Run experiment/precompute/stimulus_manifest.py again."
+        )
+
+    def check(self, directory: str) -> List[StimulusRecord]:
+        """
+        Records of a folder, after checking that every file still exists with its recorded size.
+
+        Raises:
+            ValueError: If a file is missing or changed since the preflight.
+        """
+        records = self.records(directory)
+        problems = []
+        for record in records:
+            path = os.path.join(directory, record.filename)
+            try:
+                size = os.stat(path).st_size
+            except FileNotFoundError:
+                problems.append(f"{path} is missing")
+                continue
+            if size != record.bytes:
+                problems.append(f"{path} changed ({size} bytes, {record.bytes} in the manifest)")
+        if problems:
+            raise ValueError(
+                "Stimuli do not match the manifest:\n  " + "\n  ".join(problems)
+                + "\nRun experiment/precompute/stimulus_manifest.py again."
+            )
+        return records
@@ -0,0 +1,297 @@
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Tuple, Iterable
+import itertools
+import json
+import os
+import random
+from ..utils.rng import RandomStreams
+
+# Image extensions that are picked up as stimuli
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Stimulus folders: name -> (comparison_dir, reference_dir)
+STIMULUS_SETS = {
+    "practice": ('images/practice/comparison', 'images/practice/reference'),
+    "trials": ('images/trials/comparison', 'images/trials/reference'),
+}
+
+@dataclass(frozen=True)
+class BlockLayout:
+    """Static description of one block in the session (must match run.py)"""
+    round_type: str
+    stimulus_set: str
+    num_breaks: int = 0
+
+# The blocks of a session, in the order they are presented.
+# The liking and similarity blocks share the main-set pairs (and their orientation).
+SESSION_LAYOUT = (
+    BlockLayout(round_type="practice", stimulus_set="practice", num_breaks=0),
+    BlockLayout(round_type="liking", stimulus_set="trials", num_breaks=1),
+    BlockLayout(round_type="similarity", stimulus_set="trials", num_breaks=1),
+)
+
+
+def list_stimulus_files(directory: str) -> List[str]:
+    """Return the (sorted) image file names in a stimulus folder."""
+    return sorted(f for f in os.listdir(directory) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def derive_seed(base_seed: int, participant_id: str) -> int:
+    """Derive a stable 64-bit session seed for a participant from the study-wide base seed."""
+    return RandomStreams.derive_seed(base_seed, participant_id)
+
+
+def orient_pairs(n_stimuli: int, rng=random) -> List[Tuple[int, int]]:
+    """
+    Generate all unique pairs of stimulus indices, each with a random left-right orientation.
+
+    Args:
+        n_stimuli: Number of stimuli in the set.
+        rng: A `random.Random` instance (or the `random` module itself).
+
+    Returns:
+        List of (left_index, right_index) tuples.
+    """
+    return [
+        (i, j) if rng.choice([True, False]) else (j, i)
+        for i, j in itertools.combinations(range(n_stimuli), 2)
+    ]
+
+
+def schedule_pairs(pairs: List[Tuple], pair_repeats: int = 1, rng=random) -> List[Tuple]:
+    """
+    Order the pairs for presentation.
+
+    For each repeat, all pairs are presented once in a random order, followed by
+    all pairs with swapped positions in another random order.
+
+    Args:
+        pairs: List of (left, right) tuples.
+        pair_repeats: Number of times each pair (in both orientations) is presented.
+        rng: A `random.Random` instance (or the `random` module itself).
+
+    Returns:
+        List of (left, right) tuples in presentation order.
+    """
+    order = []
+    for _ in range(pair_repeats):
+        # Shuffled pairs for first presentation
+        shuffled_pairs = rng.sample(pairs, len(pairs))
+
+        # Reversed pairs for second presentation
+        reversed_pairs = [(right, left) for left, right in shuffled_pairs]
+        rng.shuffle(reversed_pairs)
+
+        order.extend(shuffled_pairs)
+        order.extend(reversed_pairs)
+    return order
+
+
+def compute_break_points(n_trials: int, num_breaks: int) -> List[int]:
+    """
+    Trial numbers (1-based) after which a break screen is shown.
+
+    The trials are split into `num_breaks + 1` equally sized parts; a break is
+    never shown after the last trial.
+    """
+    n_parts = num_breaks + 1
+    if n_parts <= 1:
+        return []
+    part_size = n_trials // n_parts
+    if part_size == 0:
+        return []
+    return [part_size * k for k in range(1, n_parts) if part_size * k < n_trials]
+
+
+@dataclass
+class BlockPlan:
+    """Precomputed trial order of one block"""
+    round_type: str
+    stimulus_set: str
+    trials: List[Tuple[int, int]]  # (left_index, right_index) into the stimulus set
+    break_points: List[int] = field(default_factory=list)
+
+    def to_json(self) -> Dict:
+        return {
+            "round_type": self.round_type,
+            "stimulus_set": self.stimulus_set,
+            # Flattened as [left, right, left, right, ...] to keep the file compact
+            "trials": [index for pair in self.trials for index in pair],
+            "break_points": self.break_points,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'BlockPlan':
+        flat = data["trials"]
+        return cls(
+            round_type=data["round_type"],
+            stimulus_set=data["stimulus_set"],
+            trials=list(zip(flat[0::2], flat[1::2])),
+            break_points=list(data.get("break_points", [])),
+        )
+
+
+@dataclass
+class SessionPlan:
+    """Complete, reproducible trial schedule of one participant's session"""
+    participant_id: str
+    seed: int
+    pair_repeats: int
+    stimuli: Dict[str, List[str]]  # stimulus set -> comparison file names (index order)
+    blocks: List[BlockPlan] = field(default_factory=list)
+    stream_seeds: Dict[str, int] = field(default_factory=dict)  # random stream name -> seed
+
+    def block(self, round_type: str) -> BlockPlan:
+        """Return the plan of the block with the given round type."""
+        for block in self.blocks:
+            if block.round_type == round_type:
+                return block
+        raise KeyError(f"Session plan for {self.participant_id} has no '{round_type}' block.")
+
+    def to_json(self) -> Dict:
+        return {
+            "participant_id": self.participant_id,
+            "seed": self.seed,
+            "pair_repeats": self.pair_repeats,
+            "blocks": [block.to_json() for block in self.blocks],
+            "stream_seeds": self.stream_seeds,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict, stimuli: Dict[str, List[str]]) -> 'SessionPlan':
+        return cls(
+            participant_id=data["participant_id"],
+            seed=data["seed"],
+            pair_repeats=data["pair_repeats"],
+            stimuli=stimuli,
+            blocks=[BlockPlan.from_json(block) for block in data["blocks"]],
+            stream_seeds=data.get("stream_seeds", {}),
+        )
+
+
+def build_session_plan(
+    participant_id: str,
+    stimuli: Dict[str, List[str]],
+    base_seed: int,
+    pair_repeats: int = 1,
+    layout: Iterable[BlockLayout] = SESSION_LAYOUT
+) -> SessionPlan:
+    """
+    Generate the session plan of a participant.
+
+    The result only depends on the participant ID, the base seed, the stimulus
+    file names and the layout, so it can be regenerated at any time.
+
+    Args:
+        participant_id: The participant ID.
+        stimuli: Stimulus set name -> sorted comparison file names.
+        base_seed: Study-wide seed.
+        pair_repeats: Number of repeats of each pair (in both orientations).
+        layout: The blocks of the session.
+
+    Returns:
+        The SessionPlan.
+    """
+    seed = derive_seed(base_seed, participant_id)
+    streams = RandomStreams(seed)
+
+    # Pairs (and their orientation) are shared by all blocks of a stimulus set
+    pairs = {}
+    blocks = []
+    for block in layout:
+        if block.stimulus_set not in pairs:
+            pairs[block.stimulus_set] = orient_pairs(
+                len(stimuli[block.stimulus_set]), streams.stream(f"pairs/{block.stimulus_set}"))
+        trials = schedule_pairs(
+            pairs[block.stimulus_set], pair_repeats, streams.stream(f"order/{block.round_type}"))
+        blocks.append(BlockPlan(
+            round_type=block.round_type,
+            stimulus_set=block.stimulus_set,
+            trials=trials,
+            break_points=compute_break_points(len(trials), block.num_breaks)
+        ))
+
+    return SessionPlan(
+        participant_id=participant_id,
+        seed=seed,
+        pair_repeats=pair_repeats,
+        stimuli=stimuli,
+        blocks=blocks,
+        stream_seeds=dict(streams.seeds)
+    )
+
+
+class SessionPlanStore:
+    """
+    Reads and writes precomputed session plans.
+
+    Plans are stored as one JSON line per participant in `<path>.jsonl`.
+    The index `<path>.index.json` holds the shared stimulus tables and the byte
+    offset of every participant's line, so a lookup reads a single line.
+    """
+    def __init__(self, path: str = "plans/session_plans"):
+        self.data_path = f"{path}.jsonl"
+        self.index_path = f"{path}.index.json"
+        self._index: Optional[Dict] = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.data_path) and os.path.exists(self.index_path)
+
+    def write(self, plans: List[SessionPlan], base_seed: int):
+        """Write all plans (overwriting an existing store)."""
+        if not plans:
+            raise ValueError("No session plans to write.")
+        stimuli = plans[0].stimuli
+        pair_repeats = plans[0].pair_repeats
+        directory = os.path.dirname(self.data_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        offsets = {}
+        with open(self.data_path, 'wb') as f:
+            for plan in plans:
+                if plan.participant_id in offsets:
+                    raise ValueError(f"Duplicate participant ID {plan.participant_id}.")
+                if plan.stimuli != stimuli or plan.pair_repeats != pair_repeats:
+                    raise ValueError("All plans in a store must use the same stimuli and pair_repeats.")
+                offsets[plan.participant_id] = f.tell()
+                line = json.dumps(plan.to_json(), separators=(',', ':')) + "\n"
+                f.write(line.encode("utf-8"))
+
+        index = {
+            "base_seed": base_seed,
+            "pair_repeats": pair_repeats,
+            "stimuli": stimuli,
+            "offsets": offsets,
+        }
+        with open(self.index_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        self._index = index
+
+    def _load_index(self) -> Dict:
+        if self._index is None:
+            with open(self.index_path, 'r') as f:
+                self._index = json.load(f)
+        return self._index
+
+    @property
+    def base_seed(self) -> int:
+        return self._load_index()["base_seed"]
+
+    @property
+    def pair_repeats(self) -> int:
+        return self._load_index()["pair_repeats"]
+
+    def participant_ids(self) -> List[str]:
+        return list(self._load_index()["offsets"])
+
+    def lookup(self, participant_id: str) -> Optional[SessionPlan]:
+        """Return the plan of a participant, or None if it was not precomputed."""
+        index = self._load_index()
+        offset = index["offsets"].get(participant_id)
+        if offset is None:
+            return None
+        with open(self.data_path, 'rb') as f:
+            f.seek(offset)
+            data = json.loads(f.readline().decode("utf-8"))
+        return SessionPlan.from_json(data, index["stimuli"])
@@ -0,0 +1,136 @@
+from typing import Optional, List, Dict, Any
+import json
+import os
+import time
+
+class SessionLog:
+    """
+    Append-only JSON Lines log of a session.
+
+    Every event (session start, screen shown, key pressed, trial, demographic
+    answer, feedback, block summary, ...) is written as one line when it
+    happens and flushed, so a crash loses at most the event being written.
+    Finalizing the session only appends a small "session_end" footer, however
+    long the session was. `read_session_log` rebuilds the participant record
+    (in the format of Participant.to_json) from the lines.
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the log file; an existing log is appended to (e.g. when resuming).
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path):
+            self._drop_partial_line(path)
+        self.is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _drop_partial_line(path: str):
+        """Cut off a last line left unfinished by a crash, so new events start on a line of their own."""
+        with open(path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            if end == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            # Walk back to the end of the last complete line
+            position = end
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    f.truncate(position - step + newline + 1)
+                    return
+                position -= step
+            f.truncate(0)
+
+    def append(self, event: str, **data: Any):
+        """Write one event (a JSON object with "event", "time" and the given fields)."""
+        record = {"event": event, "time": time.time()}
+        record.update(data)
+        self._file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self._file.flush()
+
+    def finalize(self, **data: Any):
+        """Append the footer that marks the session as complete, and close the log."""
+        self.append("session_end", **data)
+        os.fsync(self._file.fileno())
+        self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+def read_session_log(path: str) -> Dict:
+    """
+    Rebuild a participant record from a session log.
+
+    Args:
+        path: Path of the .jsonl log.
+
+    Returns:
+        The record in the format of Participant.to_json, plus "complete" (whether the
+        footer was written) and "screens" (names of the screens shown, in order). A trial
+        logged twice (e.g. repeated after resuming) keeps its last version.
+    """
+    session = {
+        "participant_id": None,
+        "start_time": None,
+        "end_time": None,
+        "duration": None,
+        "seed": None,
+        "rng_streams": {},
+        "demographics": {},
+        "feedback": "",
+        "performance": {},
+        "block_summaries": {},
+        "trials": [],
+        "complete": False,
+        "screens": [],
+    }
+    trials: Dict[tuple, Dict] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut off by a crash (events after it were written when resuming)
+            event = record.get("event")
+            if event == "session_start":
+                for key in ("participant_id", "start_time", "seed", "rng_streams"):
+                    session[key] = record.get(key, session[key])
+            elif event == "trial":
+                trial = record["trial"]
+                trials.pop((trial["round_type"], trial["trial_num"]), None)
+                trials[(trial["round_type"], trial["trial_num"])] = trial
+            elif event == "screen":
+                session["screens"].append(record["name"])
+            elif event == "demographic":
+                session["demographics"][record["name"]] = record["value"]
+            elif event == "feedback":
+                session["feedback"] = record["text"]
+            elif event == "block_summary":
+                session["block_summaries"][record["round_type"]] = record["summary"]
+            elif event == "performance":
+                session["performance"][record["name"]] = record["statistics"]
+            elif event == "session_end":
+                session["end_time"] = record.get("end_time")
+                session["duration"] = record.get("duration")
+                session["complete"] = True
+    session["trials"] = list(trials.values())
+    return session
+
+def load_session(path: str) -> Dict:
+    """Read a participant record from a session log (.jsonl) or a participant JSON file (.json)."""
+    if path.endswith(".jsonl"):
+        return read_session_log(path)
+    with open(path, 'r') as f:
+        return json.load(f)
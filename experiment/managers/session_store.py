@@ -0,0 +1,327 @@
+from typing import Optional, List, Dict, Iterable, Tuple, Any
+from pathlib import Path
+import argparse
+import csv
+import glob
+import json
+import os
+import sqlite3
+from .session_log import read_session_log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    session_id INTEGER PRIMARY KEY,
+    participant_id TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    duration REAL,
+    seed INTEGER,
+    rng_streams TEXT,
+    demographics TEXT,
+    feedback TEXT,
+    performance TEXT,
+    block_summaries TEXT,
+    UNIQUE (participant_id, start_time)
+);
+CREATE TABLE IF NOT EXISTS stimuli (
+    stimulus_id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS pairs (
+    pair_id INTEGER PRIMARY KEY,
+    first_id INTEGER NOT NULL REFERENCES stimuli,
+    second_id INTEGER NOT NULL REFERENCES stimuli,
+    UNIQUE (first_id, second_id)
+);
+CREATE TABLE IF NOT EXISTS trials (
+    session_id INTEGER NOT NULL REFERENCES participants ON DELETE CASCADE,
+    round_type TEXT NOT NULL,
+    trial_num INTEGER NOT NULL,
+    left_id INTEGER NOT NULL REFERENCES stimuli,
+    right_id INTEGER NOT NULL REFERENCES stimuli,
+    reference_id INTEGER REFERENCES stimuli,
+    pair_id INTEGER NOT NULL REFERENCES pairs,
+    comparison_order INTEGER,
+    response TEXT,
+    reaction_time REAL,
+    PRIMARY KEY (session_id, round_type, trial_num)
+);
+CREATE INDEX IF NOT EXISTS participants_by_id ON participants (participant_id);
+CREATE INDEX IF NOT EXISTS participants_by_start ON participants (start_time);
+CREATE INDEX IF NOT EXISTS trials_by_left ON trials (left_id);
+CREATE INDEX IF NOT EXISTS trials_by_right ON trials (right_id);
+CREATE INDEX IF NOT EXISTS trials_by_reference ON trials (reference_id);
+CREATE INDEX IF NOT EXISTS trials_by_pair ON trials (pair_id);
+"""
+
+# Trial columns returned by the queries, with the stimulus names resolved
+TRIAL_QUERY = """
+SELECT p.participant_id, p.start_time, t.round_type, t.trial_num,
+       l.filename AS left_stimulus, r.filename AS right_stimulus, ref.filename AS reference_stimulus,
+       t.comparison_order, t.response, t.reaction_time
+FROM trials t
+JOIN participants p ON p.session_id = t.session_id
+JOIN stimuli l ON l.stimulus_id = t.left_id
+JOIN stimuli r ON r.stimulus_id = t.right_id
+LEFT JOIN stimuli ref ON ref.stimulus_id = t.reference_id
+"""
+
+class SessionStore:
+    """
+    Indexed SQLite database of all sessions.
+
+    Holds one row per session (participant), stimulus, unordered stimulus pair
+    and trial, with indexes on participant, start time, stimulus and pair, so
+    questions such as "all trials of stimulus X" or "sessions of last week" do
+    not require reading every data file. Sessions are written either by the
+    bulk loader (from the JSON/CSV files in data/) or directly by a DataManager.
+    """
+    def __init__(self, path: str = "data/sessions.sqlite"):
+        """
+        Args:
+            path: Path of the database file (created if needed).
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")  # cheap per-trial commits
+        self.connection.executescript(SCHEMA)
+        self._stimulus_ids: Dict[str, int] = {}
+        self._pair_ids: Dict[Tuple[int, int], int] = {}
+
+    def close(self):
+        self.connection.close()
+
+    def _stimulus_id(self, filename: Optional[str]) -> Optional[int]:
+        if filename is None:
+            return None
+        if filename not in self._stimulus_ids:
+            self.connection.execute("INSERT OR IGNORE INTO stimuli (filename) VALUES (?)", (filename,))
+            row = self.connection.execute("SELECT stimulus_id FROM stimuli WHERE filename = ?", (filename,)).fetchone()
+            self._stimulus_ids[filename] = row[0]
+        return self._stimulus_ids[filename]
+
+    def _pair_id(self, left_id: int, right_id: int) -> int:
+        key = (min(left_id, right_id), max(left_id, right_id))
+        if key not in self._pair_ids:
+            self.connection.execute("INSERT OR IGNORE INTO pairs (first_id, second_id) VALUES (?, ?)", key)
+            row = self.connection.execute(
+                "SELECT pair_id FROM pairs WHERE first_id = ? AND second_id = ?", key
+            ).fetchone()
+            self._pair_ids[key] = row[0]
+        return self._pair_ids[key]
+
+    def _session_values(self, session: Dict) -> Tuple:
+        return (
+            session.get("end_time"),
+            session.get("duration"),
+            session.get("seed"),
+            json.dumps(session.get("rng_streams") or {}),
+            json.dumps(session.get("demographics") or {}),
+            session.get("feedback"),
+            json.dumps(session.get("performance") or {}),
+            json.dumps(session.get("block_summaries") or {}),
+        )
+
+    def begin_session(self, session: Dict) -> int:
+        """
+        Create (or update) the participants row of a session.
+
+        Args:
+            session: Session data in the format of Participant.to_json (the trials are ignored).
+
+        Returns:
+            The session_id.
+        """
+        key = (str(session["participant_id"]), session["start_time"])
+        self.connection.execute(
+            "INSERT OR IGNORE INTO participants (participant_id, start_time) VALUES (?, ?)", key
+        )
+        self.connection.execute(
+            """UPDATE participants SET end_time = ?, duration = ?, seed = ?, rng_streams = ?, demographics = ?,
+               feedback = ?, performance = ?, block_summaries = ? WHERE participant_id = ? AND start_time = ?""",
+            self._session_values(session) + key
+        )
+        row = self.connection.execute(
+            "SELECT session_id FROM participants WHERE participant_id = ? AND start_time = ?", key
+        ).fetchone()
+        return row[0]
+
+    def _trial_values(self, session_id: int, trial: Dict) -> Tuple:
+        left_id = self._stimulus_id(trial["left_stimulus"])
+        right_id = self._stimulus_id(trial["right_stimulus"])
+        return (
+            session_id,
+            trial["round_type"],
+            trial["trial_num"],
+            left_id,
+            right_id,
+            self._stimulus_id(trial.get("reference_stimulus")),
+            self._pair_id(left_id, right_id),
+            trial.get("comparison_order"),
+            trial.get("response"),
+            trial.get("reaction_time"),
+        )
+
+    def add_trials(self, session_id: int, trials: Iterable[Dict]):
+        """Insert (or replace) trial records (in the format of Participant.to_json) of a session."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [self._trial_values(session_id, trial) for trial in trials]
+        )
+
+    def open_session(self, session: Dict) -> int:
+        """Create the participants row of a running session and commit. Returns the session_id."""
+        with self.connection:
+            return self.begin_session(session)
+
+    def save_trial(self, session_id: int, trial: Dict):
+        """Insert one trial record and commit (used while a session runs)."""
+        with self.connection:
+            self.add_trials(session_id, [trial])
+
+    def write_session(self, session: Dict) -> int:
+        """Write a whole session (Participant.to_json format), replacing an earlier copy. Returns the session_id."""
+        with self.connection:
+            session_id = self.begin_session(session)
+            self.connection.execute("DELETE FROM trials WHERE session_id = ?", (session_id,))
+            self.add_trials(session_id, session.get("trials", []))
+        return session_id
+
+    # ------------------------------------------------------------------
+    # Bulk loading of the data files
+    # ------------------------------------------------------------------
+    def load_files(self, paths: Iterable[str]) -> int:
+        """
+        Ingest participant data files in one transaction.
+
+        Session logs (.jsonl) and JSON files are loaded completely (a log of an
+        interrupted session holds the trials up to the interruption). A JSON file
+        is skipped when there is a log of the same session, and a CSV file is only
+        loaded when there is neither (e.g. an older session that ended early).
+
+        Returns:
+            The number of sessions loaded.
+        """
+        paths = sorted(paths)
+        log_stems = {Path(path).with_suffix("") for path in paths if path.endswith(".jsonl")}
+        json_stems = {Path(path).with_suffix("") for path in paths if path.endswith(".json")}
+        loaded = 0
+        with self.connection:
+            for path in paths:
+                stem = Path(path).with_suffix("")
+                if path.endswith(".jsonl"):
+                    session = read_session_log(path)
+                    if session["participant_id"] is None:
+                        continue  # the session start was never written
+                elif path.endswith(".json") and stem not in log_stems:
+                    with open(path, "r") as f:
+                        session = json.load(f)
+                    if "participant_id" not in session or "trials" not in session:
+                        continue  # not a session file (e.g. a startup profile)
+                elif path.endswith(".csv") and stem not in log_stems and stem not in json_stems:
+                    session = read_session_csv(path)
+                    if session is None:
+                        continue
+                else:
+                    continue
+                session_id = self.begin_session(session)
+                self.connection.execute("DELETE FROM trials WHERE session_id = ?", (session_id,))
+                self.add_trials(session_id, session["trials"])
+                loaded += 1
+        return loaded
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def query(self, sql: str, parameters: Tuple = ()) -> List[Dict[str, Any]]:
+        """Run a query and return the rows as dictionaries."""
+        return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def trials(self, round_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All trials (of one round type), in the format of combine_data.py."""
+        if round_type is None:
+            return self.query(TRIAL_QUERY)
+        return self.query(TRIAL_QUERY + " WHERE t.round_type = ?", (round_type,))
+
+    def trials_for_stimulus(self, filename: str) -> List[Dict[str, Any]]:
+        """All trials in which a stimulus was shown (left, right or as reference)."""
+        stimulus_id = self._stimulus_id_if_known(filename)
+        return self.query(
+            TRIAL_QUERY + " WHERE t.left_id = ? UNION ALL " + TRIAL_QUERY + " WHERE t.right_id = ? UNION ALL "
+            + TRIAL_QUERY + " WHERE t.reference_id = ?",
+            (stimulus_id, stimulus_id, stimulus_id)
+        )
+
+    def trials_for_pair(self, first: str, second: str) -> List[Dict[str, Any]]:
+        """All trials comparing two stimuli, in either orientation."""
+        first_id, second_id = self._stimulus_id_if_known(first), self._stimulus_id_if_known(second)
+        if first_id is None or second_id is None:
+            return []
+        return self.query(
+            TRIAL_QUERY + " JOIN pairs pr ON pr.pair_id = t.pair_id WHERE pr.first_id = ? AND pr.second_id = ?",
+            (min(first_id, second_id), max(first_id, second_id))
+        )
+
+    def sessions(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Sessions started within a time range.
+
+        Args:
+            start: Earliest start time ("YYYYMMDD_HHMMSS", or a prefix such as "20250101").
+            end: Latest start time, in the same format (a prefix includes the whole day).
+        """
+        end = end or "9"
+        return self.query(
+            "SELECT * FROM participants WHERE start_time >= ? AND substr(start_time, 1, ?) <= ? ORDER BY start_time",
+            (start or "", len(end), end)
+        )
+
+    def _stimulus_id_if_known(self, filename: str) -> Optional[int]:
+        row = self.connection.execute("SELECT stimulus_id FROM stimuli WHERE filename = ?", (filename,)).fetchone()
+        return row[0] if row else None
+
+def read_session_csv(path: str) -> Optional[Dict]:
+    """
+    Read a per-trial CSV file (written by DataManager.save_trial) as session data.
+
+    The start time is taken from the file name (<participant_id>_<YYYYMMDD>_<HHMMSS>.csv).
+    """
+    stem = Path(path).stem
+    parts = stem.rsplit("_", 2)
+    if len(parts) != 3:
+        return None
+    participant_id, start_time = parts[0], f"{parts[1]}_{parts[2]}"
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    return {
+        "participant_id": participant_id,
+        "start_time": start_time,
+        "trials": [
+            {
+                "trial_num": int(row["trial"]),
+                "round_type": row["round_type"],
+                "left_stimulus": row["left_image"],
+                "right_stimulus": row["right_image"],
+                "response": row["response"],
+                "reaction_time": float(row["rt"]) if row["rt"] not in ("", "NA") else None,
+            }
+            for row in rows
+        ],
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load the participant data files into the session database.")
+    parser.add_argument("files", nargs="*", help="JSON/CSV files to load (default: all files in data/)")
+    parser.add_argument("--database", default="data/sessions.sqlite", help="Path of the database file")
+    args = parser.parse_args()
+
+    files = args.files or [
+        path for pattern in ("*.jsonl", "*.json", "*.csv") for path in glob.glob(os.path.join("data", pattern))
+    ]
+    store = SessionStore(args.database)
+    loaded = store.load_files(files)
+    store.close()
+    print(f"Loaded {loaded} sessions into {args.database}")
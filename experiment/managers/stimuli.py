@@ -1,12 +1,14 @@
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Tuple
 from psychopy import visual, core, event
-import random
-import os
-import itertools
+from PIL import Image
 import os
 from ..core import Stimulus, Comparison, Trial
-import numpy as np
+from ..utils.rng import RandomStreams
+from ..utils.tracing import traced
+from .atlas import TextureAtlas
+from .manifest import StimulusManifest
+from .plans import BlockPlan, list_stimulus_files, orient_pairs, schedule_pairs
 
 class StimuliManager:
     """Manages stimuli loading and trial generation"""
@@ -21,27 +23,39 @@ class StimuliManager:
         self.stimuli: List[Stimulus] = []
         self.reference: Optional[Stimulus] = None
         self.pairs: List[Comparison] = []
+        self.streams: Optional[RandomStreams] = None  # random streams used for trial generation
+        self.atlas: Optional[TextureAtlas] = None
         
-    def load_stimuli(self, win: visual.Window):
+    @traced("load_stimuli")
+    def load_stimuli(
+        self,
+        win: visual.Window,
+        use_atlas: bool = False,
+        atlas_page_size: int = 2048,
+        manifest: Optional[StimulusManifest] = None
+    ):
         """
         Load and preload all stimuli.
 
         Creates a Stimulus instance for each image in the comparison directory.
         Also loads a reference stimulus from the reference directory (if provided).
+
+        Args:
+            win: The PsychoPy window.
+            use_atlas: Pack the stimuli, at display resolution, into a few large
+                textures instead of creating one texture per image.
+            atlas_page_size: Size (in pixels) of each atlas page.
+            manifest: Optional stimulus manifest (from experiment/precompute/stimulus_manifest.py).
+                The file lists and image sizes are then taken from it instead of the folders.
+
+        Raises:
+            ValueError: If the reference folder does not hold exactly one image, or the
+                images do not match the manifest.
         """
 
-        # Load comparison stimuli
-        comp_files = [f for f in os.listdir(self.comparison_dir)
-                      if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        
-        for filename in comp_files:
-            image_path = os.path.join(self.comparison_dir, filename)
-            stimulus = Stimulus(
-                filename=filename,
-                image_path=image_path,
-                win=win
-            )
-            self.stimuli.append(stimulus)
+        # Load comparison stimuli (sorted, so stimulus indices are stable across machines)
+        for filename, size in self._list_images(self.comparison_dir, manifest):
+            self.stimuli.append(self._create_stimulus(self.comparison_dir, filename, size, win, use_atlas))
         
         # Load reference stimulus from reference directory if provided
         if self.reference_dir:
@@ -49,60 +63,153 @@ class StimuliManager:
                 raise ValueError(f"Provided reference path {self.reference_dir} is not a directory.")
             
             # List all image files in the reference directory
-            ref_files = [f for f in os.listdir(self.reference_dir)
-                         if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-            
-            if not ref_files:
-                raise ValueError("No image files found in the reference directory.")
+            ref_files = self._list_images(self.reference_dir, manifest)
             
-            # Select the first (and only) image in the list
-            ref_filename = ref_files[0]
-            ref_image_path = os.path.join(self.reference_dir, ref_filename)
+            if len(ref_files) != 1:
+                raise ValueError(
+                    f"The reference directory {self.reference_dir} must contain exactly one image "
+                    f"({len(ref_files)} found)."
+                )
             
-            self.reference = Stimulus(
-                filename=ref_filename,
-                image_path=ref_image_path,
-                win=win
+            ref_filename, size = ref_files[0]
+            self.reference = self._create_stimulus(self.reference_dir, ref_filename, size, win, use_atlas)
+
+        if use_atlas:
+            self._pack_atlas(win, atlas_page_size)
+
+    @staticmethod
+    def _list_images(directory: str, manifest: Optional[StimulusManifest]) -> List[Tuple[str, Optional[Tuple[int, int]]]]:
+        """(file name, size) of the images in a folder; the size is only known from a manifest"""
+        if manifest is None:
+            return [(filename, None) for filename in list_stimulus_files(directory)]
+        return [(record.filename, (record.width, record.height)) for record in manifest.check(directory)]
+
+    @staticmethod
+    def _create_stimulus(
+        directory: str,
+        filename: str,
+        size: Optional[Tuple[int, int]],
+        win: visual.Window,
+        use_atlas: bool
+    ) -> Stimulus:
+        width, height = size if size is not None else (None, None)
+        return Stimulus(
+            filename=filename,
+            image_path=os.path.join(directory, filename),
+            win=win,
+            create_texture=not use_atlas,
+            orig_width=width,
+            orig_height=height
+        )
+
+    def _pack_atlas(self, win: visual.Window, page_size: int):
+        """Pack all loaded stimuli into a texture atlas and draw them from it"""
+        stimuli = self.stimuli + ([self.reference] if self.reference else [])
+        images = {}
+        for stimulus in stimuli:
+            # Downscale to the size the stimulus is displayed at
+            with Image.open(stimulus.image_path) as img:
+                images[stimulus.image_path] = img.convert("RGB").resize(
+                    stimulus.display_pixels, Image.LANCZOS)
+
+        self.atlas = TextureAtlas(win, page_size=page_size)
+        self.atlas.pack(images)
+        for stimulus in stimuli:
+            stimulus.psychopy_stim = self.atlas.create_stim(stimulus.image_path, stimulus.scaled_dimensions)
+
+    def _make_trials(self, order: List[Tuple[Stimulus, Stimulus]], round_type: str) -> List[Trial]:
+        """Create numbered trials from (left, right) stimulus pairs"""
+        return [
+            Trial(
+                trial_num=trial_num,
+                pair=Comparison(left_stimuli=left, right_stimuli=right),
+                round_type=round_type,
+                reference=self.reference if round_type != "liking" else None
             )
+            for trial_num, (left, right) in enumerate(order, 1)
+        ]
+
+    @traced("generate_trials")
+    def generate_trials(
+        self,
+        round_type: str,
+        pair_repeats: int = 1,
+        streams: Optional[RandomStreams] = None
+    ) -> List[Trial]:
+        """
+        Generate trials with consistent left-right positioning.
+
+        Args:
+            round_type: The round type of the trials.
+            pair_repeats: Number of repeats of each pair (in both orientations).
+            streams: Seeded random streams. If None, the streams of earlier calls are
+                reused, or new streams with a random (recorded) seed are created.
+
+        Returns:
+            The trials.
+        """
+        if streams is not None:
+            self.streams = streams
+        elif self.streams is None:
+            self.streams = RandomStreams()
 
-    def generate_trials(self, round_type: str, pair_repeats: int = 1) -> List[Trial]:
-        """Generate trials with consistent left-right positioning"""
         if not self.pairs:  # Only generate pairs if not already generated
-            # Generate all unique pairs
-            all_pairs = list(itertools.combinations(self.stimuli, 2))
-            
-            # Randomly decide left-right positioning for each pair
+            # Generate all unique pairs, randomly deciding left-right positioning for each pair
             self.pairs = [
-                Comparison(left_stimuli=pair[0], right_stimuli=pair[1])
-                if random.choice([True, False]) else
-                Comparison(left_stimuli=pair[1], right_stimuli=pair[0])
-                for pair in all_pairs
+                Comparison(left_stimuli=self.stimuli[left], right_stimuli=self.stimuli[right])
+                for left, right in orient_pairs(len(self.stimuli), self.streams.stream("pairs"))
             ]
         
         # Create trials with the same pairs but in random order
-        trials = []
-        trial_num = 1
-        for _ in range(pair_repeats):
-            
-            # Get shuffled pairs for first presentation
-            shuffled_pairs = random.sample(self.pairs, len(self.pairs))
-            
-            # Create reversed pairs for second presentation
-            reversed_pairs = [Comparison(left_stimuli=pair.right_stimuli, right_stimuli=pair.left_stimuli) 
-                            for pair in shuffled_pairs]
-            
-            np.random.shuffle(reversed_pairs)
-            
-            # Combine original and reversed pairs
-            all_pairs_presentation = np.append(shuffled_pairs, reversed_pairs)
-            
-            for pair in all_pairs_presentation:
-                trials.append(Trial(
-                    trial_num=trial_num,
-                    pair=pair,
-                    round_type=round_type,
-                    reference=self.reference if round_type != "liking" else None
-                ))
-                trial_num += 1
-        
-        return trials
+        order = schedule_pairs(
+            [(pair.left_stimuli, pair.right_stimuli) for pair in self.pairs],
+            pair_repeats,
+            self.streams.stream(f"order/{round_type}")
+        )
+        return self._make_trials(order, round_type)
+
+    @traced("trials_from_plan")
+    def trials_from_plan(self, plan: BlockPlan, filenames: List[str]) -> List[Trial]:
+        """
+        Create the trials of a precomputed block plan.
+
+        Args:
+            plan: The block plan.
+            filenames: The stimulus file names the plan's indices refer to.
+
+        Returns:
+            The trials, in the planned order.
+        """
+        loaded = [stimulus.filename for stimulus in self.stimuli]
+        if sorted(loaded) != list(filenames):
+            raise ValueError(
+                f"Stimuli in {self.comparison_dir} do not match the session plan. "
+                "Regenerate the plans with experiment/precompute/session_plans.py."
+            )
+        by_name = {stimulus.filename: stimulus for stimulus in self.stimuli}
+        stimuli = [by_name[filename] for filename in filenames]
+        order = [(stimuli[left], stimuli[right]) for left, right in plan.trials]
+        return self._make_trials(order, plan.round_type)
+
+    def trials_from_records(self, records: List[Dict]) -> List[Trial]:
+        """
+        Recreate trials from saved trial records (e.g. the "trials" of a participant JSON file).
+
+        Args:
+            records: Trial records with "left_stimulus" and "right_stimulus" file names
+                and a "round_type", in presentation order.
+
+        Returns:
+            The trials, renumbered in the recorded order.
+        """
+        by_name = {stimulus.filename: stimulus for stimulus in self.stimuli}
+        missing = {
+            filename
+            for record in records
+            for filename in (record["left_stimulus"], record["right_stimulus"])
+            if filename not in by_name
+        }
+        if missing:
+            raise ValueError(f"Stimuli not found in {self.comparison_dir}: {sorted(missing)}")
+        order = [(by_name[record["left_stimulus"]], by_name[record["right_stimulus"]]) for record in records]
+        return self._make_trials(order, records[0]["round_type"]) if records else []
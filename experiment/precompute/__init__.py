@@ -1 +1,19 @@
-from .pdf_to_image import *
+# Submodules are imported on first use (see experiment/_lazy.py)
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    "convert_pdf_to_images": "pdf_to_image",
+    "parse_participant_ids": "session_plans",
+    "generate_session_plans": "session_plans",
+    "preflight_image": "stimulus_manifest",
+    "check_sets": "stimulus_manifest",
+    "build_manifest": "stimulus_manifest",
+    "measure_frames": "calibration",
+    "measure_texture_upload": "calibration",
+    "measure_text_layout": "calibration",
+    "measure_disk_write": "calibration",
+    "calibrate": "calibration",
+}
+_SUBMODULES = ["pdf_to_image", "session_plans", "stimulus_manifest", "calibration"]
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, _SUBMODULES)
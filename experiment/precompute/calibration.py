@@ -0,0 +1,176 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List, Dict, Optional
+from experiment.managers.machine_profile import MachineProfile, machine_name, machine_profile_path
+from experiment.managers.manifest import MANIFEST_PATH
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def measure_frames(window, block, n_frames: int = 300) -> Dict[str, float]:
+    """
+    Refresh rate, flip jitter and dropped frames, flipping the fixation cross of a Block.
+
+    Returns:
+        "refresh_hz", "frame_ms" (median interval), "flip_jitter_ms" (standard deviation of
+        the intervals) and "dropped_frames" (fraction of intervals longer than 1.5 frames).
+    """
+    from psychopy import core
+    for _ in range(10):  # let the driver settle
+        block.fixation.draw()
+        window.flip()
+    flips = []
+    for _ in range(n_frames + 1):
+        block.fixation.draw()
+        window.flip()
+        flips.append(core.getTime())
+    intervals = [(end - start) * 1000 for start, end in zip(flips, flips[1:])]
+    frame_ms = statistics.median(intervals)
+    return {
+        "refresh_hz": 1000 / frame_ms,
+        "frame_ms": frame_ms,
+        "flip_jitter_ms": statistics.pstdev(intervals),
+        "dropped_frames": sum(interval > 1.5 * frame_ms for interval in intervals) / len(intervals),
+    }
+
+def measure_texture_upload(window, manifest=None) -> Dict[str, float]:
+    """
+    Load every stimulus set the way the runner does, and time the texture uploads.
+
+    Returns:
+        "texture_upload_mb_per_s" and "stimulus_upload_ms" (mean time per stimulus).
+    """
+    from experiment.managers.plans import STIMULUS_SETS
+    from experiment.managers.stimuli import StimuliManager
+    from experiment.utils.memory import MEMORY_LEDGER
+    managers = []
+    n_stimuli, seconds, uploaded = 0, 0.0, 0
+    for comparison_dir, reference_dir in STIMULUS_SETS.values():
+        usage = MEMORY_LEDGER.categories.get("stimuli")
+        before = usage.texture_bytes if usage else 0
+        manager = StimuliManager(comparison_dir=comparison_dir, reference_dir=reference_dir)
+        start = time.perf_counter()
+        manager.load_stimuli(window, manifest=manifest)
+        window.flip()  # the uploads are finished once the frame is done
+        seconds += time.perf_counter() - start
+        uploaded += MEMORY_LEDGER.categories["stimuli"].texture_bytes - before
+        n_stimuli += len(manager.stimuli) + (manager.reference is not None)
+        managers.append(manager)  # keep the textures alive until everything is measured
+    return {
+        "texture_upload_mb_per_s": uploaded / 2**20 / seconds,
+        "stimulus_upload_ms": seconds * 1000 / n_stimuli,
+    }
+
+def measure_text_layout(block, repeats: int = 50) -> Dict[str, float]:
+    """
+    Time creating and drawing the image labels of one trial (Block._create_text_stimuli).
+
+    Returns:
+        "text_layout_ms", the median over the repeats.
+    """
+    positions = block._get_image_positions("similarity")
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        labels = block._create_text_stimuli(positions, "similarity")
+        for label in labels.values():
+            label.draw()
+        times.append((time.perf_counter() - start) * 1000)
+    block.window.flip()
+    return {"text_layout_ms": statistics.median(times)}
+
+def measure_disk_write(data_dir: str = "data", writes: int = 200, syncs: int = 20) -> Dict[str, float]:
+    """
+    Time appending trial records to a session log in the data folder.
+
+    Returns:
+        "disk_write_ms" (median), "disk_write_p99_ms" and "disk_sync_ms" (median time
+        to append and fsync).
+    """
+    from experiment.managers.session_log import SessionLog
+    path = os.path.join(data_dir, f".calibration_{machine_name()}.jsonl")
+    record = {
+        "trial_num": 1, "round_type": "similarity", "left_stimulus": "0000000.png",
+        "right_stimulus": "0000001.png", "reference_stimulus": "reference.png",
+        "comparison_order": 0, "response": "d", "reaction_time": 0.8125,
+    }
+    log = SessionLog(path)
+    try:
+        write_times, sync_times = [], []
+        for _ in range(writes):
+            start = time.perf_counter()
+            log.append("trial", trial=record)
+            write_times.append((time.perf_counter() - start) * 1000)
+        for _ in range(syncs):
+            start = time.perf_counter()
+            log.append("trial", trial=record)
+            os.fsync(log._file.fileno())
+            sync_times.append((time.perf_counter() - start) * 1000)
+    finally:
+        log.close()
+        os.remove(path)
+    return {
+        "disk_write_ms": statistics.median(write_times),
+        "disk_write_p99_ms": _percentile(write_times, 0.99),
+        "disk_sync_ms": statistics.median(sync_times),
+    }
+
+def calibrate(display, n_frames: int = 300, data_dir: str = "data", manifest=None) -> MachineProfile:
+    """
+    Measure this machine with the window of a Display (full-screen, as in a session).
+
+    Args:
+        display: The Display whose window is measured.
+        n_frames: Number of frame intervals to time.
+        data_dir: Folder the session data is written to.
+        manifest: Optional stimulus manifest to load the stimuli from.
+    """
+    from experiment.core.block import Block, BlockConfig
+    block = Block(display.window, trials=[], config=BlockConfig(referant_present=True))
+    measurements = {}
+    measurements.update(measure_frames(display.window, block, n_frames))
+    measurements.update(measure_texture_upload(display.window, manifest))
+    measurements.update(measure_text_layout(block))
+    measurements.update(measure_disk_write(data_dir))
+    return MachineProfile(
+        machine=machine_name(),
+        created=datetime.now().strftime("%Y%m%d_%H%M%S"),
+        window_size=[int(size) for size in display.window.size],
+        **measurements
+    )
+
+if __name__ == '__main__':
+    # Run from the repository root on every lab machine (and again after driver or hardware changes):
+    #   python -m experiment.precompute.calibration
+    parser = argparse.ArgumentParser(description="Measure the timing of this machine and save its profile.")
+    parser.add_argument("--frames", type=int, default=300, help="Frame intervals to time")
+    parser.add_argument("--data-dir", default="data", help="Folder the session data is written to")
+    parser.add_argument("--output", default=None, help=f"Profile path (default: {machine_profile_path()})")
+    args = parser.parse_args()
+
+    from psychopy import visual
+    from experiment.interface.display import Display
+    from experiment.managers.manifest import StimulusManifest
+    os.makedirs(args.data_dir, exist_ok=True)
+    manifest = StimulusManifest.load(MANIFEST_PATH) if os.path.exists(MANIFEST_PATH) else None
+    display = Display(visual.Window(fullscr=True, color=[1, 1, 1], units='height'))
+    try:
+        profile = calibrate(display, args.frames, args.data_dir, manifest)
+    finally:
+        display.window.close()
+
+    for name, value in profile.to_json().items():
+        print(f"{name:>26}: {value:.3f}" if isinstance(value, float) else f"{name:>26}: {value}")
+    profile.save(args.output)
+    print(f"Saved the profile to {args.output or machine_profile_path(profile.machine)}")
+    problems = profile.check()
+    if problems:
+        print("This machine is outside the tolerance:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
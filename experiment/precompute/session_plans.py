@@ -0,0 +1,43 @@
+import argparse
+from experiment.managers.plans import (
+    STIMULUS_SETS, SessionPlanStore, build_session_plan, list_stimulus_files
+)
+
+def parse_participant_ids(ids, ranges):
+    """Combine explicit IDs and inclusive ranges (e.g. 10001-10200) into one ordered list."""
+    participant_ids = list(ids or [])
+    for id_range in ranges or []:
+        start, end = id_range.split("-")
+        width = len(start)
+        participant_ids.extend(str(i).zfill(width) for i in range(int(start), int(end) + 1))
+    # Drop duplicates while keeping the order
+    return list(dict.fromkeys(participant_ids))
+
+def generate_session_plans(participant_ids, base_seed, pair_repeats=1, output="plans/session_plans"):
+    stimuli = {
+        name: list_stimulus_files(comparison_dir)
+        for name, (comparison_dir, _) in STIMULUS_SETS.items()
+    }
+    plans = [
+        build_session_plan(participant_id, stimuli, base_seed, pair_repeats)
+        for participant_id in participant_ids
+    ]
+    store = SessionPlanStore(output)
+    store.write(plans, base_seed)
+    print(f"Saved {len(plans)} session plans to {store.data_path}")
+
+if __name__ == '__main__':
+    # Run from the repository root:
+    #   python -m experiment.precompute.session_plans --seed 2025 --range 10001-10200
+    parser = argparse.ArgumentParser(description="Precompute per-participant session plans.")
+    parser.add_argument("--ids", nargs="*", help="Participant IDs")
+    parser.add_argument("--range", nargs="*", dest="ranges", help="Inclusive ID ranges, e.g. 10001-10200")
+    parser.add_argument("--seed", type=int, required=True, help="Study-wide base seed")
+    parser.add_argument("--pair-repeats", type=int, default=1)
+    parser.add_argument("--output", default="plans/session_plans")
+    args = parser.parse_args()
+
+    participant_ids = parse_participant_ids(args.ids, args.ranges)
+    if not participant_ids:
+        parser.error("Provide participant IDs with --ids and/or --range.")
+    generate_session_plans(participant_ids, args.seed, args.pair_repeats, args.output)
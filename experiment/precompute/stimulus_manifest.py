@@ -0,0 +1,117 @@
+import argparse
+import hashlib
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional
+from experiment.managers.plans import STIMULUS_SETS, list_stimulus_files
+from experiment.managers.manifest import MANIFEST_PATH, StimulusManifest, StimulusRecord
+
+def preflight_image(path: str) -> Tuple[Optional[StimulusRecord], Optional[str]]:
+    """
+    Fully decode one image and describe it.
+
+    Returns:
+        (record, None) for a good image, or (None, error message) for a corrupt one.
+    """
+    from PIL import Image
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        with Image.open(path) as img:
+            img.load()  # decodes every pixel, unlike the header read in Stimulus
+            width, height = img.size
+            mode = img.mode
+    except Exception as e:
+        return None, f"{path}: {e}"
+    record = StimulusRecord(
+        filename=os.path.basename(path),
+        width=width,
+        height=height,
+        mode=mode,
+        bytes=len(content),
+        sha256=hashlib.sha256(content).hexdigest(),
+    )
+    return record, None
+
+def check_sets(directories: Dict[str, List[StimulusRecord]]) -> Tuple[List[str], List[str]]:
+    """
+    Consistency checks of the stimulus sets.
+
+    Returns:
+        (errors, warnings): errors for comparison folders with fewer than two images or
+        duplicate images and for reference folders without exactly one image; warnings for
+        a reference that is also a comparison image and for mixed color modes.
+    """
+    errors, warnings = [], []
+    for name, (comparison_dir, reference_dir) in STIMULUS_SETS.items():
+        comparison = directories.get(comparison_dir, [])
+        reference = directories.get(reference_dir, [])
+        if len(comparison) < 2:
+            errors.append(f"{comparison_dir} needs at least two images ({len(comparison)} found).")
+        if len(reference) != 1:
+            errors.append(f"{reference_dir} must contain exactly one image ({len(reference)} found).")
+        duplicates = [h for h, count in Counter(r.sha256 for r in comparison).items() if count > 1]
+        for duplicate in duplicates:
+            files = [r.filename for r in comparison if r.sha256 == duplicate]
+            errors.append(f"{comparison_dir} contains identical images: {', '.join(files)}")
+        for record in reference:
+            if any(r.sha256 == record.sha256 for r in comparison):
+                warnings.append(f"The reference image {record.filename} is also one of the images in {comparison_dir}")
+        modes = sorted({r.mode for r in comparison + reference})
+        if len(modes) > 1:
+            warnings.append(f"Set '{name}' mixes color modes: {', '.join(modes)}")
+    return errors, warnings
+
+def build_manifest(workers: Optional[int] = None) -> Tuple[StimulusManifest, List[str], List[str]]:
+    """
+    Decode and hash all stimulus images in parallel.
+
+    Returns:
+        (manifest, errors, warnings)
+    """
+    folders = [folder for folders in STIMULUS_SETS.values() for folder in folders]
+    paths = {
+        folder: [os.path.join(folder, filename) for filename in list_stimulus_files(folder)]
+        for folder in folders
+        if os.path.isdir(folder)
+    }
+    errors = [f"{folder} is not a directory." for folder in folders if folder not in paths]
+
+    all_paths = [path for folder_paths in paths.values() for path in folder_paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = dict(zip(all_paths, executor.map(preflight_image, all_paths, chunksize=4)))
+
+    directories = {}
+    for folder, folder_paths in paths.items():
+        directories[folder] = []
+        for path in folder_paths:
+            record, error = results[path]
+            if error is not None:
+                errors.append(error)
+            else:
+                directories[folder].append(record)
+
+    set_errors, warnings = check_sets(directories)
+    return StimulusManifest(directories), errors + set_errors, warnings
+
+if __name__ == '__main__':
+    # Run from the repository root:
+    #   python -m experiment.precompute.stimulus_manifest
+    parser = argparse.ArgumentParser(description="Verify all stimulus images and write the stimulus manifest.")
+    parser.add_argument("--output", default=MANIFEST_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    manifest, errors, warnings = build_manifest(args.workers)
+    for warning in warnings:
+        print(f"Warning: {warning}")
+    if errors:
+        print("Stimulus preflight failed:")
+        for error in errors:
+            print(f"  {error}")
+        sys.exit(1)
+    manifest.save(args.output)
+    n_images = sum(len(records) for records in manifest.directories.values())
+    print(f"Verified {n_images} images; saved the manifest to {args.output}")
@@ -1,7 +1,15 @@
-from .age import *
-from .diet import *
-from .feedback import *
-from .frequency import *
-from .gender import *
-from .id import *
-from .nationality import *
+# Submodules are imported on first use (see experiment/_lazy.py)
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    "ask_age": "age",
+    "ask_diet": "diet",
+    "ask_feedback": "feedback",
+    "ask_eat_frequency": "frequency",
+    "ask_gender": "gender",
+    "ask_id": "id",
+    "ask_nationality": "nationality",
+}
+_SUBMODULES = ["age", "diet", "feedback", "frequency", "gender", "id", "nationality"]
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, _SUBMODULES)
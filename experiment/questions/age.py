@@ -1,6 +1,8 @@
 import string
 from ..interface import Display
+from ..utils.tracing import traced
 
+@traced("ask_age")
 def ask_age(display: Display):
     """
     Ask for the participant's age using a free text prompt.
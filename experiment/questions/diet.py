@@ -1,5 +1,7 @@
 from ..interface import Display
+from ..utils.tracing import traced
 
+@traced("ask_diet")
 def ask_diet(display: Display):
     """
     Ask for the participant's dietary preference using a multiple-choice prompt.
@@ -1,6 +1,8 @@
 from psychopy import visual, event, core
-from ..interface import Display
+from ..interface import Display, RenderLoop
+from ..utils.tracing import traced
 
+@traced("ask_feedback")
 def ask_feedback(display: Display):
     """
     Collect feedback from participants using a multi-line TextBox2,
@@ -64,9 +66,8 @@ def ask_feedback(display: Display):
         units='height'
     )
     mouse = event.Mouse(visible=True, win=win)
-    
-    # Feedback collection loop.
-    while True:
+
+    def draw():
         # Draw the static instruction text.        
         instruction_text_stim.draw()
         
@@ -76,16 +77,28 @@ def ask_feedback(display: Display):
         # Draw the finish button and its clickable area.
         button_box.draw()
         next_button.draw()
-        
-        win.flip()
-        
-        # Check for mouse click on the Finish button.
-        if mouse.getPressed()[0]:  # left button pressed
-            if mouse.getPressed()[0]:
+    
+    # Feedback collection loop: redraws only when the typed text changes
+    # (and twice per second, for the blinking caret).
+    with RenderLoop(win, "feedback", draw, refresh_interval=0.5, idle=display.run_idle_task) as loop:
+        last_text = feedback_box.text
+        while True:
+            loop.render()
+            
+            # Let the textbox receive the typed characters
+            win.dispatchAllWindowEvents()
+            if feedback_box.text != last_text:
+                last_text = feedback_box.text
+                loop.invalidate()
+            
+            # Check for mouse click on the Finish button.
+            if mouse.getPressed()[0]:  # left button pressed
                 if button_box.contains(mouse.getPos()):
                     return feedback_box.text
-        
-        # Check for the escape key using your Display's built-in mechanism.
-        keys = event.getKeys()
-        if 'escape' in keys:
-            display.quit_experiment()
+            
+            # Check for the escape key using your Display's built-in mechanism.
+            keys = event.getKeys()
+            if 'escape' in keys:
+                display.quit_experiment()
+            
+            loop.sleep()
@@ -1,5 +1,7 @@
 from ..interface import Display
+from ..utils.tracing import traced
 
+@traced("ask_eat_frequency")
 def ask_eat_frequency(display: Display):
     """
     Ask for the participant's frequency of plant-based meat alternative consumption
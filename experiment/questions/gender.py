@@ -1,5 +1,7 @@
 from ..interface import Display
+from ..utils.tracing import traced
 
+@traced("ask_gender")
 def ask_gender(display: Display):
     """
     Ask for the participant's gender using a multiple-choice prompt.
@@ -1,6 +1,8 @@
 import string
 from ..interface import Display
+from ..utils.tracing import traced
 
+@traced("ask_id")
 def ask_id(display: Display) -> str:
     """
     Collect participant ID using the Display's free text prompt.
@@ -1,7 +1,9 @@
 import string
 from ..utils.nationality_list import COUNTRY_ADJECTIVALS
 from ..interface import Display
+from ..utils.tracing import traced
 
+@traced("ask_nationality")
 def ask_nationality(display: Display):
     """
     Ask for the participant's nationality using a free text prompt.
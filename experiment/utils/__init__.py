@@ -1 +1,22 @@
-from .unit_conversion import * 
+# Submodules are imported on first use (see experiment/_lazy.py)
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    "UnitConverter": "unit_conversion",
+    "RandomStreams": "rng",
+    "StartupProfiler": "profiling",
+    "MemoryUsage": "memory",
+    "MemoryLedger": "memory",
+    "MEMORY_LEDGER": "memory",
+    "memory_stats": "memory",
+    "texture_bytes": "memory",
+    "Tracer": "tracing",
+    "TRACER": "tracing",
+    "traced": "tracing",
+    "RealtimeMode": "realtime",
+    "REALTIME": "realtime",
+    "gc_stats": "realtime",
+}
+_SUBMODULES = ["unit_conversion", "nationality_list", "rng", "profiling", "memory", "tracing", "realtime"]
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS, _SUBMODULES)
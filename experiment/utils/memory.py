@@ -0,0 +1,135 @@
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any
+import itertools
+import weakref
+
+# Bytes per pixel assumed for an uploaded texture (RGBA, 8 bits per channel, no mipmaps)
+TEXTURE_BYTES_PER_PIXEL = 4
+
+def texture_bytes(width: int, height: int) -> int:
+    """Estimated GPU memory of a texture of the given size in pixels."""
+    return int(width) * int(height) * TEXTURE_BYTES_PER_PIXEL
+
+@dataclass
+class MemoryUsage:
+    """Memory held by the textures of one category (e.g. "stimuli", "screens", "text")"""
+    textures: int = 0  # number of live textures
+    texture_bytes: int = 0
+    host_bytes: int = 0  # images kept in RAM (e.g. atlas pages)
+    peak_texture_bytes: int = 0
+    peak_host_bytes: int = 0
+
+class MemoryLedger:
+    """
+    Accounts for the texture (GPU) and host memory of the stimuli, screens and text.
+
+    Every texture is registered with `track` when it is created, under a
+    category and with its estimated size. The entry is released automatically
+    when the object that owns the texture is garbage collected (e.g. a screen
+    released by LazyScreens or a text evicted from the Display cache), so the
+    current totals follow what is alive. Current and peak totals are kept per
+    category and overall.
+
+    With a budget, crossing it prints a warning; with the "downscale" policy,
+    new stimuli are instead uploaded at the size they are displayed at (see
+    `should_downscale`).
+    """
+    def __init__(self, budget_bytes: Optional[int] = None, policy: str = "warn"):
+        """
+        Args:
+            budget_bytes: Optional limit on the total texture memory.
+            policy: "warn" to only warn when the budget is exceeded, or "downscale"
+                to also upload further stimuli at display resolution.
+        """
+        self.configure(budget_bytes, policy)
+        self.categories: Dict[str, MemoryUsage] = {}
+        self.texture_bytes = 0
+        self.host_bytes = 0
+        self.peak_texture_bytes = 0
+        self.peak_host_bytes = 0
+        self.downscaled = 0  # stimuli uploaded at display resolution because of the budget
+        self._entries: Dict[int, tuple] = {}
+        self._ids = itertools.count()
+        self._over_budget = False
+
+    def configure(self, budget_bytes: Optional[int] = None, policy: str = "warn"):
+        if policy not in ("warn", "downscale"):
+            raise ValueError(f"Unknown memory budget policy: {policy}")
+        self.budget_bytes = budget_bytes
+        self.policy = policy
+
+    def track(self, owner: Any, category: str, texture_bytes: int, host_bytes: int = 0) -> Any:
+        """
+        Register the memory of a texture owned by `owner` (released when the owner is collected).
+
+        Returns:
+            The owner, so creation calls can be wrapped.
+        """
+        entry_id = next(self._ids)
+        self._add(entry_id, category, texture_bytes, host_bytes)
+        weakref.finalize(owner, self._release, entry_id)
+        return owner
+
+    def _add(self, entry_id: int, category: str, texture: int, host: int):
+        self._entries[entry_id] = (category, texture, host)
+        usage = self.categories.setdefault(category, MemoryUsage())
+        usage.textures += 1
+        usage.texture_bytes += texture
+        usage.host_bytes += host
+        usage.peak_texture_bytes = max(usage.peak_texture_bytes, usage.texture_bytes)
+        usage.peak_host_bytes = max(usage.peak_host_bytes, usage.host_bytes)
+        self.texture_bytes += texture
+        self.host_bytes += host
+        self.peak_texture_bytes = max(self.peak_texture_bytes, self.texture_bytes)
+        self.peak_host_bytes = max(self.peak_host_bytes, self.host_bytes)
+        self._check_budget()
+
+    def _release(self, entry_id: int):
+        category, texture, host = self._entries.pop(entry_id)
+        usage = self.categories[category]
+        usage.textures -= 1
+        usage.texture_bytes -= texture
+        usage.host_bytes -= host
+        self.texture_bytes -= texture
+        self.host_bytes -= host
+        self._check_budget()
+
+    def _check_budget(self):
+        over = self.budget_bytes is not None and self.texture_bytes > self.budget_bytes
+        if over and not self._over_budget:
+            print(f"Warning: texture memory ({self.texture_bytes / 2**20:.1f} MB) exceeds the budget "
+                  f"({self.budget_bytes / 2**20:.1f} MB). " + self._usage_line())
+        self._over_budget = over
+
+    def fits(self, texture_bytes: int) -> bool:
+        """Whether a texture of this size can be added without exceeding the budget."""
+        return self.budget_bytes is None or self.texture_bytes + texture_bytes <= self.budget_bytes
+
+    def should_downscale(self, texture_bytes: int) -> bool:
+        """Whether a new texture of this size should be uploaded at a reduced size instead."""
+        return self.policy == "downscale" and not self.fits(texture_bytes)
+
+    def _usage_line(self) -> str:
+        return ", ".join(
+            f"{category}: {usage.texture_bytes / 2**20:.1f} MB" for category, usage in self.categories.items()
+        )
+
+    def summary(self) -> Dict:
+        """Current and peak totals, overall and per category, in JSON-serializable form."""
+        return {
+            "budget_bytes": self.budget_bytes,
+            "policy": self.policy,
+            "texture_bytes": self.texture_bytes,
+            "host_bytes": self.host_bytes,
+            "peak_texture_bytes": self.peak_texture_bytes,
+            "peak_host_bytes": self.peak_host_bytes,
+            "downscaled": self.downscaled,
+            "categories": {category: asdict(usage) for category, usage in self.categories.items()},
+        }
+
+# The ledger of the session (configured by run.py)
+MEMORY_LEDGER = MemoryLedger()
+
+def memory_stats() -> Dict:
+    """The memory accounting of the session as a JSON-serializable dictionary."""
+    return MEMORY_LEDGER.summary()
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Optional, List
+import importlib
+import json
+import os
+import time
+import tracemalloc
+
+# Reference point for "time since start" (run.py imports this module first)
+_PROCESS_START = time.perf_counter()
+
+@dataclass
+class StartupRecord:
+    """Time and memory used by one startup step"""
+    label: str
+    seconds: float
+    memory_kb: Optional[float] = None  # net allocation (None if memory is not traced)
+    peak_kb: Optional[float] = None  # peak allocation during the step
+
+class StartupProfiler:
+    """
+    Measures the time (and, when enabled, memory) of each startup step:
+    imports, window creation, screens and stimuli, up to the first screen.
+
+    Timing is always recorded (it is cheap), so the time-to-first-screen budget
+    can be checked in every session. Memory tracing and the report are only
+    enabled on request (`python run.py --profile-startup`), since tracemalloc
+    slows everything down.
+    """
+    def __init__(
+        self,
+        enabled: bool = False,
+        budget: Optional[float] = None,
+        report_path: Optional[str] = "data/startup_profile.json"
+    ):
+        """
+        Args:
+            enabled: Trace memory, print a report and save it to `report_path`.
+            budget: Maximum time (in seconds) from process start to the first screen.
+            report_path: Where the report is saved when enabled (None to not save).
+        """
+        self.enabled = enabled
+        self.budget = budget
+        self.report_path = report_path
+        self.records: List[StartupRecord] = []
+        self.time_to_first_screen: Optional[float] = None
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def measure(self, label: str):
+        """Measure the enclosed startup step."""
+        if self.enabled:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if self.enabled:
+                current, peak = tracemalloc.get_traced_memory()
+                self.records.append(StartupRecord(
+                    label, seconds, (current - memory_before) / 1024, (peak - memory_before) / 1024))
+            else:
+                self.records.append(StartupRecord(label, seconds))
+
+    def measure_imports(self, module_names: List[str]):
+        """Import the given modules one by one, measuring each (only when enabled)."""
+        if not self.enabled:
+            return
+        for module_name in module_names:
+            with self.measure(f"import {module_name}"):
+                importlib.import_module(module_name)
+
+    def mark_first_screen(self):
+        """Record that the first screen is visible (call right after its flip)."""
+        self.time_to_first_screen = time.perf_counter() - _PROCESS_START
+        if self.budget is not None and self.time_to_first_screen > self.budget:
+            print(f"Warning: first screen took {self.time_to_first_screen:.2f} s "
+                  f"(budget {self.budget:.2f} s). Run with --profile-startup for details.")
+        if self.enabled:
+            print(self.report())
+            if self.report_path:
+                self.save(self.report_path)
+
+    def report(self) -> str:
+        """Format the records as a table."""
+        lines = [f"{'step':<50} {'time (ms)':>10} {'memory (KB)':>12} {'peak (KB)':>10}"]
+        for record in self.records:
+            memory = f"{record.memory_kb:12.0f}" if record.memory_kb is not None else f"{'-':>12}"
+            peak = f"{record.peak_kb:10.0f}" if record.peak_kb is not None else f"{'-':>10}"
+            lines.append(f"{record.label:<50} {record.seconds * 1000:10.1f} {memory} {peak}")
+        if self.time_to_first_screen is not None:
+            lines.append(f"Time to first screen: {self.time_to_first_screen:.2f} s")
+        return "\n".join(lines)
+
+    def save(self, path: str):
+        """Save the records as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({
+                "budget": self.budget,
+                "time_to_first_screen": self.time_to_first_screen,
+                "records": [asdict(record) for record in self.records],
+            }, f, indent=2)
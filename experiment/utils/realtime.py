@@ -0,0 +1,160 @@
+from contextlib import contextmanager
+from typing import Optional, Dict
+import gc
+import time
+from .tracing import TRACER
+
+class RealtimeMode:
+    """
+    Keeps garbage collection and OS scheduling out of the timing-critical parts of a block.
+
+    While enabled, a block runs at raised process priority (psychopy's
+    core.rush) and with automatic garbage collection disabled. The objects
+    that exist when the block starts are frozen (gc.freeze), so the explicit
+    collections only scan what the block allocates: a young-generation
+    collection during each fixation (`collect(1)`) and a full one during
+    breaks (`collect(2)`).
+
+    Every collection is timed through gc.callbacks, whether the mode is
+    enabled or not, and the pauses that fall inside a `critical` window
+    (drawing the trial, waiting for the response) are counted separately,
+    so sessions with and without the mode can be compared.
+
+    Usage:
+        with REALTIME.block():
+            REALTIME.collect(1)  # during the fixation
+            with REALTIME.critical():
+                ...  # draw, flip and wait for the response
+    """
+    def __init__(self, enabled: bool = False, raise_priority: bool = True):
+        """
+        Args:
+            enabled: Whether blocks run with automatic garbage collection disabled.
+            raise_priority: Whether enabled blocks also run at raised process priority.
+        """
+        self.configure(enabled, raise_priority)
+        self._critical = 0  # depth of nested critical windows
+        self._explicit = False  # whether the running collection was requested by `collect`
+        self._gc_start = None
+        self._installed = False
+        self.reset()
+
+    def configure(self, enabled: bool = False, raise_priority: bool = True):
+        self.enabled = enabled
+        self.raise_priority = raise_priority
+
+    def reset(self):
+        """Clear the statistics (e.g. at the start of a session)."""
+        self.collections = 0  # automatic collections
+        self.pause_seconds = 0.0
+        self.max_pause_seconds = 0.0
+        self.critical_collections = 0  # automatic collections inside a critical window
+        self.critical_pause_seconds = 0.0
+        self.explicit_collections = 0
+        self.explicit_seconds = 0.0
+        self.priority_raised = False
+
+    def install(self):
+        """Start timing garbage collections."""
+        if not self._installed:
+            gc.callbacks.append(self._on_gc)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            gc.callbacks.remove(self._on_gc)
+            self._installed = False
+
+    def _on_gc(self, phase: str, info: Dict):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+            return
+        if self._gc_start is None:
+            return
+        pause = time.perf_counter() - self._gc_start
+        self._gc_start = None
+        if self._explicit:
+            return  # timed by `collect`
+        self.collections += 1
+        self.pause_seconds += pause
+        self.max_pause_seconds = max(self.max_pause_seconds, pause)
+        if self._critical:
+            self.critical_collections += 1
+            self.critical_pause_seconds += pause
+        TRACER.instant("gc", "gc", generation=info["generation"], ms=pause * 1000, critical=bool(self._critical))
+
+    def _set_priority(self, raised: bool):
+        from psychopy import core
+        return core.rush(raised)
+
+    @contextmanager
+    def block(self):
+        """Run the enclosed block at raised priority and without automatic garbage collection (while enabled)."""
+        if not self.enabled:
+            yield
+            return
+        was_enabled = gc.isenabled()
+        self.collect(2)
+        gc.freeze()
+        gc.disable()
+        if self.raise_priority:
+            self.priority_raised = bool(self._set_priority(True)) or self.priority_raised
+        try:
+            yield
+        finally:
+            if self.raise_priority:
+                self._set_priority(False)
+            gc.unfreeze()
+            if was_enabled:
+                gc.enable()
+
+    @contextmanager
+    def critical(self):
+        """Mark a timing-critical window (garbage collections inside it are counted)."""
+        self._critical += 1
+        try:
+            yield
+        finally:
+            self._critical -= 1
+
+    def collect(self, generation: int = 2) -> float:
+        """
+        Run a collection now, outside the timing-critical windows (does nothing while disabled).
+
+        Returns:
+            The time it took, in seconds.
+        """
+        if not self.enabled:
+            return 0.0
+        self._explicit = True
+        start = time.perf_counter()
+        try:
+            with TRACER.span("gc.collect", "gc", generation=generation):
+                gc.collect(generation)
+        finally:
+            self._explicit = False
+        seconds = time.perf_counter() - start
+        self.explicit_collections += 1
+        self.explicit_seconds += seconds
+        return seconds
+
+    def summary(self) -> Dict:
+        """The garbage collection statistics in JSON-serializable form (times in milliseconds)."""
+        return {
+            "enabled": self.enabled,
+            "priority_raised": self.priority_raised,
+            "collections": self.collections,
+            "pause_ms": self.pause_seconds * 1000,
+            "max_pause_ms": self.max_pause_seconds * 1000,
+            "critical_collections": self.critical_collections,
+            "critical_pause_ms": self.critical_pause_seconds * 1000,
+            "explicit_collections": self.explicit_collections,
+            "explicit_ms": self.explicit_seconds * 1000,
+        }
+
+# The realtime mode of the session (configured by run.py)
+REALTIME = RealtimeMode()
+
+def gc_stats() -> Dict:
+    """The garbage collection statistics of the session as a JSON-serializable dictionary."""
+    return REALTIME.summary()
@@ -0,0 +1,38 @@
+from typing import Optional, Dict
+import hashlib
+import random
+import secrets
+
+class RandomStreams:
+    """
+    Named, independently seeded random generators derived from one session seed.
+
+    Every random decision in a session draws from its own stream (e.g. the pair
+    orientation of a stimulus set, the trial order of a block), so adding or
+    removing one decision never shifts the others. The seed of each stream is
+    recorded, which makes any part of a session reproducible on its own.
+    """
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: The session seed. A random seed is drawn (and recorded) if None.
+        """
+        self.seed = seed if seed is not None else secrets.randbits(63)
+        self.seeds: Dict[str, int] = {}
+        self._streams: Dict[str, random.Random] = {}
+
+    @staticmethod
+    def derive_seed(seed: int, name: str) -> int:
+        """Derive a stable 64-bit seed for the stream `name`."""
+        digest = hashlib.sha256(f"{seed}:{name}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def stream(self, name: str) -> random.Random:
+        """Return the generator of the stream `name`, creating it on first use."""
+        if name not in self._streams:
+            self.seeds[name] = self.derive_seed(self.seed, name)
+            self._streams[name] = random.Random(self.seeds[name])
+        return self._streams[name]
+
+    def to_json(self) -> Dict:
+        return {"seed": self.seed, "streams": dict(self.seeds)}
@@ -0,0 +1,154 @@
+from typing import Optional, List, Dict, Any, Callable
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+class _NullSpan:
+    """The span returned while tracing is disabled: entering and leaving it does nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """A named span that is recorded as a complete ("X") trace event when it ends"""
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.tracer._add({
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": self.tracer._timestamp(self.start),
+            "dur": (end - self.start) * 1e6,
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        return False
+
+class Tracer:
+    """
+    Records named spans, counters and memory snapshots of a session, and exports
+    them in the Chrome trace format (open in chrome://tracing or ui.perfetto.dev).
+
+    While disabled, `span` returns a shared object whose enter/exit do nothing
+    and `counter`/`instant` return immediately, so the hooks can stay in the
+    hot paths (trial loop, saving) of every session.
+
+    Usage:
+        with TRACER.span("save_trial", trial=3):
+            ...
+        TRACER.counter("texture_mb", stimuli=12.5)
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.events: List[Dict] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Start recording (events are timed from this moment)."""
+        self.enabled = True
+        self.events = []
+        self._origin = time.perf_counter()
+
+    def disable(self):
+        self.enabled = False
+
+    def _timestamp(self, seconds: float) -> float:
+        return (seconds - self._origin) * 1e6  # microseconds
+
+    def _add(self, event: Dict):
+        event["pid"] = self._pid
+        with self._lock:
+            self.events.append(event)
+
+    def span(self, name: str, category: str = "experiment", **args):
+        """Context manager that records the enclosed code as a span (keyword arguments are attached)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def counter(self, name: str, **values: float):
+        """Record the current value of one or more counters (shown as a graph in the viewer)."""
+        if not self.enabled:
+            return
+        self._add({"name": name, "ph": "C", "ts": self._timestamp(time.perf_counter()),
+                   "tid": threading.get_ident(), "args": values})
+
+    def instant(self, name: str, category: str = "experiment", **args):
+        """Record a point in time (e.g. a key press or a missed trial)."""
+        if not self.enabled:
+            return
+        self._add({"name": name, "cat": category, "ph": "i", "s": "t",
+                   "ts": self._timestamp(time.perf_counter()), "tid": threading.get_ident(), "args": args})
+
+    def snapshot_memory(self, label: str, top: int = 10):
+        """
+        Take a tracemalloc snapshot and record its largest allocation sites.
+
+        Memory tracing is started on the first snapshot, so allocations before it
+        are not attributed. Taking a snapshot is slow: call it between blocks, not per trial.
+        """
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics("lineno")[:top]
+        self.instant(f"memory snapshot {label}", "memory", top=[
+            {"location": str(statistic.traceback[0]), "kb": statistic.size / 1024, "count": statistic.count}
+            for statistic in statistics
+        ])
+        self.counter("traced_memory_mb", current=current / 2**20, peak=peak / 2**20)
+
+    def export(self, path: str):
+        """Write the recorded events as a Chrome trace JSON file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            events = list(self.events)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": thread.ident, "args": {"name": thread.name}}
+            for thread in threading.enumerate()
+        ]
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+# The tracer of the session (enabled with python run.py --trace)
+TRACER = Tracer()
+
+def traced(name: Optional[str] = None, category: str = "experiment") -> Callable:
+    """Decorator that records every call of a function as a span (free while tracing is disabled)."""
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+            with _Span(TRACER, span_name, category, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
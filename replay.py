@@ -0,0 +1,106 @@
+import argparse
+import dataclasses
+import statistics
+from psychopy import visual, core
+from experiment import StimuliManager, Block, ReplayResponder, load_session
+from experiment import SESSION_LAYOUT, STIMULUS_SETS, SessionPlanStore, compute_break_points
+from run import BLOCK_CONFIGS
+
+
+def create_window(headless: bool, size) -> visual.Window:
+    """Create a full-screen window, or a hidden window of the given size."""
+    if not headless:
+        return visual.Window(fullscr=True, color=[1, 1, 1], units='height')
+
+    window = visual.Window(size=size, fullscr=False, color=[1, 1, 1], units='height', allowGUI=False)
+    # Hide the window where the backend allows it; drawing and flips still happen
+    set_visible = getattr(window.winHandle, 'set_visible', None)
+    if set_visible is not None:
+        set_visible(False)
+    return window
+
+
+def planned_break_points(session, layout, plan, n_records):
+    """
+    Break points of a block as the participant had them: from the block summary, or
+    else from the session plan. A block that stopped early or was interrupted has
+    fewer trials than planned, so they cannot be computed from the replayed trials.
+    """
+    summary = session["block_summaries"].get(layout.round_type, {})
+    if "break_points" in summary:
+        return summary["break_points"]
+    if plan is not None:
+        return plan.block(layout.round_type).break_points
+    # Sessions recorded before the break points were saved, without a precomputed plan
+    print(f"Warning: no session plan for {session['participant_id']}; the breaks of the "
+          f"{layout.round_type} block are computed from the {n_records} saved trials.")
+    return compute_break_points(n_records, layout.num_breaks)
+
+
+def replay_session(session_path: str, headless: bool = False, size=(1920, 1080), skip_breaks: bool = False,
+                   plans_path: str = "plans/session_plans"):
+    """
+    Re-drive Block.run with the trial order and keypress timings of a saved session.
+
+    Args:
+        session_path: Path to a session log (.jsonl) or participant JSON file in data/.
+        headless: Use a hidden window instead of a full-screen one.
+        size: Window size (in pixels) of the hidden window.
+        skip_breaks: Do not wait for the break countdown.
+        plans_path: Precomputed session plans (for the break points of older sessions).
+    """
+    session = load_session(session_path)
+    store = SessionPlanStore(plans_path)
+    plan = store.lookup(session["participant_id"]) if store.exists() else None
+    if plan is not None and plan.seed != session["seed"]:
+        plan = None  # the plans were precomputed for another study seed
+
+    window = create_window(headless, size)
+    managers = {}
+    for name, (comparison_dir, reference_dir) in STIMULUS_SETS.items():
+        managers[name] = StimuliManager(comparison_dir=comparison_dir, reference_dir=reference_dir)
+        managers[name].load_stimuli(window)
+
+    for layout in SESSION_LAYOUT:
+        records = [trial for trial in session["trials"] if trial["round_type"] == layout.round_type]
+        if not records:
+            continue
+
+        config = BLOCK_CONFIGS[layout.round_type]
+        if skip_breaks:
+            config = dataclasses.replace(config, break_wait_time=0)
+        trials = managers[layout.stimulus_set].trials_from_records(records)
+        responder = ReplayResponder(records)
+        block = Block(
+            window,
+            trials=trials,
+            config=config,
+            break_points=planned_break_points(session, layout, plan, len(trials)),
+            responder=responder
+        )
+
+        clock = core.Clock()
+        block.run()
+        duration = clock.getTime()
+
+        print(f"{layout.round_type}: {len(trials)} trials replayed in {duration:.2f} s")
+        if responder.deviations:
+            deviations_ms = [abs(d) * 1000 for d in responder.deviations]
+            print(f"  RT deviation: mean {statistics.mean(deviations_ms):.2f} ms, "
+                  f"max {max(deviations_ms):.2f} ms")
+
+    window.close()
+    core.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a saved session.")
+    parser.add_argument("session", help="Session log or participant JSON file, e.g. data/12345_20250101_120000.jsonl")
+    parser.add_argument("--headless", action="store_true", help="Replay in a hidden window")
+    parser.add_argument("--size", nargs=2, type=int, default=[1920, 1080], help="Hidden window size")
+    parser.add_argument("--skip-breaks", action="store_true", help="Skip the break countdowns")
+    parser.add_argument("--plans", default="plans/session_plans",
+                        help="Precomputed session plans (break points of sessions that did not save them)")
+    args = parser.parse_args()
+
+    replay_session(args.session, args.headless, tuple(args.size), args.skip_breaks, args.plans)
@@ -1,212 +1,469 @@
+import argparse
+import os
+import sys
+from typing import Optional
+from experiment.utils.profiling import StartupProfiler
+from experiment.utils.tracing import TRACER
+
+# Record a timeline of the session (python run.py --trace), saved as a Chrome trace
+if "--trace" in sys.argv or "--trace-memory" in sys.argv:
+    TRACER.enable()
+
+# Created before the heavy imports so they can be measured (python run.py --profile-startup)
+profiler = StartupProfiler(enabled="--profile-startup" in sys.argv, budget=5.0)
+profiler.measure_imports([
+    "psychopy.visual",
+    "PIL.Image",
+    "experiment.core.block",
+    "experiment.managers.stimuli",
+    "experiment.managers.data",
+    "experiment.interface.display",
+    "experiment.questions.feedback",
+])
+
 from psychopy import visual, core
 from experiment import DataManager, StimuliManager
-from experiment import BlockConfig, Block, Participant
-from experiment import Display
+from experiment import BlockConfig, Block, Participant, StoppingPolicy
+from experiment import SessionPlanStore, SessionStore, STIMULUS_SETS, build_session_plan
+from experiment import StimulusManifest, MANIFEST_PATH, read_session_log
+from experiment import MachineProfile, CalibrationTolerance, machine_profile_path
+from experiment import Display, LazyScreens, TextStyle, RENDER_LOOP_STATS, render_loop_stats
+from experiment import MEMORY_LEDGER, memory_stats, REALTIME, gc_stats
 from experiment import ask_id, ask_age, ask_diet, ask_eat_frequency, ask_gender, ask_nationality, ask_feedback
 
 
+# Presentation settings of each block (trial order and breaks come from the session plan)
+BLOCK_CONFIGS = {
+    "practice": BlockConfig(
+        prompt_text="Which of the two citrus fruits do you LIKE MORE?",
+        left_text="Citrus fruit A",
+        right_text="Citrus fruit B",
+        reference_text="Orange"
+    ),
+    "liking": BlockConfig(
+        prompt_text="Which one of the two plant-based steaks do you LIKE MORE?",
+        break_wait_time=20,
+        left_text="PLANT-BASED STEAK A",
+        right_text="PLANT-BASED STEAK B",
+    ),
+    "similarity": BlockConfig(
+        prompt_text="Which of the two plant-based steaks is MORE SIMILAR to the BEEF STEAK on top?",
+        break_wait_time=20,
+        left_text="PLANT-BASED STEAK A",
+        right_text="PLANT-BASED STEAK B",
+        reference_text="BEEF STEAK",
+        referant_present = True
+    ),
+}
+
+
 class ExperimentRunner:
     """Main experiment runner class"""
     
-    def __init__(self):
+    def __init__(self, profiler: StartupProfiler = profiler):
+        self.profiler = profiler
+
         # Experiment parameters
         self.pair_repeats = 1
         self.skip_time_limit = 4
         self.experiment_font = "Times New Roman"
+        # Optional early stopping of the liking and similarity blocks, e.g.
+        # StoppingPolicy(reliability_threshold=0.8, stability_threshold=0.95, window=20, min_trials=100)
+        self.stopping_policy = None
+        self.use_texture_atlas = False # draw the stimuli from a few large textures
+        self.base_seed = 2025 # only used for participants without a precomputed plan
+        self.plan_store = SessionPlanStore("plans/session_plans")
+        self.stimulus_manifest = MANIFEST_PATH
+        self.trace_memory = "--trace-memory" in sys.argv
+        self.resume_path = None # session log of an interrupted session to continue
+        self.end_screen_time = 30 # seconds the end screen is shown
+        # Texture memory budget (None for no budget); "warn" or "downscale" (upload stimuli at display size)
+        self.texture_memory_budget_mb = None
+        self.texture_memory_policy = "warn"
+        MEMORY_LEDGER.configure(
+            self.texture_memory_budget_mb * 2**20 if self.texture_memory_budget_mb else None,
+            self.texture_memory_policy
+        )
+        # Realtime presentation: blocks run at raised priority, with garbage collected
+        # during fixations and breaks only (python run.py --realtime)
+        self.realtime = "--realtime" in sys.argv
+        REALTIME.configure(self.realtime)
+        REALTIME.install()  # GC pauses are timed either way
+        # Optional database that trials are also written into, e.g. SessionStore("data/sessions.sqlite")
+        self.session_store = None
         
         # Set up window
-        self.display = Display(visual.Window(
-            fullscr=True,
-            color=[1, 1, 1],
-            units='height'
-        ), font=self.experiment_font)
+        with self.profiler.measure("create window"):
+            self.display = Display(visual.Window(
+                fullscr=True,
+                color=[1, 1, 1],
+                units='height'
+            ), font=self.experiment_font)
         
-        # Initialize screens
-        self.screens = {}
+        # Timing profile of this machine (python -m experiment.precompute.calibration)
+        self.calibration_tolerance = CalibrationTolerance()
+        self.machine_profile = self._check_machine()
+
+        # Render the glyphs of every font and size while the first screens are shown
+        self.display.prewarm_text(self._text_styles())
+
+        # Initialize screens (only the first two are built before the first frame)
+        self.screens = LazyScreens(self.display, self.profiler)
         self._init_screens()
+        self.screens.preload("experiment_info", "consent")
 
         # Load all stimuli
-        self._load_stimuli()
+        with self.profiler.measure("load stimuli"):
+            self._load_stimuli()
 
-    def _init_screens(self):
-        """Preload all screen objects."""
+    def _check_machine(self) -> Optional[MachineProfile]:
+        """Load the profile of this machine and warn if it is missing or outside the tolerance"""
+        path = machine_profile_path()
+        if not os.path.exists(path):
+            print(f"Warning: this machine was not calibrated ({path} is missing). "
+                  "Run python -m experiment.precompute.calibration.")
+            return None
+        try:
+            profile = MachineProfile.load(path)
+            problems = profile.check(self.calibration_tolerance)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            # Unreadable, outdated (missing/extra fields) or with an invalid date
+            print(f"Warning: the profile of this machine could not be read ({path}: {e}). "
+                  "Run python -m experiment.precompute.calibration again.")
+            return None
+        if problems:
+            print(f"Warning: this machine is outside the timing tolerance ({path}):")
+            for problem in problems:
+                print(f"  {problem}")
+        return profile
+
+    def _text_styles(self):
+        """Every font and size the experiment renders text in"""
+        display = self.display
+        styles = [
+            TextStyle(display.font, display.text_height),
+            TextStyle(display.font, display.text_height, bold=True),
+            TextStyle(display.font, display.text_height, textbox=True),  # feedback box
+        ]
+        for config in BLOCK_CONFIGS.values():
+            styles += [
+                TextStyle(config.font, config.text_height),
+                TextStyle(config.font, 0.08),  # fixation cross
+                TextStyle(config.font, config.text_height * 1.5),  # break countdown
+            ]
+        return styles
 
-        self.screens["experiment_info"] = self.display.load_image("texts/0_experiment_info.png")
-        self.screens["consent"] = self.display.load_text_from_file("texts/1_informed_consent.txt")
+    def _init_screens(self):
+        """Register all screen objects, in the order they are shown (they are built on first use)."""
+        self.screens.register_image("experiment_info", "texts/0_experiment_info.png")
+        self.screens.register_text("consent", "texts/1_informed_consent.txt")
 
-        self.screens["pre_instructions"] = self.display.load_text_from_file("texts/3_pre_instructions.txt")
-        self.screens["practice_instructions"] = self.display.load_image("texts/4_practice_instructions.png")
-        self.screens["practice_aftermath"] = self.display.load_text_from_file("texts/4_practice_aftermath.txt")
+        self.screens.register_text("pre_instructions", "texts/3_pre_instructions.txt")
+        self.screens.register_image("practice_instructions", "texts/4_practice_instructions.png")
+        self.screens.register_text("practice_aftermath", "texts/4_practice_aftermath.txt")
 
-        self.screens["similarity_instructions"] = self.display.load_image("texts/5_trial_instructions_sim.png")
-        self.screens["similarity_instructions_visual"] = self.display.load_image("texts/5_trial_instructions_sim_visual.png")
+        self.screens.register_image("liking_instructions", "texts/6_trial_instructions_liking.png")
+        self.screens.register_image("liking_instructions_visual", "texts/6_trial_instructions_liking_visual.png")
 
-        self.screens["liking_instructions"] = self.display.load_image("texts/6_trial_instructions_liking.png")
-        self.screens["liking_instructions_visual"] = self.display.load_image("texts/6_trial_instructions_liking_visual.png")
+        self.screens.register_image("similarity_instructions", "texts/5_trial_instructions_sim.png")
+        self.screens.register_image("similarity_instructions_visual", "texts/5_trial_instructions_sim_visual.png")
 
-        self.screens["pre_demographics"] = self.display.load_text_from_file("texts/7_pre_demographics.txt")
+        self.screens.register_text("pre_demographics", "texts/7_pre_demographics.txt")
                 
-        self.screens["end_of_experiment"] = self.display.load_text_from_file("texts/9_end_of_experiment.txt")
+        self.screens.register_text("end_of_experiment", "texts/9_end_of_experiment.txt")
 
     def _load_stimuli(self):
         """Load all stimuli for practice and main trials"""
-        # Practice stimuli
-        self.practice_stimuli_manager = StimuliManager(
-            comparison_dir='images/practice/comparison',
-            reference_dir='images/practice/reference'
-        )
-        self.practice_stimuli_manager.load_stimuli(self.display.window)
-        
-        # Main stimuli
-        self.trial_stimuli_manager = StimuliManager(
-            comparison_dir='images/trials/comparison',
-            reference_dir='images/trials/reference'
+        # Verified file lists and image sizes (python -m experiment.precompute.stimulus_manifest)
+        if os.path.exists(self.stimulus_manifest):
+            manifest = StimulusManifest.load(self.stimulus_manifest)
+        else:
+            print(f"No stimulus manifest at {self.stimulus_manifest}, reading the stimulus folders.")
+            manifest = None
+        self.stimuli_managers = {}
+        for name, (comparison_dir, reference_dir) in STIMULUS_SETS.items():
+            self.stimuli_managers[name] = StimuliManager(
+                comparison_dir=comparison_dir,
+                reference_dir=reference_dir
+            )
+            self.stimuli_managers[name].load_stimuli(
+                self.display.window, use_atlas=self.use_texture_atlas, manifest=manifest
+            )
+
+    def _snapshot_memory(self, label: str):
+        """Record a tracemalloc snapshot in the trace (only with --trace-memory; it is slow)"""
+        if self.trace_memory:
+            TRACER.snapshot_memory(label)
+
+    def _get_session_plan(self, participant_id: str):
+        """Look up the precomputed session plan, or build it if the ID was not precomputed"""
+        plan = self.plan_store.lookup(participant_id) if self.plan_store.exists() else None
+        if plan is None:
+            print(f"No precomputed session plan for {participant_id}, generating it now.")
+            base_seed, pair_repeats = self.base_seed, self.pair_repeats
+            if self.plan_store.exists():
+                # Generate it like the precomputed plans
+                base_seed, pair_repeats = self.plan_store.base_seed, self.plan_store.pair_repeats
+                if pair_repeats != self.pair_repeats:
+                    print(f"Warning: the session plans were precomputed with pair_repeats={pair_repeats}, "
+                          f"not {self.pair_repeats}; using {pair_repeats}.")
+            stimuli = {
+                name: [stimulus.filename for stimulus in manager.stimuli]
+                for name, manager in self.stimuli_managers.items()
+            }
+            plan = build_session_plan(participant_id, stimuli, base_seed, pair_repeats)
+        return plan
+
+    def _plan_block(self, plan, round_type: str, data_manager: DataManager) -> Block:
+        """Create a Block from the session plan"""
+        block_plan = plan.block(round_type)
+        trials = self.stimuli_managers[block_plan.stimulus_set].trials_from_plan(
+            block_plan, plan.stimuli[block_plan.stimulus_set])
+        return Block(
+            self.display.window,
+            trials=trials,
+            config=BLOCK_CONFIGS[round_type],
+            data_manager=data_manager,
+            break_points=block_plan.break_points)
+
+    def _show(self, name: str, data_manager: Optional[DataManager] = None, **kwargs):
+        """Show a registered screen (and log it once the participant is known)"""
+        key = self.display.display_stimulus(self.screens[name], **kwargs)
+        if data_manager is not None:
+            data_manager.log_event("screen", name=name, key=key)
+
+    def _run_block(
+        self,
+        plan,
+        round_type: str,
+        data_manager: DataManager,
+        screens,
+        resumed=None,
+        stopping_policy=None
+    ) -> bool:
+        """
+        Show the instruction screens of a block and run it.
+
+        When resuming, a block that was completed is skipped (its trials are only
+        restored), and an interrupted block continues after its last saved trial.
+
+        Returns:
+            Whether the block was run.
+        """
+        block = self._plan_block(plan, round_type, data_manager)
+        if resumed is not None:
+            records = sorted(
+                (trial for trial in resumed["trials"] if trial["round_type"] == round_type),
+                key=lambda trial: trial["trial_num"]
+            )
+            block.restore(records)
+            if round_type in resumed["block_summaries"]:
+                return False
+
+        for screen in screens:
+            self._show(screen, data_manager)
+
+        # No screen decoding in the background during trials
+        self.screens.finish_prefetch()
+        block.run(stopping_policy=stopping_policy)
+        self._snapshot_memory(f"after {round_type}")
+        return True
+
+    def _resume_participant(self, log_path: str):
+        """Rebuild the participant of an interrupted session from its log"""
+        resumed = read_session_log(log_path)
+        if resumed["complete"]:
+            raise ValueError(f"The session in {log_path} was completed; there is nothing to resume.")
+        plan = self._get_session_plan(resumed["participant_id"])
+        if plan.seed != resumed["seed"]:
+            raise ValueError(f"The session plan of {resumed['participant_id']} differs from the one in {log_path}.")
+        participant = Participant(
+            resumed["participant_id"],
+            start_time=resumed["start_time"],
+            seed=plan.seed,
+            rng_streams=plan.stream_seeds,
+            demographics=dict(resumed["demographics"]),
+            feedback=resumed["feedback"],
+            performance=dict(resumed["performance"]),
+            block_summaries=dict(resumed["block_summaries"])
         )
-        self.trial_stimuli_manager.load_stimuli(self.display.window)
+        print(f"Resuming participant {participant.participant_id} after {len(resumed['trials'])} trials.")
+        return participant, plan, resumed
 
-    def run(self):
-        """Run the complete experiment"""
+    def run_session(self, batch: bool = False) -> Optional[bool]:
+        """
+        Run the session of one participant.
+
+        Args:
+            batch: Whether more sessions follow in this process: escape on the first
+                screen then ends the batch, and escape on the consent screen ends
+                only this session.
+
+        Returns:
+            True after a completed session, None when it was declined on the consent
+            screen (another session can follow), False after an error or when the
+            batch was ended.
+        """
+        data_manager = None
         try:        
-            # Load all stimuli
-            self._load_stimuli()
-    
-            # Starting the experiment
-            self.display.display_stimulus(self.screens["experiment_info"])
-            self.display.display_stimulus(self.screens["consent"], allow_escape=True)
-            
-            # Initialize Participant instance and Data manager
-            participant_id = ask_id(self.display)
-            participant = Participant(participant_id)
-            data_manager = DataManager(participant)
+            # Timing/resource statistics are per session
+            RENDER_LOOP_STATS.clear()
+            REALTIME.reset()
+            if self.resume_path is None:
+                # Starting the experiment
+                if batch:
+                    key = self.display.display_stimulus(self.screens["experiment_info"], keyList=['space', 'escape'])
+                    if key == 'escape':
+                        return False
+                    key = self.display.display_stimulus(self.screens["consent"], keyList=['space', 'escape'])
+                    if key == 'escape':
+                        return None
+                else:
+                    self.display.display_stimulus(self.screens["experiment_info"])
+                    self.display.display_stimulus(self.screens["consent"], allow_escape=True)
+                
+                # Initialize Participant instance and Data manager
+                participant_id = ask_id(self.display)
+                plan = self._get_session_plan(participant_id)
+                participant = Participant(participant_id, seed=plan.seed, rng_streams=plan.stream_seeds)
+                resumed = None
+            else:
+                # Continue an interrupted session (python run.py --resume data/<file>.jsonl)
+                participant, plan, resumed = self._resume_participant(self.resume_path)
+                self.resume_path = None
+            data_manager = DataManager(participant, store=self.session_store)
             
             # Show pre-instructions
-            self.display.display_stimulus(self.screens["pre_instructions"])
+            if resumed is None:
+                self._show("pre_instructions", data_manager)
             
             # -------------------------
             # PRACTICE BLOCK
             # -------------------------
-            # Prepare the practice block
-            practice_trials = self.practice_stimuli_manager.generate_trials(
-                round_type="practice", 
-                pair_repeats=self.pair_repeats)
-            
-            practice_config = BlockConfig(
-                prompt_text="Which of the two citrus fruits do you LIKE MORE?",
-                num_breaks=0,
-                left_text="Citrus fruit A",
-                right_text="Citrus fruit B",
-                reference_text="Orange"
-            )
-            practice_block = Block(
-                self.display.window,
-                trials=practice_trials, 
-                config=practice_config,
-                data_manager=data_manager)
-            
-            # Display practice instructions
-            self.display.display_stimulus(self.screens["practice_instructions"])
-            
-            # Run practice block
-            practice_block.run()
-            
-            # Show aftermath of practice
-            self.display.display_stimulus(self.screens["practice_aftermath"])
+            # Trial order and breaks come from the session plan
+            if self._run_block(plan, "practice", data_manager, ["practice_instructions"], resumed):
+                # Show aftermath of practice
+                self._show("practice_aftermath", data_manager)
 
             # -------------------------
             # LIKING BLOCK
             # -------------------------
-            # Generate liking trials (for liking, you might not include a reference image)
-            liking_trials = self.trial_stimuli_manager.generate_trials(
-                round_type="liking", #experimental_trial
-                pair_repeats=self.pair_repeats)
-            for trial in liking_trials:
-                print(trial.pair.left_stimuli.filename, trial.pair.right_stimuli.filename)
-
-            liking_config = BlockConfig(
-                prompt_text="Which one of the two plant-based steaks do you LIKE MORE?",
-                num_breaks=1, #2,
-                break_wait_time=20,
-                left_text="PLANT-BASED STEAK A",
-                right_text="PLANT-BASED STEAK B",
+            # Liking trials do not include the reference image
+            self._run_block(
+                plan, "liking", data_manager,
+                ["liking_instructions", "liking_instructions_visual"],
+                resumed, self.stopping_policy
             )
-            liking_block = Block(
-                self.display.window, 
-                trials=liking_trials, 
-                config=liking_config,
-                data_manager=data_manager)
-            
-            # Display liking instructions
-            self.display.display_stimulus(self.screens["liking_instructions"])
-            self.display.display_stimulus(self.screens["liking_instructions_visual"])
-            
-            # Run liking block
-            liking_block.run()
 
             # -------------------------
             # SIMILARITY BLOCK
             # -------------------------
-            # Prepare the similarity block
-            similarity_trials = self.trial_stimuli_manager.generate_trials(
-                round_type="similarity", #"experimental_trial", 
-                pair_repeats=self.pair_repeats)
-            for trial in similarity_trials:
-                print(trial.pair.left_stimuli.filename, trial.pair.right_stimuli.filename)
-
-            similarity_config = BlockConfig(
-                prompt_text="Which of the two plant-based steaks is MORE SIMILAR to the BEEF STEAK on top?",
-                num_breaks=1, #2,
-                break_wait_time=20,
-                left_text="PLANT-BASED STEAK A",
-                right_text="PLANT-BASED STEAK B",
-                reference_text="BEEF STEAK",
-                referant_present = True
+            # (you can choose to show one or both instruction screens)
+            self._run_block(
+                plan, "similarity", data_manager,
+                ["similarity_instructions", "similarity_instructions_visual"],
+                resumed, self.stopping_policy
             )
-            similarity_block = Block(
-                self.display.window, 
-                trials=similarity_trials, 
-                config=similarity_config,
-                data_manager=data_manager)
-            
-            # Display similarity instructions (you can choose to show one or both screens)
-            self.display.display_stimulus(self.screens["similarity_instructions"])
-            self.display.display_stimulus(self.screens["similarity_instructions_visual"])
-            
-            # Run similarity block
-            similarity_block.run()
 
             # -------------------------
             # DEMOGRAPHICS AND FEEDBACK
             # -------------------------
-            self.display.display_stimulus(self.screens["pre_demographics"])
-
-            # Demographics
-            demographics = {}
-            demographics['gender'] = ask_gender(self.display)
-            demographics['age'] = ask_age(self.display)
-            demographics['nationality'] = ask_nationality(self.display)
-            demographics['diet'] = ask_diet(self.display)
-            demographics['eat_frequency'] = ask_eat_frequency(self.display)
-            data_manager.save_demographics(demographics)
+            questions = [
+                ('gender', ask_gender),
+                ('age', ask_age),
+                ('nationality', ask_nationality),
+                ('diet', ask_diet),
+                ('eat_frequency', ask_eat_frequency),
+            ]
+            # Each answer is saved as soon as it is given (answered ones are skipped when resuming)
+            remaining = [(name, ask) for name, ask in questions if name not in participant.demographics]
+            if remaining:
+                self._show("pre_demographics", data_manager)
+            for name, ask in remaining:
+                data_manager.save_demographic(name, ask(self.display))
 
             # Recording the end time
             participant.mark_end()
 
             # Feedback
-            feedback = ask_feedback(self.display)
-            data_manager.save_feedback(feedback)
+            if not participant.feedback:
+                feedback = ask_feedback(self.display)
+                data_manager.save_feedback(feedback)
 
-            # Save all data
+            # Finish the session log (with the time spent in interactive screens)
+            data_manager.save_performance("render_loops", render_loop_stats())
+            data_manager.save_performance("memory", memory_stats())
+            data_manager.save_performance("gc", gc_stats())
+            if self.machine_profile is not None:
+                data_manager.save_performance("machine", self.machine_profile.to_json())
             data_manager.save_all()
+            if TRACER.enabled:
+                TRACER.export(f"data/{participant._get_datafile_name()}_trace.json")
+                TRACER.enable()  # the next session gets its own trace
 
             # End of experiment screen
             self.display.display_stimulus(self.screens["end_of_experiment"], wait_for_space=False, show_continue=False)
-            core.wait(30)
-            self.display.quit_experiment()
+            core.wait(self.end_screen_time)
+            return True
 
         except Exception as e:
             print("An error occurred:", e)
-            self.display.quit_experiment()
+            if data_manager is not None:
+                print(f"To continue this session, run: python run.py --resume {data_manager.log.path}")
+            return False
+
+    def run(self):
+        """Run the complete experiment for one participant"""
+        self.display.window.callOnFlip(self.profiler.mark_first_screen)
+        self.run_session()
+        self.display.quit_experiment()
+
+    def run_batch(self, max_sessions: Optional[int] = None):
+        """
+        Run consecutive sessions in this process (python run.py --batch).
+
+        The window, the stimulus textures, the instruction screens and the text
+        caches are kept between participants; each session only creates its
+        participant, data manager and trials. After the end screen, the first
+        screen is shown again for the next participant; pressing escape there
+        ends the batch.
+
+        Args:
+            max_sessions: Optional number of sessions after which the batch ends.
+        """
+        self.screens.keep_shown = True
+        self.display.window.callOnFlip(self.profiler.mark_first_screen)
+        sessions = 0
+        while max_sessions is None or sessions < max_sessions:
+            completed = self.run_session(batch=True)
+            if completed is False:
+                break
+            if completed:
+                sessions += 1
+        print(f"Batch ended after {sessions} sessions.")
+        self.display.quit_experiment()
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Command line options (the tracing, profiling and realtime flags are also read at import)"""
+    parser = argparse.ArgumentParser(description="Run the experiment.")
+    parser.add_argument("--resume", metavar="LOG", default=None,
+                        help="Continue an interrupted session from its session log (data/<file>.jsonl)")
+    parser.add_argument("--batch", action="store_true", help="Run consecutive sessions in this process")
+    parser.add_argument("--trace", action="store_true", help="Save a timeline of the session (Chrome trace)")
+    parser.add_argument("--trace-memory", action="store_true", help="Also record memory snapshots in the trace")
+    parser.add_argument("--profile-startup", action="store_true", help="Report the time spent starting up")
+    parser.add_argument("--realtime", action="store_true", help="Run the blocks at raised priority")
+    args = parser.parse_args(argv)
+    if args.resume is not None and not os.path.isfile(args.resume):
+        parser.error(f"no session log at {args.resume}")
+    return args
 
 if __name__ == '__main__':
+    # Checked before the window is opened
+    args = parse_arguments()
     runner = ExperimentRunner()
-    runner.run()
+    runner.resume_path = args.resume
+    if args.batch:
+        runner.run_batch()
+    else:
+        runner.run()
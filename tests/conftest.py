@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The tests import the experiment package and the analysis scripts (python -m pytest from the repository root)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "analysis"))
@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("psychopy")
+from experiment import Display
+from run import ExperimentRunner, profiler
+
+class FakeWindow:
+    def flip(self):
+        pass
+
+    def callOnFlip(self, function, *args):
+        pass
+
+class FakeScreen:
+    def draw(self):
+        pass
+
+class ScriptedDisplay(Display):
+    """A Display without a window, whose key presses are scripted"""
+    def __init__(self, keys):
+        self.window = FakeWindow()
+        self.continue_text = FakeScreen()
+        self.keys = list(keys)
+        self.waited_for = []
+        self.quit = 0
+
+    def _wait_keys(self, keyList=None):
+        self.waited_for.append(list(keyList))
+        return [self.keys.pop(0)]
+
+    def quit_experiment(self):
+        self.quit += 1
+
+class Screens(dict):
+    keep_shown = False
+
+def batch_runner(keys):
+    runner = ExperimentRunner.__new__(ExperimentRunner)
+    runner.profiler = profiler
+    runner.display = ScriptedDisplay(keys)
+    runner.screens = Screens(experiment_info=FakeScreen(), consent=FakeScreen())
+    runner.resume_path = None
+    return runner
+
+def test_escape_is_returned_when_listed():
+    display = ScriptedDisplay(["escape"])
+    keys = ["space", "escape"]
+    assert display.display_stimulus(FakeScreen(), keyList=keys) == "escape"
+    assert display.quit == 0 and keys == ["space", "escape"]
+
+def test_escape_quits_when_allowed():
+    display = ScriptedDisplay(["escape"])
+    display.display_stimulus(FakeScreen(), allow_escape=True)
+    assert display.waited_for == [["space", "escape"]] and display.quit == 1
+
+def test_batch_ends_on_escape_at_the_first_screen(capsys):
+    runner = batch_runner(["escape"])
+    runner.run_batch()
+    assert runner.display.keys == [] and runner.display.quit == 1
+    assert "Batch ended after 0 sessions." in capsys.readouterr().out
+
+def test_escape_at_consent_skips_to_the_next_session(capsys):
+    # experiment_info, consent (declined), then experiment_info of the next session (batch ended)
+    runner = batch_runner(["space", "escape", "escape"])
+    runner.run_batch()
+    assert runner.display.keys == [] and runner.display.quit == 1
+    assert "Batch ended after 0 sessions." in capsys.readouterr().out
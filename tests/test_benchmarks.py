@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("psychopy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from run_benchmarks import compare, DEFAULT_THRESHOLDS
+
+def result(median_s, peak_kb=100.0):
+    return {"min_s": median_s * 0.9, "median_s": median_s, "peak_kb": peak_kb}
+
+def test_noise_in_short_cases_is_not_a_regression():
+    baseline = {"results": {"short": result(1e-3), "long": result(50e-3)}}
+    assert compare({"short": result(1.3e-3), "long": result(55e-3)}, baseline, DEFAULT_THRESHOLDS) == []
+    regressions = compare({"short": result(2e-3), "long": result(70e-3)}, baseline, DEFAULT_THRESHOLDS)
+    assert [regression.split(":")[0] for regression in regressions] == ["short", "long"]
+
+def test_medians_are_compared():
+    baseline = {"results": {"case": result(50e-3)}}
+    # A faster fastest repeat does not hide a slower median
+    slower = {"case": {"min_s": 40e-3, "median_s": 70e-3, "peak_kb": 100.0}}
+    assert compare(slower, baseline, DEFAULT_THRESHOLDS)
+    assert compare({"case": result(50e-3, peak_kb=200.0)}, baseline, DEFAULT_THRESHOLDS)
+    assert compare({"other": result(1.0)}, baseline, DEFAULT_THRESHOLDS) == []
@@ -0,0 +1,33 @@
+import numpy as np
+from bradley_terry import fit_bradley_terry, win_probabilities
+
+def simulate_wins(scores, comparisons_per_pair, rng):
+    n = len(scores)
+    first, second = np.triu_indices(n, 1)
+    p = win_probabilities(scores)[first, second]
+    first_wins = rng.binomial(comparisons_per_pair, p)
+    wins = np.zeros((n, n))
+    wins[first, second] = first_wins
+    wins[second, first] = comparisons_per_pair - first_wins
+    return wins
+
+def test_recovers_the_scores():
+    rng = np.random.default_rng(1)
+    true_scores = np.linspace(-1.5, 1.5, 8)
+    wins = simulate_wins(true_scores, 400, rng)
+    scores = fit_bradley_terry(wins, prior=0.0)
+    assert abs(scores.mean()) < 1e-12
+    assert np.abs(scores - true_scores).max() < 0.15
+
+def test_batched_fits_match_single_fits():
+    rng = np.random.default_rng(2)
+    wins = np.stack([simulate_wins(rng.normal(0, 1, 6), 5, rng) for _ in range(4)])
+    batched = fit_bradley_terry(wins)
+    assert batched.shape == (4, 6)
+    for fit, single in zip(batched, wins):
+        np.testing.assert_allclose(fit, fit_bradley_terry(single), atol=1e-6)
+
+def test_prior_keeps_unbeaten_stimuli_finite():
+    wins = np.array([[0, 3, 3], [0, 0, 2], [0, 1, 0]], dtype=float)
+    scores = fit_bradley_terry(wins)
+    assert np.all(np.isfinite(scores)) and scores[0] == scores.max()
@@ -0,0 +1,39 @@
+import itertools
+import numpy as np
+from circular_triads import majority_tournaments, count_circular_triads, max_circular_triads, list_circular_triads
+
+def brute_force(tournament):
+    triads = set()
+    for i, j, k in itertools.permutations(range(len(tournament)), 3):
+        if tournament[i, j] and tournament[j, k] and tournament[k, i]:
+            # Each cycle once, starting from its smallest index
+            start = np.argmin([i, j, k])
+            triads.add(((i, j, k) * 2)[start:start + 3])
+    return sorted(triads)
+
+def random_wins(rng, participants, n):
+    return rng.integers(0, 3, (participants, n, n)) * (1 - np.eye(n, dtype=int))
+
+def test_counts_match_brute_force():
+    rng = np.random.default_rng(0)
+    wins = random_wins(rng, 20, 7)
+    tournaments = majority_tournaments(wins)
+    counts = count_circular_triads(tournaments)
+    for tournament, count in zip(tournaments, counts):
+        triads = brute_force(tournament)
+        assert count == len(triads)
+        assert sorted(list_circular_triads(tournament)) == triads
+
+def test_ties_have_no_edge():
+    wins = np.array([[[0, 1], [1, 0]]])
+    assert majority_tournaments(wins).sum() == 0
+
+def test_maximum_of_regular_tournaments():
+    for n in (3, 5, 7):
+        # Every i beats the (n - 1) / 2 stimuli after it (cyclically): the most circular tournament
+        tournament = np.zeros((1, n, n))
+        for i in range(n):
+            for step in range(1, (n - 1) // 2 + 1):
+                tournament[0, i, (i + step) % n] = 1
+        assert count_circular_triads(tournament)[0] == max_circular_triads(n)
+    assert max_circular_triads(4) == 2
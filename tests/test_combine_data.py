@@ -0,0 +1,24 @@
+import pandas as pd
+import combine_data
+from experiment.managers.session_log import SessionLog
+
+def write_log(folder, participant_id, finish):
+    log = SessionLog(str(folder / f"{participant_id}_20250101_120000.jsonl"))
+    log.append("session_start", participant_id=participant_id, start_time="20250101_120000", seed=1, rng_streams={})
+    log.append("trial", trial={"trial_num": 1, "round_type": "liking", "left_stimulus": "a.png",
+                               "right_stimulus": "b.png", "response": "d", "reaction_time": 0.5})
+    if finish:
+        log.finalize(end_time="20250101_123000", duration=1800.0, n_trials=1)
+    else:
+        log.close()
+
+def test_incomplete_sessions_are_marked(tmp_path, monkeypatch, capsys):
+    (tmp_path / "data").mkdir()
+    write_log(tmp_path / "data", "10001", finish=True)
+    write_log(tmp_path / "data", "10002", finish=False)
+    monkeypatch.chdir(tmp_path)
+    combine_data.main()
+
+    df = pd.read_csv(tmp_path / "data" / "working" / "combined_data.csv", dtype={"participant_id": str})
+    assert dict(zip(df["participant_id"], df["complete"])) == {"10001": True, "10002": False}
+    assert "1 incomplete session(s)" in capsys.readouterr().out
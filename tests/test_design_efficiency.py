@@ -0,0 +1,32 @@
+import numpy as np
+from design_efficiency import comparison_counts, information_matrix, laplacian_pinv_diagonal, evaluate_design
+
+def random_design(rng, n_stimuli, n_trials):
+    left = rng.integers(0, n_stimuli, n_trials)
+    right = (left + rng.integers(1, n_stimuli, n_trials)) % n_stimuli
+    return comparison_counts(left, right, n_stimuli)
+
+def test_pinv_diagonal_matches_numpy():
+    rng = np.random.default_rng(0)
+    counts = random_design(rng, 30, 400)
+    information = information_matrix(counts, scores=rng.normal(0, 1, 30))
+    expected = np.diag(np.linalg.pinv(information.toarray()))
+    dense, dense_log_det = laplacian_pinv_diagonal(information)
+    sparse, sparse_log_det = laplacian_pinv_diagonal(information, block_size=7, dense_limit=0)
+    np.testing.assert_allclose(dense, expected, rtol=1e-8)
+    np.testing.assert_allclose(sparse, expected, rtol=1e-8)
+    reduced = information.toarray()[1:, 1:]
+    np.testing.assert_allclose([dense_log_det, sparse_log_det], np.linalg.slogdet(reduced)[1])
+
+def test_complete_balanced_design_is_fully_efficient():
+    n = 6
+    first, second = np.triu_indices(n, 1)
+    summary, se = evaluate_design(comparison_counts(np.repeat(first, 4), np.repeat(second, 4), n))
+    assert summary["connected"] and summary["pair_coverage"] == 1
+    np.testing.assert_allclose([summary["a_efficiency"], summary["d_efficiency"]], 1)
+    np.testing.assert_allclose(se, se[0])
+
+def test_disconnected_design():
+    summary, se = evaluate_design(comparison_counts([0, 2], [1, 3], 4))
+    assert not summary["connected"] and summary["components"] == 2
+    assert np.all(np.isinf(se))
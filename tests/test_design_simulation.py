@@ -0,0 +1,18 @@
+import numpy as np
+from design_simulation import sample_pairs
+
+def test_sample_pairs_follows_the_weights():
+    rng = np.random.default_rng(0)
+    weights = np.array([[1.0, 0.0, 3.0, 0.0], [0.0, 2.0, 0.0, 2.0], [0.0, 0.0, 0.0, 5.0]])
+    pairs = sample_pairs(rng, weights, 20000)
+    assert pairs.shape == (3, 20000)
+    for replicate, row in zip(pairs, weights):
+        frequencies = np.bincount(replicate, minlength=4) / replicate.size
+        assert np.all(frequencies[row == 0] == 0)
+        np.testing.assert_allclose(frequencies, row / row.sum(), atol=0.02)
+
+def test_sample_pairs_is_reproducible():
+    weights = np.random.default_rng(1).random((5, 10))
+    first = sample_pairs(np.random.default_rng(7), weights, 50)
+    second = sample_pairs(np.random.default_rng(7), weights, 50)
+    assert np.array_equal(first, second) and first.min() >= 0 and first.max() < 10
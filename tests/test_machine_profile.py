@@ -0,0 +1,40 @@
+import json
+from dataclasses import replace
+from datetime import datetime
+import pytest
+from experiment.managers.machine_profile import MachineProfile, CalibrationTolerance
+
+def profile(**changes):
+    fine = MachineProfile(
+        machine="lab-1", created=datetime.now().strftime("%Y%m%d_%H%M%S"), window_size=[1920, 1080],
+        refresh_hz=60.0, frame_ms=16.7, flip_jitter_ms=0.2, dropped_frames=0.0,
+        texture_upload_mb_per_s=500.0, stimulus_upload_ms=5.0, text_layout_ms=2.0,
+        disk_write_ms=0.1, disk_write_p99_ms=0.5, disk_sync_ms=2.0,
+    )
+    return replace(fine, **changes)
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "lab-1.json")
+    saved = profile()
+    saved.save(path)
+    assert MachineProfile.load(path) == saved
+
+def test_check():
+    assert profile().check() == []
+    problems = profile(flip_jitter_ms=3.0, stimulus_upload_ms=80.0, created="20000101_000000").check()
+    assert len(problems) == 3
+    assert profile(stimulus_upload_ms=80.0).check(CalibrationTolerance(max_stimulus_upload_ms=100.0)) == []
+    # The disk limit is on the 99th percentile, not the median
+    assert profile(disk_write_ms=1.0, disk_write_p99_ms=12.0).check(CalibrationTolerance(max_disk_write_p99_ms=10.0))
+    assert profile(disk_write_ms=12.0).check(CalibrationTolerance(max_disk_write_p99_ms=10.0)) == []
+
+def test_invalid_profiles(tmp_path):
+    path = tmp_path / "lab-1.json"
+    path.write_text("{")
+    with pytest.raises(ValueError):
+        MachineProfile.load(str(path))
+    path.write_text(json.dumps({"machine": "lab-1"}))
+    with pytest.raises(TypeError):
+        MachineProfile.load(str(path))
+    with pytest.raises(ValueError):
+        profile(created="yesterday").check()
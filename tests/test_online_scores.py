@@ -0,0 +1,46 @@
+import random
+import pytest
+
+pytest.importorskip("psychopy")
+from experiment.core import Stimulus, Comparison, Trial, OnlineScores
+
+NAMES = ["a.png", "b.png", "c.png", "d.png"]
+STIMULI = {name: Stimulus(name, f"synthetic/{name}", orig_width=800, orig_height=600, create_texture=False)
+           for name in NAMES}
+
+def judge(trial_num, left, right, response, reaction_time=0.5):
+    return Trial(trial_num, Comparison(left_stimuli=STIMULI[left], right_stimuli=STIMULI[right]),
+                 "similarity", response=response, reaction_time=reaction_time)
+
+def ranked_trials(n_trials, seed=0):
+    """Judgements that always prefer the stimulus earlier in NAMES."""
+    rng = random.Random(seed)
+    trials = []
+    for trial_num in range(1, n_trials + 1):
+        left, right = rng.sample(NAMES, 2)
+        trials.append(judge(trial_num, left, right, "d" if NAMES.index(left) < NAMES.index(right) else "k"))
+    return trials
+
+def test_scores_follow_the_judgements():
+    scores = OnlineScores(NAMES)
+    assert scores.reliability is None
+    for trial in ranked_trials(200):
+        scores.update(trial)
+    estimates = scores.estimates()
+    assert sorted(NAMES, key=estimates.get, reverse=True) == NAMES
+    assert sum(estimates.values()) == pytest.approx(0)
+    assert 0 < scores.reliability <= 1
+    assert all(se is not None and se > 0 for se in scores.standard_errors().values())
+
+def test_quality_statistics():
+    scores = OnlineScores(NAMES)
+    scores.update(judge(1, "a.png", "b.png", "d", 1.0))
+    scores.update(judge(2, "b.png", "a.png", "d", 2.0))  # the same pair, the other choice
+    scores.update(judge(3, "a.png", "b.png", "missed", None))
+    summary = scores.summary()
+    assert summary["n_judged"] == 2 and summary["n_missed"] == 1
+    assert summary["missed_rate"] == pytest.approx(1 / 3)
+    assert summary["left_rate"] == 1.0 and summary["mean_rt"] == 1.5
+    assert summary["n_repeats"] == 1 and summary["inconsistency"] == 1.0
+    assert summary["standard_errors"]["c.png"] is None
+    assert summary["reliability"] is None  # c and d were never judged
@@ -0,0 +1,47 @@
+import pandas as pd
+from pairwise_data import load_trials, load_exclusions, participant_win_matrices
+
+def write_trials(path):
+    rows = []
+    for participant_id in ("101", "102"):
+        for round_type in ("liking", "similarity"):
+            rows += [
+                {"participant_id": participant_id, "round_type": round_type,
+                 "left_stimulus": "a.png", "right_stimulus": "b.png", "response": "d"},
+                {"participant_id": participant_id, "round_type": round_type,
+                 "left_stimulus": "b.png", "right_stimulus": "c.png", "response": "k"},
+                {"participant_id": participant_id, "round_type": round_type,
+                 "left_stimulus": "a.png", "right_stimulus": "c.png", "response": "missed"},
+            ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+def test_load_trials(tmp_path):
+    path = str(tmp_path / "combined_data.csv")
+    write_trials(path)
+    df = load_trials(path)
+    assert len(df) == 8
+    assert list(df["winner"][:2]) == ["a.png", "c.png"] and list(df["loser"][:2]) == ["b.png", "b.png"]
+    participants, stimuli, wins = participant_win_matrices(df)
+    assert list(participants) == ["101", "102"] and list(stimuli) == ["a.png", "b.png", "c.png"]
+    assert wins[0, 0, 1] == 2 and wins.sum() == 8
+
+def test_exclusions_per_round(tmp_path):
+    path = str(tmp_path / "combined_data.csv")
+    write_trials(path)
+    exclusions = tmp_path / "excluded_participants.csv"
+    exclusions.write_text("participant_id,round_type,infit,outfit\n101,similarity,2.5,3.0\n")
+    exclude = load_exclusions(str(exclusions))
+    assert exclude == {("101", "similarity")}
+    df = load_trials(path, exclude=exclude)
+    kept = set(zip(df["participant_id"], df["round_type"]))
+    assert kept == {("101", "liking"), ("102", "liking"), ("102", "similarity")}
+
+def test_exclusions_without_round_type(tmp_path):
+    path = str(tmp_path / "combined_data.csv")
+    write_trials(path)
+    exclusions = tmp_path / "excluded.csv"
+    exclusions.write_text("participant_id\n101\n")
+    exclude = load_exclusions(str(exclusions))
+    assert exclude == {("101", None)}
+    assert set(load_trials(path, exclude=exclude)["participant_id"]) == {"102"}
+    assert load_exclusions(None) == set()
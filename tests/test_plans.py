@@ -0,0 +1,45 @@
+import random
+from collections import Counter
+from experiment.managers.plans import schedule_pairs, build_session_plan, SessionPlanStore
+
+STIMULI = {
+    "practice": [f"p{i:02d}.png" for i in range(3)],
+    "trials": [f"t{i:02d}.png" for i in range(6)],
+}
+
+def test_schedule_pairs_presents_both_orientations():
+    pairs = [(0, 1), (0, 2), (2, 1)]
+    order = schedule_pairs(pairs, pair_repeats=2, rng=random.Random(3))
+    counts = Counter(order)
+    assert len(order) == 12
+    assert all(counts[pair] == 2 and counts[pair[::-1]] == 2 for pair in pairs)
+    # The first half of each repeat presents every pair once in its own orientation
+    assert set(order[:3]) == set(pairs)
+    assert order == schedule_pairs(pairs, pair_repeats=2, rng=random.Random(3))
+
+def test_session_plan_is_reproducible():
+    plan = build_session_plan("10001", STIMULI, base_seed=2025, pair_repeats=1)
+    assert plan.to_json() == build_session_plan("10001", STIMULI, base_seed=2025, pair_repeats=1).to_json()
+    assert plan.seed != build_session_plan("10002", STIMULI, base_seed=2025).seed
+    assert plan.seed != build_session_plan("10001", STIMULI, base_seed=2026).seed
+    for block in plan.blocks:
+        n = len(STIMULI[block.stimulus_set])
+        assert len(block.trials) == n * (n - 1)
+    # The blocks of a stimulus set share the orientation of the pairs, in different orders
+    liking, similarity = plan.block("liking").trials, plan.block("similarity").trials
+    assert set(liking[:15]) == set(similarity[:15]) and liking != similarity
+
+def test_store_round_trip(tmp_path):
+    store = SessionPlanStore(str(tmp_path / "plans" / "session_plans"))
+    assert not store.exists()
+    plans = [build_session_plan(pid, STIMULI, base_seed=7, pair_repeats=2) for pid in ("10001", "10002", "10003")]
+    store.write(plans, base_seed=7)
+
+    store = SessionPlanStore(str(tmp_path / "plans" / "session_plans"))
+    assert store.exists()
+    assert store.base_seed == 7 and store.pair_repeats == 2
+    assert store.participant_ids() == ["10001", "10002", "10003"]
+    for plan in plans:
+        loaded = store.lookup(plan.participant_id)
+        assert loaded.to_json() == plan.to_json() and loaded.stimuli == STIMULI
+    assert store.lookup("99999") is None
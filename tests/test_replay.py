@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("psychopy")
+from experiment import SESSION_LAYOUT, build_session_plan, compute_break_points
+from replay import planned_break_points
+
+LIKING = next(layout for layout in SESSION_LAYOUT if layout.round_type == "liking")
+STIMULI = {"practice": [f"p{i}.png" for i in range(3)], "trials": [f"t{i:02d}.png" for i in range(10)]}
+
+def session(block_summaries=None):
+    return {"participant_id": "10001", "seed": 1, "block_summaries": block_summaries or {}}
+
+def test_break_points_of_a_block_that_stopped_early():
+    # The block stopped after 40 of its 90 trials; the break was planned after trial 45
+    logged = session({"liking": {"n_judged": 40, "break_points": [45]}})
+    assert planned_break_points(logged, LIKING, None, 40) == [45]
+
+def test_break_points_from_the_session_plan():
+    plan = build_session_plan("10001", STIMULI, base_seed=2025)
+    expected = plan.block("liking").break_points
+    assert expected == compute_break_points(90, LIKING.num_breaks)
+    assert planned_break_points(session({"liking": {"n_judged": 40}}), LIKING, plan, 40) == expected
+
+def test_break_points_without_plan_or_summary(capsys):
+    assert planned_break_points(session(), LIKING, None, 40) == compute_break_points(40, LIKING.num_breaks)
+    assert "Warning" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+from experiment.managers.session_log import SessionLog, read_session_log, load_session
+
+def trial(trial_num, round_type="similarity"):
+    return {
+        "trial_num": trial_num, "round_type": round_type, "left_stimulus": "a.png",
+        "right_stimulus": "b.png", "reference_stimulus": "ref.png", "comparison_order": 1,
+        "response": "d", "reaction_time": 0.5,
+    }
+
+def start(log):
+    log.append("session_start", participant_id="10001", start_time="20250101_120000", seed=7, rng_streams={})
+
+def test_complete_session(tmp_path):
+    path = str(tmp_path / "10001.jsonl")
+    log = SessionLog(path)
+    assert log.is_new
+    start(log)
+    log.append("trial", trial=trial(1))
+    log.append("demographic", name="age", value=30)
+    log.append("block_summary", round_type="similarity", summary={"n_judged": 1})
+    log.finalize(end_time="20250101_123000", duration=1800.0, n_trials=1)
+
+    session = read_session_log(path)
+    assert session["complete"]
+    assert session["participant_id"] == "10001" and session["seed"] == 7
+    assert session["trials"] == [trial(1)]
+    assert session["demographics"] == {"age": 30}
+    assert session["block_summaries"] == {"similarity": {"n_judged": 1}}
+    assert session["end_time"] == "20250101_123000"
+    assert load_session(path) == session
+
+def test_interrupted_session_is_incomplete(tmp_path):
+    path = str(tmp_path / "10001.jsonl")
+    log = SessionLog(path)
+    start(log)
+    log.append("trial", trial=trial(1))
+    log.close()
+    session = read_session_log(path)
+    assert not session["complete"]
+    assert len(session["trials"]) == 1
+
+def test_resume_after_crash_mid_write(tmp_path):
+    path = str(tmp_path / "10001.jsonl")
+    log = SessionLog(path)
+    start(log)
+    log.append("trial", trial=trial(1))
+    log.close()
+    with open(path, "a") as f:
+        f.write('{"event":"trial","trial":{"trial_')  # the crash cut this line off
+
+    log = SessionLog(path)
+    assert not log.is_new
+    log.append("session_resume")
+    log.append("trial", trial=trial(2))
+    log.append("trial", trial=trial(3))
+    log.finalize(end_time="20250101_123000", duration=1800.0, n_trials=3)
+
+    session = read_session_log(path)
+    assert session["complete"]
+    assert [t["trial_num"] for t in session["trials"]] == [1, 2, 3]
+
+def test_crash_before_first_line_starts_a_new_log(tmp_path):
+    path = str(tmp_path / "10001.jsonl")
+    with open(path, "w") as f:
+        f.write('{"event":"session_st')
+    log = SessionLog(path)
+    assert log.is_new
+    start(log)
+    log.close()
+    assert read_session_log(path)["participant_id"] == "10001"
+
+def test_repeated_trial_keeps_last_version(tmp_path):
+    path = str(tmp_path / "10001.jsonl")
+    log = SessionLog(path)
+    start(log)
+    log.append("trial", trial=trial(1))
+    repeated = dict(trial(1), response="k")
+    log.append("trial", trial=repeated)
+    log.close()
+    assert read_session_log(path)["trials"] == [repeated]
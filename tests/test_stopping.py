@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("psychopy")
+from experiment.core import OnlineScores, StoppingPolicy
+from experiment.core.stopping import spearman
+from test_online_scores import NAMES, ranked_trials
+
+def run(policy, trials):
+    scores = OnlineScores(NAMES)
+    policy.reset()
+    for trial in trials:
+        scores.update(trial)
+        if policy.should_stop(trial.trial_num, scores):
+            return trial.trial_num
+    return None
+
+def test_spearman():
+    scores = {"a": 3.0, "b": 2.0, "c": 1.0}
+    assert spearman(scores, dict(scores)) == 1.0
+    assert spearman(scores, {"a": 1.0, "b": 2.0, "c": 3.0}) == -1.0
+
+def test_stops_once_reliable_and_stable():
+    policy = StoppingPolicy(reliability_threshold=0.5, stability_threshold=0.9, window=20, min_trials=60)
+    stopped_at = run(policy, ranked_trials(400))
+    assert stopped_at is not None and stopped_at >= 60 and stopped_at % 20 == 0
+    assert policy.reason == "reliable_and_stable" and policy.stopped_at == stopped_at
+    assert [check.trial_num for check in policy.checks] == list(range(20, stopped_at + 1, 20))
+    assert policy.checks[0].rank_stability is None
+
+def test_max_trials_and_reset():
+    policy = StoppingPolicy(reliability_threshold=1.1, window=10, max_trials=35)
+    assert run(policy, ranked_trials(100)) == 35
+    assert policy.reason == "max_trials" and len(policy.checks) == 3
+    assert policy.summary()["stopped_at"] == 35
+    policy.reset()
+    assert policy.checks == [] and policy.stopped_at is None and policy.reason is None